@@ -0,0 +1,165 @@
+"""
+Per-contributor daily activity with prefix sums, for scoring arbitrary date
+ranges and recency-decayed activity without re-running the pipeline.
+
+Each activity series (type-weighted merged-PR credit, merged PRs, reviews, lines
+changed, issues closed, issue interactions) is a contributors x days array with
+a running total along the days. Any [start, end] total is then one subtraction
+per contributor. Decayed totals use a second running sum of x_d * 2^(d/h): the
+sum over a range, rescaled by 2^(-end/h), is the half-life-h weighted total as
+of `end`. That running sum is built once per half-life.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from compact import NAT, CompactSnapshot
+from models import ImpactData
+from scoring import PR_CREDIT, pr_type_multipliers, score_components
+
+SERIES = ("credit", "merged", "reviews", "lines", "issues_closed", "issue_interactions")
+_MAX_DECAY_EXPONENT = 1000  # 2^1000 is still a finite float64
+_DAY_MICROS = 86_400_000_000
+_EPOCH_DATE = date(1970, 1, 1)
+
+
+def _first(*columns: np.ndarray) -> np.ndarray:
+    """Elementwise first non-missing timestamp."""
+    out = columns[0].copy()
+    for column in columns[1:]:
+        out = np.where(out == NAT, column, out)
+    return out
+
+
+class ActivityTimeline:
+    """Daily activity of a snapshot's contributors, queryable for any date range."""
+
+    def __init__(self, data: Union[ImpactData, CompactSnapshot]):
+        snap = data if isinstance(data, CompactSnapshot) else CompactSnapshot.from_impact_data(data)
+        contributors = snap.contributors[~snap.contributors["login"].str.endswith("[bot]")]
+        self.logins = contributors["login"].tolist()
+        self.multipliers = contributors["ai_multiplier"].fillna(1.0).to_numpy(dtype=float)
+        row_of = pd.Index(self.logins).get_indexer(snap.logins)  # login code -> row, -1 if not scored
+
+        merged = np.flatnonzero(snap.merged)
+        review_pr = np.repeat(np.arange(len(snap)), np.diff(snap.review_offsets))
+        issue_day = _first(snap.issue_updated_at, snap.issue_created_at)
+        events = {  # name: (login codes, timestamps, values)
+            "credit": (snap.author[merged], snap.merged_at[merged],
+                       PR_CREDIT * pr_type_multipliers(snap.title.take(merged))),
+            "merged": (snap.author[merged], snap.merged_at[merged], 1.0),
+            "lines": (snap.author, _first(snap.merged_at, snap.closed_at, snap.created_at),
+                      (snap.additions + snap.deletions).astype(float)),
+            "reviews": (snap.review_author,
+                        _first(snap.review_submitted_at, snap.merged_at[review_pr],
+                               snap.closed_at[review_pr], snap.created_at[review_pr]), 1.0),
+            "issues_closed": (snap.issue_author[snap.issue_closed], issue_day[snap.issue_closed], 1.0),
+            "issue_interactions": (snap.issue_author, issue_day, 1.0),
+        }
+        for name, (codes, moments, values) in events.items():
+            rows = row_of[codes] if len(codes) else np.empty(0, dtype=np.int64)
+            keep = (rows >= 0) & (moments != NAT)
+            days = np.floor_divide(moments[keep], _DAY_MICROS)
+            events[name] = (rows[keep], days, np.broadcast_to(values, keep.shape)[keep])
+        self._build(data.cutoff_date, data.fetched_at, events)
+
+    @classmethod
+    def from_daily(cls, contributors: pd.DataFrame, cutoff_date: datetime, fetched_at: datetime,
+                   daily: pd.DataFrame) -> "ActivityTimeline":
+        """Rebuilds a timeline from its `daily_table()`, without touching PRs or issues."""
+        timeline = cls.__new__(cls)
+        contributors = contributors[~contributors["login"].str.endswith("[bot]")]
+        timeline.logins = contributors["login"].tolist()
+        timeline.multipliers = contributors["ai_multiplier"].fillna(1.0).to_numpy(dtype=float)
+        rows = pd.Index(timeline.logins).get_indexer(daily["login"].astype(object))
+        known = rows >= 0
+        days = daily["day"].to_numpy(dtype=np.int64)[known]
+        timeline._build(cutoff_date, fetched_at, {
+            name: (rows[known], days, daily[name].to_numpy(dtype=float)[known]) for name in SERIES
+        })
+        return timeline
+
+    def _build(self, cutoff_date: datetime, fetched_at: datetime, events: Dict[str, tuple]):
+        """
+        Daily arrays and prefix sums from (rows, days since the epoch, values) per series.
+        The day axis is the snapshot's window; events outside it (a PR opened long before
+        the cutoff but still active) count on its first or last day.
+        """
+        first_day = (cutoff_date.date() - _EPOCH_DATE).days
+        last_day = max((fetched_at.date() - _EPOCH_DATE).days, first_day)
+        self.start = _EPOCH_DATE + timedelta(days=first_day)
+        self.end = _EPOCH_DATE + timedelta(days=last_day)
+        self.days = last_day - first_day + 1
+
+        # prefix[name][:, k] = activity on days before day k
+        self.prefix: Dict[str, np.ndarray] = {}
+        self._daily: Dict[str, np.ndarray] = {}
+        self._touched = np.zeros((len(self.logins), self.days), dtype=bool)  # cells with any event
+        for name, (rows, days, values) in events.items():
+            cells = rows.astype(np.int64) * self.days + (np.clip(days, first_day, last_day) - first_day)
+            daily = np.bincount(cells, weights=np.asarray(values, dtype=float),
+                                minlength=len(self.logins) * self.days).reshape(len(self.logins), self.days)
+            self._touched.flat[cells] = True
+            self._daily[name] = daily
+            self.prefix[name] = np.concatenate([np.zeros((len(self.logins), 1)), np.cumsum(daily, axis=1)], axis=1)
+        self._decayed: Dict[float, Dict[str, np.ndarray]] = {}
+
+    def daily_table(self) -> pd.DataFrame:
+        """The non-empty (login, day) cells in long form, one column per series; see `from_daily`."""
+        rows, offsets = np.nonzero(self._touched)
+        table = pd.DataFrame({
+            "login": pd.Series(np.asarray(self.logins, dtype=object)[rows], dtype="string"),
+            "day": ((self.start - _EPOCH_DATE).days + offsets).astype(np.int32),
+        })
+        for name in SERIES:
+            table[name] = self._daily[name][rows, offsets]
+        return table
+
+    def _index(self, day: date) -> int:
+        return min(max((day - self.start).days, 0), self.days - 1)
+
+    def _range(self, start: Optional[date], end: Optional[date]) -> Tuple[int, int]:
+        start, end = start or self.start, end or self.end
+        if start > end:
+            raise ValueError(f"start {start} is after end {end}")
+        return self._index(start), self._index(end)
+
+    def totals(self, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, np.ndarray]:
+        """Activity per contributor between `start` and `end` (inclusive dates)."""
+        a, b = self._range(start, end)
+        return {name: p[:, b + 1] - p[:, a] for name, p in self.prefix.items()}
+
+    def decayed_totals(self, half_life_days: float, start: Optional[date] = None,
+                       end: Optional[date] = None) -> Dict[str, np.ndarray]:
+        """Activity between `start` and `end`, each day weighted by 0.5 ** (days before `end` / half-life)."""
+        if half_life_days <= 0:
+            raise ValueError("half_life_days must be positive")
+        if self.days / half_life_days > _MAX_DECAY_EXPONENT:
+            raise ValueError(f"half-life too short for a {self.days}-day timeline")
+        if half_life_days not in self._decayed:
+            growth = np.exp2(np.arange(self.days) / half_life_days)
+            self._decayed[half_life_days] = {
+                name: np.concatenate([np.zeros((len(self.logins), 1)), np.cumsum(daily * growth, axis=1)], axis=1)
+                for name, daily in self._daily.items()
+            }
+        a, b = self._range(start, end)
+        scale = np.exp2(-b / half_life_days)
+        return {name: (p[:, b + 1] - p[:, a]) * scale for name, p in self._decayed[half_life_days].items()}
+
+    def scores(self, start: Optional[date] = None, end: Optional[date] = None,
+               half_life_days: Optional[float] = None) -> pd.DataFrame:
+        """
+        Stage 2 components and total for the range (optionally decayed), indexed by
+        login, plus the activity counts. `impact_score` applies the stored Stage 3
+        multipliers.
+        """
+        t = self.decayed_totals(half_life_days, start, end) if half_life_days else self.totals(start, end)
+        scores = score_components(t["reviews"], t["lines"], np.zeros(len(self.logins)),
+                                  t["issues_closed"], t["issue_interactions"], t["credit"])
+        scores["impact_score"] = scores["total"] * self.multipliers
+        for name in ("merged", "reviews", "lines"):
+            scores[name] = t[name]
+        scores.index = pd.Index(self.logins, name="login")
+        return scores.sort_values("impact_score", ascending=False)
@@ -0,0 +1,126 @@
+"""
+Offline Stage 1 benchmark.
+
+Runs `fetch_stage_1_volume` against the local GitHub stand-in (stub_github.py)
+once per fetch strategy and reports API calls, wall time and throughput, so
+Stage 1 changes can be compared reproducibly without a token or network.
+
+    python bench.py --items 300 --latency 0.05
+    python bench.py --fixture impact_data.json --strategies rest-8,graphql
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import github_transport
+import main
+from http_cache import ResponseCache
+from rate_limit import RateLimitScheduler
+from stub_github import Fixture, StubGitHub, synthetic_fixture
+
+
+@dataclass
+class Strategy:
+    name: str
+    backend: str = "rest"
+    workers: int = 1
+    scheduler: bool = False
+    cache: bool = False       # runs twice; the second (warm) pass is reported
+
+
+STRATEGIES: Dict[str, Strategy] = {s.name: s for s in [
+    Strategy("rest-serial"),
+    Strategy("rest-8", workers=8),
+    Strategy("rest-8-scheduler", workers=8, scheduler=True),
+    Strategy("rest-8-cache-warm", workers=8, scheduler=True, cache=True),
+    Strategy("graphql", backend="graphql", scheduler=True),
+]}
+DEFAULT_STRATEGIES = ["rest-8", "rest-8-scheduler", "rest-8-cache-warm", "graphql"]
+
+
+def run_strategy(stub: StubGitHub, strategy: Strategy, limit: Optional[int], days: int,
+                 tokens: List[str], max_rps: Optional[float], cache_dir: str) -> dict:
+    cache = ResponseCache(os.path.join(cache_dir, f"{strategy.name}.sqlite")) if strategy.cache else None
+    passes = 2 if strategy.cache else 1
+    try:
+        for _ in range(passes):
+            scheduler = RateLimitScheduler(tokens, max_rps=max_rps) if strategy.scheduler else None
+            github_transport.configure(cache=cache, scheduler=scheduler)
+            stub.reset()
+            start = time.perf_counter()
+            # Stage 1 is chatty (progress lines); keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                prs, issues, _ = main.fetch_stage_1_volume(
+                    days=days, limit=limit, workers=strategy.workers, backend=strategy.backend
+                )
+            elapsed = time.perf_counter() - start
+    finally:
+        github_transport.configure()
+        if cache:
+            cache.close()
+    calls = dict(stub.calls)
+    requests = sum(v for k, v in calls.items() if k != "not_modified")
+    items = len(prs) + len(issues)
+    return {
+        "strategy": strategy.name,
+        "items": items,
+        "requests": requests,
+        "not_modified": calls.get("not_modified", 0),
+        "rate_limited": calls.get("rate_limited", 0),
+        "seconds": elapsed,
+        "items_per_s": items / elapsed if elapsed else 0.0,
+        "requests_per_s": requests / elapsed if elapsed else 0.0,
+    }
+
+
+def print_report(results: List[dict]):
+    print(f"\n{'strategy':<20} {'items':>6} {'requests':>9} {'304s':>6} {'403s':>5} {'seconds':>8} {'items/s':>8} {'req/s':>7}")
+    for r in results:
+        print(f"{r['strategy']:<20} {r['items']:>6} {r['requests']:>9} {r['not_modified']:>6} {r['rate_limited']:>5} "
+              f"{r['seconds']:>8.2f} {r['items_per_s']:>8.1f} {r['requests_per_s']:>7.1f}")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Stage 1 fetch strategies against a local GitHub stub")
+    parser.add_argument("--fixture", help="Saved fixture or impact_data.json snapshot (default: synthetic)")
+    parser.add_argument("--items", type=int, default=300, help="Synthetic listing size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=None, help="Stage 1 item limit (default: everything)")
+    parser.add_argument("--days", type=int, default=main.WINDOW_DAYS)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every stub response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=5000, help="Stub quota per token per window")
+    parser.add_argument("--tokens", type=int, default=1, help="Dummy tokens in the scheduler's pool")
+    parser.add_argument("--max-rps", type=float, default=None, help="Scheduler pacing cap per token (default: none)")
+    parser.add_argument("--strategies", default=",".join(DEFAULT_STRATEGIES),
+                        help=f"Comma-separated subset of: {', '.join(STRATEGIES)}")
+    args = parser.parse_args(argv)
+
+    fixture = Fixture.load(args.fixture) if args.fixture else synthetic_fixture(args.items, seed=args.seed)
+    days = args.days
+    if args.fixture:
+        # Recorded fixtures are old; widen the window so everything in them is in range
+        days = 36500
+    tokens = [f"stub-token-{i}" for i in range(max(args.tokens, 1))]
+
+    with StubGitHub(fixture, latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                    seed=args.seed) as stub, tempfile.TemporaryDirectory() as cache_dir:
+        # Never send real credentials to the stub
+        main.GITHUB_BASE_URL = stub.url
+        main.REPO_NAME = fixture.repo
+        main.GITHUB_TOKEN, main.GITHUB_TOKENS = tokens[0], tokens
+        print(f"Stub GitHub at {stub.url}: {len(fixture.items)} items, {args.latency * 1000:.0f} ms latency")
+        results = [
+            run_strategy(stub, STRATEGIES[name.strip()], args.limit, days, tokens, args.max_rps, cache_dir)
+            for name in args.strategies.split(",")
+        ]
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main_cli()
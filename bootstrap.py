@@ -0,0 +1,140 @@
+"""
+Bootstrap confidence intervals for impact scores and ranks.
+
+Uses the Poisson bootstrap: every PR, review and issue event gets an independent
+Poisson(1) weight per resample, which approximates resampling with replacement
+without building resampled datasets. PRs are sorted by author once, so a single
+np.add.reduceat turns (PRs x resamples) weights into (contributors x resamples)
+credit and line totals. Reviews and issue events only count, and a sum of k
+Poisson(1) weights is Poisson(k), so those totals are drawn per contributor
+directly. Every resample is then scored with the Stage 2 formulas at once.
+Stage 3 quality multipliers are held fixed; the LLM is not re-run.
+"""
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from compact import CompactSnapshot
+from models import ContributorImpact, IssueActivity, PullRequest
+from scoring import COMPONENT_SCALES, PR_CREDIT, pr_type_multipliers
+from sensitivity import average_ranks
+
+BOOTSTRAP_SAMPLES = int(os.getenv("BOOTSTRAP_SAMPLES", "1000"))
+BOOTSTRAP_CONFIDENCE = 0.95
+_CHUNK = 200  # resamples drawn and scored at a time
+
+
+class _Units:
+    """Resampled units with per-unit values (PRs), sorted by contributor row."""
+
+    def __init__(self, rows: List[int], **columns):
+        rows = np.asarray(rows, dtype=np.int64)
+        order = np.argsort(rows, kind="stable")
+        self.rows = rows[order]
+        self.columns = {name: np.asarray(values, dtype=float)[order] for name, values in columns.items()}
+        self.starts = np.flatnonzero(np.r_[True, self.rows[1:] != self.rows[:-1]]) if len(self.rows) else self.rows
+
+    def totals(self, weights: np.ndarray, n: int) -> Dict[str, np.ndarray]:
+        """Weighted per-contributor sums of every column, each (n x resamples)."""
+        out = {}
+        for name, values in self.columns.items():
+            summed = np.zeros((n, weights.shape[1]))
+            if len(self.rows):
+                summed[self.rows[self.starts]] = np.add.reduceat(values[:, None] * weights, self.starts, axis=0)
+            out[name] = summed
+        return out
+
+
+def bootstrap_intervals(contributors: Dict[str, ContributorImpact], prs: List[PullRequest],
+                        issues: List[IssueActivity], samples: int = BOOTSTRAP_SAMPLES,
+                        confidence: float = BOOTSTRAP_CONFIDENCE, seed: int = 0) -> pd.DataFrame:
+    """
+    Percentile intervals of each human contributor's impact score and rank (1 =
+    top) over `samples` Poisson resamples of their PRs, reviews and issue events.
+    Returns a DataFrame indexed by login with impact_ci_low/high and rank_ci_low/high.
+    """
+    humans = [c for c in contributors.values() if not c.login.endswith('[bot]')]
+    row_of = {c.login: i for i, c in enumerate(humans)}
+    authored = [p for p in prs if p.user_login in row_of]
+    events = [i for i in issues if i.user_login in row_of]
+    return _intervals(
+        [c.login for c in humans],
+        np.array([c.ai_multiplier if c.ai_multiplier is not None else 1.0 for c in humans]),
+        pr_rows=[row_of[p.user_login] for p in authored],
+        pr_titles=[p.title for p in authored],
+        pr_merged=np.array([bool(p.merged_at) for p in authored], dtype=bool),
+        pr_lines=[p.additions + p.deletions for p in authored],
+        review_rows=[row_of[r.user_login] for p in prs for r in p.reviews if r.user_login in row_of],
+        event_rows=[row_of[i.user_login] for i in events],
+        event_closed=[i.event_type == "closed" for i in events],
+        samples=samples, confidence=confidence, seed=seed,
+    )
+
+
+def snapshot_intervals(snap: CompactSnapshot, samples: int = BOOTSTRAP_SAMPLES,
+                       confidence: float = BOOTSTRAP_CONFIDENCE, seed: int = 0) -> pd.DataFrame:
+    """bootstrap_intervals for the contributors of a compact snapshot, straight from its columns."""
+    contributors = snap.contributors
+    human = ~contributors["login"].str.endswith("[bot]").to_numpy(dtype=bool)
+    human_row = np.full(len(contributors) + 1, -1, dtype=np.int64)  # last slot: logins without a row
+    human_row[np.flatnonzero(human)] = np.arange(human.sum())
+    row_of = human_row[snap.contributor_rows()]  # login code -> human row, -1 otherwise
+    pr_rows, review_rows, event_rows = row_of[snap.author], row_of[snap.review_author], row_of[snap.issue_author]
+    authored = np.flatnonzero(pr_rows >= 0)
+    events = event_rows >= 0
+    return _intervals(
+        contributors["login"].to_numpy(dtype=object)[human].tolist(),
+        contributors["ai_multiplier"].fillna(1.0).to_numpy(dtype=float)[human],
+        pr_rows=pr_rows[authored],
+        pr_titles=snap.title.take(authored),
+        pr_merged=snap.merged[authored],
+        pr_lines=snap.additions[authored] + snap.deletions[authored],
+        review_rows=review_rows[review_rows >= 0],
+        event_rows=event_rows[events],
+        event_closed=snap.issue_closed[events],
+        samples=samples, confidence=confidence, seed=seed,
+    )
+
+
+def _intervals(logins: List[str], multipliers: np.ndarray, pr_rows, pr_titles, pr_merged: np.ndarray, pr_lines,
+               review_rows, event_rows, event_closed, samples: int, confidence: float, seed: int) -> pd.DataFrame:
+    # Units are given as contributor rows into `logins`
+    n = len(logins)
+    columns = ["impact_ci_low", "impact_ci_high", "rank_ci_low", "rank_ci_high"]
+    if n == 0 or samples <= 0:
+        return pd.DataFrame(columns=columns, index=pd.Index(logins, name="login"), dtype=float)
+
+    credit = PR_CREDIT * pr_type_multipliers(pr_titles)
+    credit[~pr_merged] = 0.0
+    pr_units = _Units(pr_rows, credit=credit, lines=pr_lines)
+    reviews = np.bincount(np.asarray(review_rows, dtype=np.int64), minlength=n)
+    event_rows = np.asarray(event_rows, dtype=np.int64)
+    event_closed = np.asarray(event_closed, dtype=bool)
+    closed = np.bincount(event_rows[event_closed], minlength=n)
+    opened = np.bincount(event_rows[~event_closed], minlength=n)
+
+    rng = np.random.default_rng(seed)
+    scores, ranks = [], []
+    for start in range(0, samples, _CHUNK):
+        size = min(_CHUNK, samples - start)
+        t = pr_units.totals(rng.poisson(1.0, size=(len(pr_units.rows), size)).astype(float), n)
+        issue_points = rng.poisson(closed[:, None], size=(n, size)) * 5 + rng.poisson(opened[:, None], size=(n, size))
+        total = (np.log1p(t["credit"]) * COMPONENT_SCALES["shipping_score"]
+                 + np.log1p(rng.poisson(reviews[:, None], size=(n, size))) * COMPONENT_SCALES["review_score"]
+                 + np.log10(1 + t["lines"]) * COMPONENT_SCALES["volume_score"]
+                 + np.log1p(issue_points) * COMPONENT_SCALES["issue_score"]) * multipliers[:, None]
+        scores.append(total)
+        ranks.append(n + 1 - average_ranks(total))
+    scores, ranks = np.hstack(scores), np.hstack(ranks)
+
+    tail = (1 - confidence) / 2 * 100
+    impact_low, impact_high = np.percentile(scores, [tail, 100 - tail], axis=1)
+    rank_low, rank_high = np.percentile(ranks, [tail, 100 - tail], axis=1)
+    return pd.DataFrame({
+        "impact_ci_low": impact_low,
+        "impact_ci_high": impact_high,
+        "rank_ci_low": rank_low,
+        "rank_ci_high": rank_high,
+    }, index=pd.Index(logins, name="login"))
@@ -0,0 +1,89 @@
+"""
+Stage 1 checkpointing.
+
+Long fetches periodically persist the partial PRs, issues and contributor totals
+together with the pagination position, so a crash at item 280 of 300 resumes
+from the last checkpoint instead of refetching everything.
+"""
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from models import PullRequest, IssueActivity, ContributorImpact
+
+DEFAULT_CHECKPOINT_PATH = ".stage1_checkpoint.json"
+DEFAULT_CHECKPOINT_EVERY = 50
+
+
+@dataclass
+class Stage1State:
+    cutoff_date: datetime
+    position: int           # records consumed from the listing
+    cursor: Any             # backend-specific resume cursor (GraphQL endCursors)
+    complete: bool
+    prs: List[PullRequest]
+    issue_activities: List[IssueActivity]
+    contributors: Dict[str, ContributorImpact]
+
+
+class Stage1Checkpoint:
+    """
+    `run` identifies the fetch (repo, backend, limit, ...); a checkpoint is only
+    resumed by a run with identical parameters. `started_at` is the original run's
+    start, which a resumed run keeps as its watermark.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH, every: int = DEFAULT_CHECKPOINT_EVERY,
+                 resume: bool = False, started_at: Optional[datetime] = None):
+        self.path = path
+        self.every = max(every, 1)
+        self.resume = resume
+        self.started_at = started_at
+
+    def load(self, run: Dict[str, Any]) -> Optional[Stage1State]:
+        if not self.resume:
+            return None
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            print("No Stage 1 checkpoint found; starting from scratch.")
+            return None
+        if data["run"] != run:
+            print(f"Ignoring Stage 1 checkpoint from a different run: {data['run']}")
+            return None
+        if data["started_at"]:
+            self.started_at = datetime.fromisoformat(data["started_at"])
+        return Stage1State(
+            cutoff_date=datetime.fromisoformat(data["cutoff_date"]),
+            position=data["position"],
+            cursor=data["cursor"],
+            complete=data["complete"],
+            prs=[PullRequest.model_validate(p) for p in data["prs"]],
+            issue_activities=[IssueActivity.model_validate(i) for i in data["issue_activities"]],
+            contributors={c["login"]: ContributorImpact.model_validate(c) for c in data["contributors"]},
+        )
+
+    def save(self, run: Dict[str, Any], state: Stage1State):
+        data = {
+            "run": run,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "cutoff_date": state.cutoff_date.isoformat(),
+            "position": state.position,
+            "cursor": state.cursor,
+            "complete": state.complete,
+            "prs": [p.model_dump(mode="json") for p in state.prs],
+            "issue_activities": [i.model_dump(mode="json") for i in state.issue_activities],
+            "contributors": [c.model_dump(mode="json") for c in state.contributors.values()],
+        }
+        # Write-then-rename so a crash mid-write never leaves a truncated checkpoint
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
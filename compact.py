@@ -0,0 +1,343 @@
+"""
+Compact array-backed snapshot.
+
+PRs, reviews and issue events are held as NumPy columns instead of pydantic models:
+- logins are integer codes into one shared vocabulary;
+- timestamps are int64 microseconds since the epoch, with NaT (int64 min) for
+  missing values, so `.view("datetime64[us]")` works;
+- additions, deletions and changed files are integer arrays;
+- each PR's reviews are a CSR slice, review_offsets[i]:review_offsets[i + 1],
+  of the flat review columns.
+
+Free text stays in Arrow string arrays, one buffer per column. Pydantic models are
+built only for the PRs a caller asks for, e.g. a single engineer's drill-down.
+A million PRs take a few hundred MB instead of several GB of model instances.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import storage
+from models import ImpactData, PullRequest, Review
+from scoring import QUALITY_WEIGHTS, quality_multiplier, raw_pr_credit, score_components
+
+NAT = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+LLM_DIMENSIONS = ("llm_substance_score", "llm_product_impact_score",
+                  "llm_technical_quality_score", "llm_blast_radius_score")
+
+
+def _micros(column: pd.Series) -> np.ndarray:
+    return pd.to_datetime(column, utc=True).dt.tz_convert(None).to_numpy().astype("datetime64[us]").view(np.int64)
+
+
+def _datetime(micros: int) -> Optional[datetime]:
+    return None if micros == NAT else _EPOCH + timedelta(microseconds=int(micros))
+
+
+def _text(column: pd.Series) -> pa.Array:
+    return pa.array(column, type=pa.string(), from_pandas=True)
+
+
+def _categories(column: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    codes, vocabulary = pd.factorize(column.astype(object))
+    return codes.astype(np.int8), np.asarray(vocabulary, dtype=object)
+
+
+def _places(rows: np.ndarray) -> np.ndarray:
+    """Each element's place (0, 1, ...) within its run of equal values in grouped `rows`."""
+    starts = np.flatnonzero(np.diff(rows, prepend=-1))
+    return np.arange(len(rows)) - np.repeat(starts, np.diff(np.append(starts, len(rows))))
+
+
+@dataclass
+class CompactSnapshot:
+    repo_name: str
+    cutoff_date: datetime
+    fetched_at: datetime
+    contributors: pd.DataFrame        # the contributor table as stored
+    logins: np.ndarray                # login code -> login
+    # PRs
+    number: np.ndarray
+    author: np.ndarray                # login codes
+    state: np.ndarray                 # codes into pr_states
+    pr_states: np.ndarray
+    created_at: np.ndarray
+    updated_at: np.ndarray
+    merged_at: np.ndarray
+    closed_at: np.ndarray
+    additions: np.ndarray
+    deletions: np.ndarray
+    changed_files: np.ndarray
+    title: pa.Array
+    html_url: pa.Array
+    llm_quality_score: np.ndarray     # NaN when not judged
+    llm_dimensions: np.ndarray        # (PRs x 4) int8, 0 when not judged
+    llm_reasoning: pa.Array
+    # Reviews, grouped by PR
+    review_offsets: np.ndarray
+    review_author: np.ndarray
+    review_state: np.ndarray
+    review_states: np.ndarray
+    review_submitted_at: np.ndarray
+    review_body: pa.Array
+    # Issue events
+    issue_number: np.ndarray
+    issue_author: np.ndarray
+    issue_closed: np.ndarray
+    issue_created_at: np.ndarray
+    issue_updated_at: np.ndarray
+    issue_title: pa.Array
+    issue_event: np.ndarray
+    issue_events: np.ndarray
+    issue_body: pa.Array
+    _codes: Dict[str, int] = field(default=None, repr=False)
+    _by_author: Tuple[np.ndarray, np.ndarray] = field(default=None, repr=False)
+
+    # --- Construction ---
+    @classmethod
+    def from_tables(cls, meta: dict, tables: Dict[str, pd.DataFrame]) -> "CompactSnapshot":
+        """From the Parquet tables written by storage.py, without building any models."""
+        prs, reviews, issues = tables["pull_requests"], tables["reviews"], tables["issues"]
+        contributors = tables["contributors"]
+        codes, logins = pd.factorize(pd.concat([
+            contributors["login"], prs["user_login"], reviews["user_login"], issues["user_login"],
+        ], ignore_index=True).astype(object))
+        codes = codes.astype(np.int32)
+        ends = np.cumsum([len(contributors), len(prs), len(reviews), len(issues)])
+
+        # Reviews are stored flat with their PR number; order them by PR position for CSR slicing
+        position = pd.Series(np.arange(len(prs)), index=prs["number"].to_numpy())
+        position = position[~position.index.duplicated(keep="last")]
+        review_pr = position.reindex(reviews["pr_number"].to_numpy()).to_numpy()
+        known = ~np.isnan(review_pr)
+        review_pr = review_pr[known].astype(np.int64)
+        order = np.argsort(review_pr, kind="stable")
+        kept = np.flatnonzero(known)[order]
+        reviews = reviews.iloc[kept].reset_index(drop=True)
+        review_offsets = np.concatenate([[0], np.cumsum(np.bincount(review_pr, minlength=len(prs)))]).astype(np.int64)
+
+        pr_state, pr_states = _categories(prs["state"])
+        review_state, review_states = _categories(reviews["state"])
+        issue_event, issue_events = _categories(issues["event_type"])
+        dimensions = np.stack([prs[d].fillna(0).to_numpy(dtype=np.int8) for d in LLM_DIMENSIONS], axis=1) \
+            if len(prs) else np.zeros((0, len(LLM_DIMENSIONS)), dtype=np.int8)
+        return cls(
+            repo_name=meta["repo_name"],
+            cutoff_date=datetime.fromisoformat(meta["cutoff_date"]),
+            fetched_at=datetime.fromisoformat(meta["fetched_at"]),
+            contributors=contributors,
+            logins=np.asarray(logins, dtype=object),
+            number=prs["number"].to_numpy(dtype=np.int64),
+            author=codes[ends[0]:ends[1]],
+            state=pr_state,
+            pr_states=pr_states,
+            created_at=_micros(prs["created_at"]),
+            updated_at=_micros(prs["updated_at"]),
+            merged_at=_micros(prs["merged_at"]),
+            closed_at=_micros(prs["closed_at"]),
+            additions=prs["additions"].to_numpy(dtype=np.int64),
+            deletions=prs["deletions"].to_numpy(dtype=np.int64),
+            changed_files=prs["changed_files"].to_numpy(dtype=np.int32),
+            title=_text(prs["title"]),
+            html_url=_text(prs["html_url"]),
+            llm_quality_score=prs["llm_quality_score"].to_numpy(dtype=float, na_value=np.nan),
+            llm_dimensions=dimensions,
+            llm_reasoning=_text(prs["llm_reasoning"]),
+            review_offsets=review_offsets,
+            review_author=codes[ends[1]:ends[2]][kept],
+            review_state=review_state,
+            review_states=review_states,
+            review_submitted_at=_micros(reviews["submitted_at"]),
+            review_body=_text(reviews["body"]),
+            issue_number=issues["issue_number"].to_numpy(dtype=np.int64),
+            issue_author=codes[ends[2]:ends[3]],
+            issue_closed=(issues["event_type"] == "closed").to_numpy(dtype=bool),
+            issue_created_at=_micros(issues["created_at"]),
+            issue_updated_at=_micros(issues["updated_at"]),
+            issue_title=_text(issues["title"]),
+            issue_event=issue_event,
+            issue_events=issue_events,
+            issue_body=_text(issues["body"]),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CompactSnapshot":
+        """From a Parquet directory or JSON export; trusted snapshots skip model validation."""
+        return cls.from_tables(*storage.load_tables(path))
+
+    @classmethod
+    def from_impact_data(cls, data: ImpactData) -> "CompactSnapshot":
+        meta = {"repo_name": data.repo_name, "cutoff_date": data.cutoff_date.isoformat(),
+                "fetched_at": data.fetched_at.isoformat()}
+        return cls.from_tables(meta, storage.to_tables(data))
+
+    def __len__(self) -> int:
+        return len(self.number)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the PR, review and issue columns."""
+        return sum(v.nbytes for v in vars(self).values() if isinstance(v, (np.ndarray, pa.Array)))
+
+    # --- Lookups ---
+    def code(self, login: str) -> int:
+        """The login's code, or -1 if it never appears."""
+        if self._codes is None:
+            self._codes = {login: i for i, login in enumerate(self.logins.tolist())}
+        return self._codes.get(login, -1)
+
+    def author_prs(self, login: str) -> np.ndarray:
+        """Positions of `login`'s PRs, in snapshot order."""
+        if self._by_author is None:
+            order = np.argsort(self.author, kind="stable")
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(self.author, minlength=len(self.logins)))])
+            self._by_author = (order, offsets)
+        code = self.code(login)
+        if code < 0:
+            return np.empty(0, dtype=np.int64)
+        order, offsets = self._by_author
+        return order[offsets[code]:offsets[code + 1]]
+
+    @property
+    def merged(self) -> np.ndarray:
+        return self.merged_at != NAT
+
+    def contributor_rows(self) -> np.ndarray:
+        """Login code -> row of `contributors`, -1 for logins without one."""
+        rows = np.full(len(self.logins), -1, dtype=np.int64)
+        rows[pd.Index(self.logins).get_indexer(self.contributors["login"])] = np.arange(len(self.contributors))
+        return rows
+
+    # --- Scoring ---
+    def score(self) -> pd.DataFrame:
+        """Stage 2 components of every contributor row, indexed by login, as score_contributors computes them."""
+        c = self.contributors
+        raw = raw_pr_credit(self.contributor_rows()[self.author], self.number, self.title, self.merged, len(c))
+        scores = score_components(*(c[name].to_numpy() for name in (
+            "reviews_given", "additions", "deletions", "issues_closed", "issue_interactions")), raw)
+        scores.index = pd.Index(c["login"].to_numpy(dtype=object), name="login")
+        return scores
+
+    def quality_scores(self, weights: Dict[str, float] = QUALITY_WEIGHTS) -> np.ndarray:
+        """scoring.pr_quality_score of every PR from its stored dimensions, NaN where any is missing."""
+        columns = [LLM_DIMENSIONS.index(name) for name in weights]
+        total = np.zeros(len(self))
+        for k, w in zip(columns, weights.values()):
+            total = total + self.llm_dimensions[:, k].astype(float) * w
+        total = total / sum(weights.values())
+        total[(self.llm_dimensions[:, columns] == 0).any(axis=1)] = np.nan
+        return total
+
+    def sample_positions(self, per_author: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Each contributor's Stage 3 sample: their `per_author` largest merged PRs by
+        additions + deletions, ties in snapshot order. Returns contributor rows, PR
+        positions and place in the sample (0 = largest), grouped by row.
+        """
+        rows = self.contributor_rows()[self.author]
+        positions = np.flatnonzero(self.merged & (rows >= 0))
+        size = self.additions[positions] + self.deletions[positions]
+        positions = positions[np.lexsort((-size, rows[positions]))]
+        rows = rows[positions]
+        place = _places(rows)
+        kept = place < per_author
+        return rows[kept], positions[kept], place[kept]
+
+    def average_quality(self, per_author: int) -> np.ndarray:
+        """Mean stored quality of each contributor's judged sample PRs, NaN for contributors with none."""
+        rows, positions, _ = self.sample_positions(per_author)
+        scores = self.llm_quality_score[positions]
+        judged = ~np.isnan(scores)
+        rows, scores = rows[judged], scores[judged]
+        # Added in sample order, one place at a time, so rounding matches the builtin sum
+        place = _places(rows)
+        total = np.zeros(len(self.contributors))
+        for k in range(place.max() + 1 if len(place) else 0):
+            at = place == k
+            total[rows[at]] += scores[at]
+        counts = np.bincount(rows, minlength=len(self.contributors))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, total / counts, np.nan)
+
+    def rescore(self, weights: Dict[str, float], per_author: int) -> Tuple[int, int]:
+        """
+        Recomputes PR quality from the stored judge dimensions, then each contributor's
+        multiplier and impact from their Stage 3 sample (`per_author` largest merged
+        PRs), and re-sorts the contributors by impact. PRs judged before dimensions
+        were stored keep their quality. Returns (PRs rescored, PRs that kept theirs).
+        """
+        quality = self.quality_scores(weights)
+        rescored = ~np.isnan(quality)
+        kept = ~rescored & ~np.isnan(self.llm_quality_score)
+        self.llm_quality_score = np.where(rescored, quality, self.llm_quality_score)
+
+        c = self.contributors.copy()
+        baseline = c["baseline_impact_score"].to_numpy(dtype=float)
+        multiplier = c["ai_multiplier"].to_numpy(dtype=float, na_value=np.nan)
+        # backward compat for old data
+        baseline = np.where(np.isnan(multiplier) & (baseline == 0), c["impact_score"].to_numpy(dtype=float), baseline)
+        avg_quality = self.average_quality(per_author)
+        applied = ~np.isnan(avg_quality)
+        multiplier = np.where(applied, quality_multiplier(avg_quality), multiplier)
+        c["baseline_impact_score"] = baseline
+        c["avg_quality_score"] = np.where(applied, avg_quality, c["avg_quality_score"].to_numpy(dtype=float, na_value=np.nan))
+        c["ai_multiplier"] = multiplier
+        c["impact_score"] = np.where(applied, baseline * multiplier, baseline)
+        self.contributors = c.iloc[np.argsort(-c["impact_score"].to_numpy(), kind="stable")].reset_index(drop=True)
+        return int(rescored.sum()), int(kept.sum())
+
+    # --- Materialization ---
+    def pull_requests(self, positions: Sequence[int]) -> List[PullRequest]:
+        """The PRs at `positions` as models, reviews included, gathering each column once."""
+        positions = np.asarray(positions, dtype=np.int64)
+        counts = self.review_offsets[positions + 1] - self.review_offsets[positions]
+        # Flat review rows of the selected PRs, in PR order
+        review_rows = np.repeat(self.review_offsets[positions] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        reviews = [
+            Review.model_construct(user_login=login, state=state, submitted_at=_datetime(submitted), body=body)
+            for login, state, submitted, body in zip(
+                self.logins[self.review_author[review_rows]].tolist(),
+                self.review_states[self.review_state[review_rows]].tolist(),
+                self.review_submitted_at[review_rows].tolist(),
+                self.review_body.take(review_rows).to_pylist(),
+            )
+        ]
+        bounds = np.concatenate([[0], np.cumsum(counts)]).tolist()
+        dimensions = self.llm_dimensions[positions].tolist()
+        columns = zip(
+            self.number[positions].tolist(),
+            self.title.take(positions).to_pylist(),
+            self.logins[self.author[positions]].tolist(),
+            self.pr_states[self.state[positions]].tolist(),
+            *(column[positions].tolist() for column in (self.created_at, self.updated_at, self.merged_at, self.closed_at)),
+            self.additions[positions].tolist(),
+            self.deletions[positions].tolist(),
+            self.changed_files[positions].tolist(),
+            self.html_url.take(positions).to_pylist(),
+            self.llm_quality_score[positions].tolist(),
+            self.llm_reasoning.take(positions).to_pylist(),
+        )
+        prs = []
+        for k, (number, title, login, state, created, updated, merged, closed,
+                additions, deletions, changed_files, html_url, quality, reasoning) in enumerate(columns):
+            prs.append(PullRequest.model_construct(
+                number=number, title=title, user_login=login, state=state,
+                created_at=_datetime(created), updated_at=_datetime(updated),
+                merged_at=_datetime(merged), closed_at=_datetime(closed),
+                additions=additions, deletions=deletions, changed_files=changed_files,
+                reviews=reviews[bounds[k]:bounds[k + 1]], html_url=html_url,
+                llm_quality_score=None if quality != quality else quality,  # NaN when not judged
+                llm_reasoning=reasoning,
+                **{name: v or None for name, v in zip(LLM_DIMENSIONS, dimensions[k])},
+            ))
+        return prs
+
+    def pull_request(self, i: int) -> PullRequest:
+        return self.pull_requests([i])[0]
+
+    def prs_by_author(self, login: str) -> List[PullRequest]:
+        return self.pull_requests(self.author_prs(login))
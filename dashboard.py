@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
-import json
 import math
+import os
+import sqlite3
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-from collections import defaultdict
-from models import ImpactData, ContributorImpact
+from snapshot_view import EngineerIndex, SnapshotView, StaleSnapshotError
+import storage
+from store import DEFAULT_STORE_PATH, ImpactStore
 
 st.set_page_config(
     page_title="PostHog Impact Stories",
@@ -429,16 +431,84 @@ def inject_css():
 # ---------------------------------------------------------------------------
 # Data loading
 # ---------------------------------------------------------------------------
-@st.cache_data
-def load_data():
+DATA_FILE = "impact_data.json"
+SNAPSHOT_POLL_SECONDS = float(os.getenv("SNAPSHOT_POLL_SECONDS", "30"))  # 0 = only check on interaction
+
+
+def snapshot_version():
+    """
+    (path, mtime) of the newest snapshot, or None. Every cache below is keyed on it, so
+    when main.py writes a new snapshot the next rerun loads it and rebuilds what derives from it.
+    """
+    path = storage.latest_snapshot_path(DATA_FILE)
+    if not path:
+        return None
+    marker = os.path.join(path, "meta.json") if os.path.isdir(path) else path
+    return path, storage.file_mtime(marker)
+
+
+@st.cache_resource(max_entries=1)
+def load_data(version):
+    # Parquet tables when the pipeline wrote them, else the JSON export. Shared across
+    # reruns rather than copied; contributor data is loaded up front, PRs per engineer on
+    # demand. Snapshots whose checksummed header matches are read without model validation.
     try:
-        with open("impact_data.json", "r") as f:
-            data = json.load(f)
-        return ImpactData(**data)
+        return SnapshotView.open(version[0])
     except FileNotFoundError:
         return None
 
 
+@st.cache_resource(max_entries=1)
+def contributor_frame(version, _data):
+    """Contributors by impact, highest first. Shared across reruns, so read-only."""
+    return _data.contributors.sort_values(by="impact_score", ascending=False).reset_index(drop=True)
+
+
+@st.cache_resource(max_entries=1)
+def contributor_rows(version, _df):
+    """login -> row dict, so the drill-down doesn't filter the frame on every click."""
+    return {row["login"]: row for row in _df.to_dict("records")}
+
+
+@st.cache_resource(max_entries=1)
+def _open_store(path: str, mtime: float):
+    return ImpactStore(path)
+
+
+def get_store(data):
+    """The indexed SQLite store for `data`, or None if it's missing or from another run."""
+    try:
+        store = _open_store(DEFAULT_STORE_PATH, storage.file_mtime(DEFAULT_STORE_PATH) or 0)
+        if store.meta().get("fetched_at") == data.fetched_at.isoformat():
+            return store
+    except sqlite3.Error:
+        pass
+    return None
+
+
+@st.cache_resource(max_entries=1)
+def engineer_index(version, _data, _df):
+    """Per-engineer PR lists and radar reference rows, built once per snapshot (gallery engineers up front)."""
+    def fetch(login):
+        store = get_store(_data)
+        # Indexed lookup by author; without a matching store, the snapshot's own per-author read
+        return store.prs_by_author(login) if store else _data.prs_by_author(login)
+    return EngineerIndex(_df, fetch, preload=_df["login"].head(5).tolist())
+
+
+@st.cache_resource(max_entries=1)
+def load_timeline(version, _data):
+    """Daily activity prefix sums, built once per snapshot."""
+    return _data.timeline()
+
+
+@st.fragment(run_every=SNAPSHOT_POLL_SECONDS or None)
+def watch_snapshot(version):
+    """Reruns the app when main.py has written a newer snapshot, without waiting for a click."""
+    if snapshot_version() != version:
+        st.rerun()
+
+
 # ---------------------------------------------------------------------------
 # Helper: plotly light theme
 # ---------------------------------------------------------------------------
@@ -456,9 +526,14 @@ PLOTLY_LAYOUT = dict(
 # Section builders
 # ---------------------------------------------------------------------------
 def render_hero(data):
-    total_prs = len(data.pull_requests)
-    total_reviews = sum(c.reviews_given for c in data.contributor_metrics)
-    active_engineers = len(data.contributor_metrics)
+    store = get_store(data)
+    if store:
+        totals = store.summary()
+        total_prs, total_reviews, active_engineers = totals["prs"], totals["reviews"], totals["contributors"]
+    else:
+        total_prs = len(data)
+        total_reviews = int(data.contributors["reviews_given"].sum())
+        active_engineers = len(data.contributors)
 
     st.markdown(f"""
     <div class="hero-section">
@@ -583,6 +658,17 @@ def render_engineer_gallery(df, data):
         else:
             delta_html = ""
 
+        # Bootstrap intervals: overlapping ranks mean the ordering is within noise
+        rank_low, rank_high = _stored(row, "rank_ci_low"), _stored(row, "rank_ci_high")
+        if rank_low is not None and rank_high is not None:
+            rank_range = f"#{rank_low:.0f}" if round(rank_low) == round(rank_high) else f"#{rank_low:.0f}–{rank_high:.0f}"
+            ci_html = (
+                f'<div class="handle" title="95% bootstrap interval over resampled PRs, reviews and issues">'
+                f'Rank {rank_range} · {_stored(row, "impact_ci_low"):.0f}–{_stored(row, "impact_ci_high"):.0f} pts</div>'
+            )
+        else:
+            ci_html = ""
+
         with cols[idx]:
             st.markdown(f"""
             <div class="eng-card">
@@ -596,6 +682,7 @@ def render_engineer_gallery(df, data):
                 <img class="avatar" src="{row['avatar_url']}" alt="{row['login']}"/>
                 <div class="name">{row['login']}</div>
                 <div class="handle"><a href="{row['html_url']}" target="_blank" style="color: #999; text-decoration: none;">View Profile</a></div>
+                {ci_html}
                 <div class="stats-row">
                     <div class="stat">
                         <div class="stat-val">{row['prs_merged']}</div>
@@ -700,6 +787,14 @@ def render_radar_chart(engineer_row, avg_row, top5_max_row):
     return fig
 
 
+def _stored(row, key):
+    """A precomputed score from the snapshot, or None for snapshots written before it was stored."""
+    value = row.get(key)
+    if value is None or pd.isna(value):
+        return None
+    return float(value)
+
+
 def render_impact_breakdown(engineer_row):
     """Visual impact score breakdown as a horizontal stacked bar with labeled segments."""
     prs = engineer_row.get("prs_merged", 0)
@@ -712,8 +807,10 @@ def render_impact_breakdown(engineer_row):
         baseline = total_impact  # backward compat for old data
 
     # Compute multiplier and delta
-    if baseline > 0 and total_impact != baseline:
+    multiplier_val = _stored(engineer_row, "ai_multiplier")
+    if multiplier_val is None and baseline > 0:
         multiplier_val = total_impact / baseline
+    if baseline > 0 and multiplier_val is not None and total_impact != baseline:
         delta_pct = ((total_impact - baseline) / baseline) * 100
         delta_sign = "+" if delta_pct > 0 else ""
         delta_color = "#059669" if delta_pct > 0 else "#DC2626"
@@ -725,20 +822,25 @@ def render_impact_breakdown(engineer_row):
     else:
         multiplier_badge = '<span style="font-size: 0.8rem; color: #999;">No AI adjustment</span>'
 
-    # Decompose using the actual formula from main.py (log-normalized value-based model)
-    # These mirror calculate_baseline_metrics() exactly
-    issues_closed = engineer_row.get("issues_closed", 0)
-    issue_interactions = engineer_row.get("issue_interactions", 0)
-    
-    # Shipping: log(1 + type_weighted_pr_value) * 15 — approximate with average multiplier
-    shipping_pts = math.log(1 + prs * 10) * 15 if prs > 0 else 0
-    # Reviews: log(1 + reviews) * 30
-    review_pts = math.log(1 + reviews) * 30 if reviews > 0 else 0
-    # Code Volume: log10(1 + lines) * 8
-    volume_pts = math.log10(1 + lines) * 8 if lines > 0 else 0
-    # Issues: log(1 + closed*5 + opened*1) * 10
-    raw_issue = (issues_closed * 5) + (max(issue_interactions - issues_closed, 0) * 1)
-    issue_pts = math.log(1 + raw_issue) * 10 if issue_interactions > 0 else 0
+    # Exact components stored by calculate_baseline_metrics()
+    shipping_pts = _stored(engineer_row, "shipping_score")
+    review_pts = _stored(engineer_row, "review_score")
+    volume_pts = _stored(engineer_row, "volume_score")
+    issue_pts = _stored(engineer_row, "issue_score")
+    if shipping_pts is None:
+        # Older snapshots: approximate with the same log-normalized formulas
+        issues_closed = engineer_row.get("issues_closed", 0)
+        issue_interactions = engineer_row.get("issue_interactions", 0)
+
+        # Shipping: log(1 + type_weighted_pr_value) * 15 — approximate with average multiplier
+        shipping_pts = math.log(1 + prs * 10) * 15 if prs > 0 else 0
+        # Reviews: log(1 + reviews) * 30
+        review_pts = math.log(1 + reviews) * 30 if reviews > 0 else 0
+        # Code Volume: log10(1 + lines) * 8
+        volume_pts = math.log10(1 + lines) * 8 if lines > 0 else 0
+        # Issues: log(1 + closed*5 + opened*1) * 10
+        raw_issue = (issues_closed * 5) + (max(issue_interactions - issues_closed, 0) * 1)
+        issue_pts = math.log(1 + raw_issue) * 10 if issue_interactions > 0 else 0
 
     components = [
         ("Shipping PRs", shipping_pts, "#6B5CE7"),
@@ -824,27 +926,25 @@ def render_impact_breakdown(engineer_row):
     """, unsafe_allow_html=True)
 
 
-def render_engineer_drilldown(login, df, data):
+@st.cache_resource(max_entries=64)
+def radar_figure(version, login, _row, _avg_row, _top5_max_row):
+    return render_radar_chart(_row, _avg_row, _top5_max_row)
+
+
+def render_engineer_drilldown(login, df, data, version):
     """Full drill-down panel for selected engineer."""
-    row = df[df["login"] == login].iloc[0].to_dict()
-    user_prs = [p for p in data.pull_requests if p.user_login == login]
-    merged_prs = [p for p in user_prs if p.merged_at]
+    row = contributor_rows(version, df)[login]
+    try:
+        index = engineer_index(version, data, df)
+        engineer = index[login]
+    except StaleSnapshotError:
+        # main.py is mid-write; watch_snapshot reruns with the new snapshot once its header lands
+        st.info("A newer snapshot is being written. This engineer's story will refresh in a moment.")
+        return
+    merged_prs = engineer.merged
 
-    # Compute top-5 averages and max for radar (consistent scale across all engineers)
-    top5 = df.head(5)
-    avg_row = {
-        "prs_merged": top5["prs_merged"].mean(),
-        "reviews_given": top5["reviews_given"].mean(),
-        "lines": (top5["additions"] + top5["deletions"]).mean(),
-        "avg_quality_score": top5["avg_quality_score"].mean(),
-        "issue_interactions": top5["issue_interactions"].mean() if "issue_interactions" in top5.columns else 0,
-    }
-    top5_max_row = {
-        "prs_merged": top5["prs_merged"].max(),
-        "reviews_given": top5["reviews_given"].max(),
-        "lines": (top5["additions"] + top5["deletions"]).max(),
-        "issue_interactions": top5["issue_interactions"].max() if "issue_interactions" in top5.columns else 1,
-    }
+    # Top-5 averages and max for the radar (consistent scale across all engineers)
+    avg_row, top5_max_row = index.avg_row, index.max_row
 
     # --- Start of grouped engineer panel ---
     st.markdown(f"""
@@ -877,28 +977,26 @@ def render_engineer_drilldown(login, df, data):
 
         col_radar, col_breakdown = st.columns(2)
         with col_radar:
-            fig_radar = render_radar_chart(row, avg_row, top5_max_row)
+            fig_radar = radar_figure(version, login, row, avg_row, top5_max_row)
             st.plotly_chart(fig_radar, use_container_width=True)
         with col_breakdown:
             render_impact_breakdown(row)
 
         # Timeline of merged PRs (inside the same panel)
         if merged_prs:
+            judged_note = f" · {engineer.judged} AI-rated, avg {engineer.avg_quality:.1f}" if engineer.judged else ""
             st.markdown(f"""
             <div style="margin-top: 28px; padding-top: 20px; border-top: 1px solid #EDE9FE;">
                 <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 16px;">
                     {doodle("git_pr", 22, "#6B5CE7")}
                     <span style="font-size: 1.15rem; font-weight: 700; color: #1A1A2E;">PR Timeline</span>
-                    <span style="font-size: 0.8rem; color: #999; background: #F3F4F6; padding: 2px 10px; border-radius: 12px;">{len(merged_prs)} merged</span>
+                    <span style="font-size: 0.8rem; color: #999; background: #F3F4F6; padding: 2px 10px; border-radius: 12px;">{len(merged_prs)} merged{judged_note}</span>
                 </div>
             </div>
             """, unsafe_allow_html=True)
 
-            # Sort PRs by merge date (most recent first)
-            sorted_prs = sorted(merged_prs, key=lambda x: str(x.merged_at), reverse=True)
-            
-            # Display as beautiful timeline cards
-            for idx, pr in enumerate(sorted_prs):
+            # Display as beautiful timeline cards, most recently merged first
+            for idx, pr in enumerate(merged_prs):
                 # Parse the merged date
                 try:
                     if hasattr(pr.merged_at, 'strftime'):
@@ -981,7 +1079,7 @@ def render_engineer_drilldown(login, df, data):
             st.info("No merged PRs found for this engineer in the data window.")
 
         # All PRs (including open/closed) as detail cards
-        non_merged = [p for p in user_prs if not p.merged_at]
+        non_merged = engineer.other
         if non_merged:
             with st.expander(f"Other PRs ({len(non_merged)} open/closed)"):
                 for pr in non_merged:
@@ -991,7 +1089,146 @@ def render_engineer_drilldown(login, df, data):
 
 
 
-def render_analytics_tabs(df, data):
+def quality_matrix_figure(df):
+    """Quality vs velocity quadrants, or None without AI quality scores."""
+    # 1. New Quadrant Chart: Quality vs Velocity
+    plot_df = df[df["avg_quality_score"] > 0].copy()
+    if plot_df.empty:
+        return None
+    med_prs = plot_df["prs_merged"].median()
+    med_quality = plot_df["avg_quality_score"].median()
+
+    # Define Quadrants
+    fig = px.scatter(
+        plot_df, x="prs_merged", y="avg_quality_score",
+        size="impact_score", hover_name="login",
+        color="impact_score",
+        color_continuous_scale=["#E8E0FF", "#6B5CE7"],
+        labels={"prs_merged": "Velocity (PRs Merged)", "avg_quality_score": "Quality (AI Score)"},
+        title="The Engineering Matrix: Speed vs Substance",
+    )
+
+    # Add colored backdrop zones
+    x_max = plot_df["prs_merged"].max() * 1.1
+    y_max = 5.2
+
+    # Top Right: Legendary (High Speed, High Quality)
+    fig.add_shape(type="rect", x0=med_prs, y0=med_quality, x1=x_max, y1=y_max, 
+                  fillcolor="rgba(52, 211, 153, 0.1)", layer="below", line_width=0)
+    fig.add_annotation(x=x_max*0.9, y=y_max*0.95, text="LEGENDARY", showarrow=False, 
+                       font=dict(color="#059669", size=14, weight="bold"))
+
+    # Top Left: Craftsmen (Low Speed, High Quality)
+    fig.add_shape(type="rect", x0=0, y0=med_quality, x1=med_prs, y1=y_max, 
+                  fillcolor="rgba(96, 165, 250, 0.1)", layer="below", line_width=0)
+    fig.add_annotation(x=med_prs*0.2, y=y_max*0.95, text="CRAFTSPEOPLE", showarrow=False, 
+                       font=dict(color="#2563EB", size=14, weight="bold"))
+
+    # Bottom Right: Hustlers (High Speed, Low Quality)
+    fig.add_shape(type="rect", x0=med_prs, y0=1, x1=x_max, y1=med_quality, 
+                  fillcolor="rgba(251, 191, 36, 0.1)", layer="below", line_width=0)
+    fig.add_annotation(x=x_max*0.9, y=1.2, text="HUSTLERS", showarrow=False, 
+                       font=dict(color="#D97706", size=14, weight="bold"))
+
+    fig.update_layout(**PLOTLY_LAYOUT, height=500, xaxis=dict(range=[0, x_max]), yaxis=dict(range=[1, 5.2]))
+    return fig
+
+
+def helpers_figure(df):
+    """Reviews given vs PRs shipped for the ten most review-heavy engineers, or None without reviews."""
+    # 2. Unsung Heroes: Diverging Bar / Ratio
+    hero_df = df[df["reviews_given"] > 0].copy()
+    if hero_df.empty:
+        return None
+    # Calculate Helpfulness Ratio
+    hero_df["helpfulness_ratio"] = hero_df["reviews_given"] / hero_df["prs_merged"].clip(lower=1)
+    hero_df = hero_df.sort_values("helpfulness_ratio", ascending=True).tail(10) # Top 10 helpful
+
+    fig = go.Figure()
+
+    # PRs (Left side, negative)
+    fig.add_trace(go.Bar(
+        y=hero_df["login"],
+        x=hero_df["prs_merged"] * -1,
+        name="PRs Shipped",
+        orientation='h',
+        marker_color="#D1D5DB",
+        text=hero_df["prs_merged"],
+        textposition="auto"
+    ))
+
+    # Reviews (Right side, positive)
+    fig.add_trace(go.Bar(
+        y=hero_df["login"],
+        x=hero_df["reviews_given"],
+        name="Reviews Given",
+        orientation='h',
+        marker_color="#818CF8",
+        text=hero_df["reviews_given"],
+        textposition="auto"
+    ))
+
+    fig.update_layout(
+        title="The Helpers vs The Shippers (Ratio Analysis)",
+        barmode='overlay', # actually relative/stack is better for diverging, but let's emulate diverging
+        xaxis=dict(title="← Self-Focus (PRs) | Team-Focus (Reviews) →", zeroline=True, zerolinewidth=2, zerolinecolor="#4B5563"),
+        yaxis=dict(title=""),
+        **PLOTLY_LAYOUT,
+        height=500,
+        showlegend=True
+    )
+    # Fix negative labels on X
+    fig.update_xaxes(tickformat="s") # plain number
+    return fig
+
+
+def impact_sources_figure(df):
+    """Stacked impact sources for the top ten."""
+    # 3. Impact Breakdown: Stacked Bar
+    # Simplify: Aggregate impact of the whole team or top 10
+    top_impact = df.head(10).copy()
+
+    if "shipping_score" in top_impact and top_impact["shipping_score"].notna().all():
+        # Exact components stored at scoring time; the bonus is what Stage 3 added on top
+        top_impact["Impact from Shipping"] = top_impact["shipping_score"]
+        top_impact["Impact from Helping"] = top_impact["review_score"]
+        top_impact["Code & Issues"] = top_impact["volume_score"] + top_impact["issue_score"]
+        top_impact["Quality Bonus"] = top_impact["impact_score"] - top_impact["baseline_impact_score"]
+    else:
+        # Older snapshots: approximate breakdown
+        top_impact["Impact from Shipping"] = top_impact["prs_merged"] * 15
+        top_impact["Impact from Helping"] = top_impact["reviews_given"] * 15
+        top_impact["Code & Issues"] = 0.0
+        top_impact["Quality Bonus"] = top_impact["impact_score"] - (top_impact["Impact from Shipping"] + top_impact["Impact from Helping"])
+    # Clip negative bonus for viz
+    top_impact["Quality Bonus"] = top_impact["Quality Bonus"].clip(lower=0)
+
+    fig = px.bar(
+        top_impact, 
+        x=["Impact from Shipping", "Impact from Helping", "Code & Issues", "Quality Bonus"], 
+        y="login",
+        orientation='h',
+        title="Where does the impact come from?",
+        color_discrete_map={
+            "Impact from Shipping": "#D1D5DB", 
+            "Impact from Helping": "#818CF8", 
+            "Code & Issues": "#A78BFA",
+            "Quality Bonus": "#34D399"
+        },
+        labels={"value": "Impact Points", "variable": "Source"}
+    )
+
+    fig.update_layout(barmode='stack', **PLOTLY_LAYOUT, height=500, xaxis_title="Total Impact Score")
+    return fig
+
+
+@st.cache_resource(max_entries=1)
+def analytics_figures(version, _df):
+    """The analytics tabs' figures, built once per snapshot rather than on every rerun."""
+    return {"quality": quality_matrix_figure(_df), "helpers": helpers_figure(_df), "sources": impact_sources_figure(_df)}
+
+
+def render_analytics_tabs(df, version):
     """Story-driven analytics in tabs."""
     st.markdown(f"""
     <div class="section-header">
@@ -1003,96 +1240,18 @@ def render_analytics_tabs(df, data):
 
     tab1, tab2, tab3 = st.tabs(["Quality vs Velocity", "The Unsung Heroes", "Impact Landscape"])
 
+    figures = analytics_figures(version, df)
+
     with tab1:
-        # 1. New Quadrant Chart: Quality vs Velocity
-        plot_df = df[df["avg_quality_score"] > 0].copy()
-        if not plot_df.empty:
-            med_prs = plot_df["prs_merged"].median()
-            med_quality = plot_df["avg_quality_score"].median()
-            
-            # Define Quadrants
-            fig = px.scatter(
-                plot_df, x="prs_merged", y="avg_quality_score",
-                size="impact_score", hover_name="login",
-                color="impact_score",
-                color_continuous_scale=["#E8E0FF", "#6B5CE7"],
-                labels={"prs_merged": "Velocity (PRs Merged)", "avg_quality_score": "Quality (AI Score)"},
-                title="The Engineering Matrix: Speed vs Substance",
-            )
-            
-            # Add colored backdrop zones
-            x_max = plot_df["prs_merged"].max() * 1.1
-            y_max = 5.2
-            
-            # Top Right: Legendary (High Speed, High Quality)
-            fig.add_shape(type="rect", x0=med_prs, y0=med_quality, x1=x_max, y1=y_max, 
-                          fillcolor="rgba(52, 211, 153, 0.1)", layer="below", line_width=0)
-            fig.add_annotation(x=x_max*0.9, y=y_max*0.95, text="LEGENDARY", showarrow=False, 
-                               font=dict(color="#059669", size=14, weight="bold"))
-
-            # Top Left: Craftsmen (Low Speed, High Quality)
-            fig.add_shape(type="rect", x0=0, y0=med_quality, x1=med_prs, y1=y_max, 
-                          fillcolor="rgba(96, 165, 250, 0.1)", layer="below", line_width=0)
-            fig.add_annotation(x=med_prs*0.2, y=y_max*0.95, text="CRAFTSPEOPLE", showarrow=False, 
-                               font=dict(color="#2563EB", size=14, weight="bold"))
-
-            # Bottom Right: Hustlers (High Speed, Low Quality)
-            fig.add_shape(type="rect", x0=med_prs, y0=1, x1=x_max, y1=med_quality, 
-                          fillcolor="rgba(251, 191, 36, 0.1)", layer="below", line_width=0)
-            fig.add_annotation(x=x_max*0.9, y=1.2, text="HUSTLERS", showarrow=False, 
-                               font=dict(color="#D97706", size=14, weight="bold"))
-                               
-            fig.update_layout(**PLOTLY_LAYOUT, height=500, xaxis=dict(range=[0, x_max]), yaxis=dict(range=[1, 5.2]))
-            st.plotly_chart(fig, use_container_width=True)
+        if figures["quality"] is not None:
+            st.plotly_chart(figures["quality"], use_container_width=True)
             st.caption("Positions are relative to the team median. The 'Legendary' zone represents the ideal balance of shipping speed and code quality.")
         else:
             st.info("No AI quality data available yet. Run the pipeline with LLM evaluation enabled.")
 
     with tab2:
-        # 2. Unsung Heroes: Diverging Bar / Ratio
-        hero_df = df[df["reviews_given"] > 0].copy()
-        if not hero_df.empty:
-            # Calculate Helpfulness Ratio
-            hero_df["helpfulness_ratio"] = hero_df["reviews_given"] / hero_df["prs_merged"].clip(lower=1)
-            hero_df = hero_df.sort_values("helpfulness_ratio", ascending=True).tail(10) # Top 10 helpful
-            
-            fig = go.Figure()
-            
-            # PRs (Left side, negative)
-            fig.add_trace(go.Bar(
-                y=hero_df["login"],
-                x=hero_df["prs_merged"] * -1,
-                name="PRs Shipped",
-                orientation='h',
-                marker_color="#D1D5DB",
-                text=hero_df["prs_merged"],
-                textposition="auto"
-            ))
-            
-            # Reviews (Right side, positive)
-            fig.add_trace(go.Bar(
-                y=hero_df["login"],
-                x=hero_df["reviews_given"],
-                name="Reviews Given",
-                orientation='h',
-                marker_color="#818CF8",
-                text=hero_df["reviews_given"],
-                textposition="auto"
-            ))
-            
-            fig.update_layout(
-                title="The Helpers vs The Shippers (Ratio Analysis)",
-                barmode='overlay', # actually relative/stack is better for diverging, but let's emulate diverging
-                xaxis=dict(title="← Self-Focus (PRs) | Team-Focus (Reviews) →", zeroline=True, zerolinewidth=2, zerolinecolor="#4B5563"),
-                yaxis=dict(title=""),
-                **PLOTLY_LAYOUT,
-                height=500,
-                showlegend=True
-            )
-            # Fix negative labels on X
-            fig.update_xaxes(tickformat="s") # plain number
-            
-            st.plotly_chart(fig, use_container_width=True)
+        if figures["helpers"] is not None:
+            st.plotly_chart(figures["helpers"], use_container_width=True)
             st.markdown(f"""
             <div style="background: #EEF2FF; padding: 16px; border-radius: 12px; border: 1px solid #C7D2FE; color: #4338CA;">
                 <strong>{doodle("lightbulb", 16, "#4338CA")} Insight:</strong> Engineers extending to the right are the team's multipliers. They spend significantly more time reviewing others' code than shipping their own.
@@ -1102,60 +1261,72 @@ def render_analytics_tabs(df, data):
             st.info("No review data available.")
 
     with tab3:
-        # 3. Impact Breakdown: Stacked Bar
-        # Simplify: Aggregate impact of the whole team or top 10
-        top_impact = df.head(10).copy()
-        
-        # Approximate breakdown again
-        top_impact["Impact from Shipping"] = top_impact["prs_merged"] * 15
-        top_impact["Impact from Helping"] = top_impact["reviews_given"] * 15
-        top_impact["Quality Bonus"] = top_impact["impact_score"] - (top_impact["Impact from Shipping"] + top_impact["Impact from Helping"])
-        # Clip negative bonus for viz
-        top_impact["Quality Bonus"] = top_impact["Quality Bonus"].clip(lower=0)
-        
-        fig = px.bar(
-            top_impact, 
-            x=["Impact from Shipping", "Impact from Helping", "Quality Bonus"], 
-            y="login",
-            orientation='h',
-            title="Where does the impact come from?",
-            color_discrete_map={
-                "Impact from Shipping": "#D1D5DB", 
-                "Impact from Helping": "#818CF8", 
-                "Quality Bonus": "#34D399"
-            },
-            labels={"value": "Impact Points", "variable": "Source"}
-        )
-        
-        fig.update_layout(barmode='stack', **PLOTLY_LAYOUT, height=500, xaxis_title="Total Impact Score")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures["sources"], use_container_width=True)
         st.caption("Green segments represent the 'Quality Boost' earned by shipping high-leverage, well-crafted code.")
 
 
+def render_window_leaderboard(data, version):
+    """Leaderboard for any date range in the snapshot, optionally weighted toward recent activity."""
+    timeline = load_timeline(version, data)
+    if not timeline.logins:
+        return
+
+    st.markdown(f"""
+    <div class="section-header">
+        {doodle("flame", 28, "#6B5CE7")}
+        <h2>Leaderboard by Date Range</h2>
+        <div class="line"></div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col_range, col_decay = st.columns([2, 1])
+    with col_range:
+        picked = st.date_input("Date range", value=(timeline.start, timeline.end),
+                               min_value=timeline.start, max_value=timeline.end)
+    with col_decay:
+        half_life = st.slider("Recency half-life (days, 0 = off)", 0, 30, 0)
+    if not isinstance(picked, (list, tuple)) or len(picked) != 2:
+        st.caption("Pick an end date to score the range.")
+        return
+
+    # Range totals are prefix-sum differences, so any window is instant
+    scores = timeline.scores(picked[0], picked[1], half_life_days=half_life or None).head(15)
+    table = pd.DataFrame({
+        "Engineer": scores.index,
+        "Impact": scores["impact_score"].round(1).to_numpy(),
+        "PRs Merged": scores["merged"].round(1).to_numpy(),
+        "Reviews": scores["reviews"].round(1).to_numpy(),
+        "Lines Changed": scores["lines"].round(0).to_numpy(),
+    })
+    table.insert(0, "Rank", range(1, len(table) + 1))
+    st.dataframe(table, use_container_width=True, hide_index=True)
+    st.caption("Baseline formulas over the selected days, times each engineer's AI quality multiplier from the full run."
+               + (f" Activity counts halve every {half_life} days before the range end." if half_life else ""))
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 def main():
     inject_css()
 
-    data = load_data()
+    version = snapshot_version()
+    data = load_data(version) if version else None
     if not data:
         st.warning("Data not found. Please run `main.py` first to fetch and analyze data.")
         return
+    watch_snapshot(version)
 
     # Hero
     render_hero(data)
 
-    # DataFrame for analysis
-    metrics = [c.model_dump() for c in data.contributor_metrics]
-    df = pd.DataFrame(metrics)
+    # DataFrame for analysis, sorted once per snapshot
+    df = contributor_frame(version, data)
 
     if df.empty:
         st.info("No contributor data available.")
         return
 
-    df = df.sort_values(by="impact_score", ascending=False).reset_index(drop=True)
-
     # Engineer gallery
     top5 = render_engineer_gallery(df, data)
 
@@ -1167,11 +1338,14 @@ def main():
     # Selected engineer drill-down
     if "selected_engineer" in st.session_state and st.session_state["selected_engineer"]:
         login = st.session_state["selected_engineer"]
-        if login in df["login"].values:
-            render_engineer_drilldown(login, df, data)
+        if login in contributor_rows(version, df):
+            render_engineer_drilldown(login, df, data, version)
 
     # Story analytics
-    render_analytics_tabs(df, data)
+    render_analytics_tabs(df, version)
+
+    # Any date range, from the same snapshot
+    render_window_leaderboard(data, version)
 
     # Footer
     st.markdown("---")
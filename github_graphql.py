@@ -0,0 +1,156 @@
+"""
+GraphQL backend for Stage 1.
+
+The REST path costs one `get_pull` plus one reviews call per PR (N+1). Here a
+single query returns a page of PRs together with their stats and first reviews,
+so a 300-item window is a handful of requests instead of hundreds.
+"""
+import heapq
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from github import Github
+from models import Contributor, PullRequest, Review, IssueActivity
+
+GRAPHQL_PAGE_SIZE = 50  # GitHub caps connections at 100 nodes per page
+
+_ACTOR_FIELDS = "__typename login avatarUrl url"
+
+PULL_REQUESTS_QUERY = f"""
+query($owner: String!, $name: String!, $pageSize: Int!, $reviews: Int!, $cursor: String) {{
+  repository(owner: $owner, name: $name) {{
+    pullRequests(first: $pageSize, after: $cursor, orderBy: {{field: UPDATED_AT, direction: DESC}}) {{
+      pageInfo {{ hasNextPage endCursor }}
+      nodes {{
+        number title state createdAt updatedAt mergedAt closedAt
+        additions deletions changedFiles url
+        author {{ {_ACTOR_FIELDS} }}
+        reviews(first: $reviews) {{
+          nodes {{ state submittedAt author {{ {_ACTOR_FIELDS} }} }}
+        }}
+      }}
+    }}
+  }}
+}}
+"""
+
+ISSUES_QUERY = f"""
+query($owner: String!, $name: String!, $pageSize: Int!, $since: DateTime!, $cursor: String) {{
+  repository(owner: $owner, name: $name) {{
+    issues(first: $pageSize, after: $cursor, orderBy: {{field: UPDATED_AT, direction: DESC}}, filterBy: {{since: $since}}) {{
+      pageInfo {{ hasNextPage endCursor }}
+      nodes {{
+        number title state createdAt updatedAt
+        author {{ {_ACTOR_FIELDS} }}
+      }}
+    }}
+  }}
+}}
+"""
+
+
+def _profile(actor: Optional[dict]) -> Contributor:
+    if not actor:
+        return Contributor(login="ghost", avatar_url="", html_url="")
+    login = actor["login"]
+    # REST reports app accounts as "name[bot]"; keep that so bot filtering still works
+    if actor.get("__typename") == "Bot" and not login.endswith("[bot]"):
+        login = f"{login}[bot]"
+    return Contributor(login=login, avatar_url=actor.get("avatarUrl") or "", html_url=actor.get("url") or "")
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def _pages(g: Github, query: str, variables: dict, connection: str, resume: Optional[list] = None) -> Iterator[tuple]:
+    """
+    Yields `(node, position)` for `repository.<connection>` across pages, following endCursor.
+    `position` is `[page_cursor, next_index]`: passing it back as `resume` continues after that node.
+    """
+    cursor, skip = resume or (None, 0)
+    while True:
+        _, response = g.requester.graphql_query(query, {**variables, "cursor": cursor})
+        page = response["data"]["repository"][connection]
+        for index, node in enumerate(page["nodes"][skip:], start=skip):
+            yield node, [cursor, index + 1]
+        if not page["pageInfo"]["hasNextPage"]:
+            return
+        cursor, skip = page["pageInfo"]["endCursor"], 0
+
+
+def _pr_records(g: Github, owner: str, name: str, cutoff: datetime, page_size: int, max_reviews: int, resume=None):
+    variables = {"owner": owner, "name": name, "pageSize": page_size, "reviews": max_reviews}
+    for node, position in _pages(g, PULL_REQUESTS_QUERY, variables, "pullRequests", resume):
+        # The PR connection has no `since` filter; ordering by updatedAt lets us stop at the cutoff
+        if _parse_time(node["updatedAt"]) < cutoff:
+            return
+        author = _profile(node["author"])
+        reviewers: List[Contributor] = []
+        reviews: List[Review] = []
+        for r in node["reviews"]["nodes"]:
+            reviewer = _profile(r["author"])
+            reviewers.append(reviewer)
+            reviews.append(Review(
+                user_login=reviewer.login,
+                state=r["state"],
+                submitted_at=_parse_time(r["submittedAt"]),
+                body="",  # Exclude body in Stage 1
+            ))
+        pr_model = PullRequest(
+            number=node["number"],
+            title=node["title"],
+            user_login=author.login,
+            # REST reports merged PRs as "closed"
+            state="open" if node["state"] == "OPEN" else "closed",
+            created_at=_parse_time(node["createdAt"]),
+            updated_at=_parse_time(node["updatedAt"]),
+            merged_at=_parse_time(node["mergedAt"]),
+            closed_at=_parse_time(node["closedAt"]),
+            additions=node["additions"],
+            deletions=node["deletions"],
+            changed_files=node["changedFiles"],
+            reviews=reviews,
+            html_url=node["url"],
+        )
+        yield node["updatedAt"], "pullRequests", position, (author, pr_model, reviewers, None)
+
+
+def _issue_records(g: Github, owner: str, name: str, cutoff: datetime, page_size: int, resume=None):
+    variables = {"owner": owner, "name": name, "pageSize": page_size, "since": cutoff.isoformat()}
+    for node, position in _pages(g, ISSUES_QUERY, variables, "issues", resume):
+        author = _profile(node["author"])
+        issue = IssueActivity(
+            issue_number=node["number"],
+            title=node["title"],
+            user_login=author.login,
+            created_at=_parse_time(node["createdAt"]),
+            updated_at=_parse_time(node["updatedAt"]),
+            event_type="closed" if node["state"] == "CLOSED" else "opened",
+            body=None,  # Exclude body
+        )
+        yield node["updatedAt"], "issues", position, (author, None, [], issue)
+
+
+def iter_stage_1_records(g: Github, repo_name: str, cutoff: datetime, page_size: int = GRAPHQL_PAGE_SIZE,
+                         max_reviews: int = 5, resume: Optional[dict] = None):
+    """
+    Yields `(cursor, (author, pr, reviewers, issue))` newest-updated first, the same
+    order the REST issues listing produces, so `limit` truncates identically.
+    Both connections are paged lazily; a page is only requested once the merge needs it.
+
+    `cursor` records how far each connection has been consumed; passing it back as
+    `resume` (with the same `page_size`) continues after that record.
+    """
+    owner, name = repo_name.split("/", 1)
+    page_size = max(1, min(page_size, 100))
+    cursor = dict(resume or {"pullRequests": None, "issues": None})
+    merged = heapq.merge(
+        _pr_records(g, owner, name, cutoff, page_size, max_reviews, cursor["pullRequests"]),
+        _issue_records(g, owner, name, cutoff, page_size, cursor["issues"]),
+        key=lambda entry: entry[0],
+        reverse=True,
+    )
+    for _, connection, position, record in merged:
+        cursor[connection] = position
+        yield dict(cursor), record
@@ -0,0 +1,112 @@
+"""
+HTTP transport hooks under PyGithub.
+
+PyGithub lets callers swap its connection classes; ours add conditional-request
+caching and rate-limit-aware token scheduling on top of the stock
+requests-based connections. Connections reuse one
+keep-alive session per thread, since PyGithub builds a fresh connection object
+per request once custom classes are injected.
+"""
+import threading
+from typing import Optional
+
+import requests
+from github.Requester import (
+    HTTPRequestsConnectionClass,
+    HTTPSRequestsConnectionClass,
+    Requester,
+    RequestsResponse,
+)
+
+from http_cache import ResponseCache
+from rate_limit import RateLimitScheduler, resource_for_path
+
+_sessions = threading.local()
+
+
+def _thread_session(cnx) -> requests.Session:
+    # The first connection on a thread donates its fully configured session (auth, retries, pool)
+    session = getattr(_sessions, cnx.protocol, None)
+    if session is None:
+        session = cnx.session
+        setattr(_sessions, cnx.protocol, session)
+    return session
+
+
+class _TransportMixin:
+    cache: Optional[ResponseCache] = None
+    scheduler: Optional[RateLimitScheduler] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        shared = _thread_session(self)
+        if shared is not self.session:
+            self.session.close()
+            self.session = shared
+
+    def getresponse(self) -> RequestsResponse:
+        url = f"{self.protocol}://{self.host}:{self.port}{self.url}"
+        headers = dict(self.headers)
+        cacheable = self.cache is not None and self.verb == "GET" and not self.stream
+        cached = self.cache.lookup(url) if cacheable else None
+        if cached:
+            headers.update(cached.validators())
+
+        # Only requests PyGithub authenticated get a pooled token (not e.g. cross-host redirects)
+        scheduler = self.scheduler if "Authorization" in headers else None
+        resource = resource_for_path(self.url)
+        attempts = len(scheduler.tokens) + 3 if scheduler else 1
+        for _ in range(attempts):
+            if scheduler:
+                token = scheduler.acquire(resource)
+                headers["Authorization"] = f"token {token}"
+            r = self.session.request(
+                self.verb,
+                url,
+                headers=headers,
+                data=self.input,
+                timeout=self.timeout,
+                verify=self.verify,
+                allow_redirects=False,
+                stream=self.stream,
+            )
+            if not scheduler or not scheduler.observe(token, resource, r.status_code, r.headers):
+                break
+
+        if cached and r.status_code == 304:
+            # Serve the stored body as a normal 200 so PyGithub parses it as usual
+            self.cache.record_hit(url)
+            r.status_code = 200
+            r._content = cached.body
+            r.encoding = "utf-8"
+            for k, v in cached.headers.items():
+                r.headers.setdefault(k, v)
+        elif cacheable and r.status_code == 200:
+            self.cache.store(url, r.headers, r.content)
+        return RequestsResponse(r)
+
+    def close(self) -> None:
+        # The session is shared by every connection on this thread
+        pass
+
+
+class TransportHTTPSConnection(_TransportMixin, HTTPSRequestsConnectionClass):
+    pass
+
+
+class TransportHTTPConnection(_TransportMixin, HTTPRequestsConnectionClass):
+    pass
+
+
+def configure(cache: Optional[ResponseCache] = None, scheduler: Optional[RateLimitScheduler] = None):
+    """Routes all PyGithub traffic through the transport; `configure()` with no hooks restores the defaults."""
+    _TransportMixin.cache = cache
+    _TransportMixin.scheduler = scheduler
+    if cache is None and scheduler is None:
+        Requester.resetConnectionClasses()
+    else:
+        Requester.injectConnectionClasses(TransportHTTPConnection, TransportHTTPSConnection)
+
+
+def active_scheduler() -> Optional[RateLimitScheduler]:
+    return _TransportMixin.scheduler
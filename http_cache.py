@@ -0,0 +1,126 @@
+"""
+Persistent conditional-request cache for GitHub REST responses.
+
+Bodies are stored with their ETag / Last-Modified validators, keyed by URL.
+Revalidating with `If-None-Match` returns 304 for unchanged resources, which
+GitHub does not count against the rate limit.
+"""
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = ".github_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Response headers worth replaying on a 304; rate-limit headers always come from the live response
+_STORED_HEADERS = ("content-type", "etag", "last-modified", "link")
+
+
+@dataclass
+class CachedResponse:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    headers: Dict[str, str]
+    body: bytes
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    SQLite-backed URL -> response store with LRU eviction once the stored bodies
+    exceed `max_bytes`. Safe to share across Stage 1 worker threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0       # 304 revalidations served from disk
+        self.misses = 0     # no entry, or the resource changed
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, headers, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, headers, body = row
+        return CachedResponse(etag, last_modified, json.loads(headers), body)
+
+    def record_hit(self, url: str):
+        with self._lock:
+            self.hits += 1
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def store(self, url: str, headers: Dict[str, str], body: bytes):
+        """Records a fresh 200. Responses without validators are not worth keeping."""
+        headers = {k.lower(): v for k, v in headers.items()}
+        etag, last_modified = headers.get("etag"), headers.get("last-modified")
+        with self._lock:
+            self.misses += 1
+            if not etag and not last_modified:
+                return
+            kept = {k: headers[k] for k in _STORED_HEADERS if k in headers}
+            previous = self._db.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(kept), body, len(body), time.time()),
+            )
+            self._size += len(body) - (previous[0] if previous else 0)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Drop least-recently-used entries until we're back under 90% of the budget
+        if self._size <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        rows = self._db.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        for url, size in rows:
+            if self._size <= target:
+                break
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._size -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "size_bytes": self._size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,102 @@
+"""
+Persistent cache for LLM judge results.
+
+A merged PR's title and stats never change, so its evaluation is stored under a
+content hash of everything that shapes the answer: PR number, rendered prompt,
+system prompt and model name. Editing any prompt changes the key, which makes
+stale results unreachable without any explicit invalidation. Batched calls store
+each PR's result under its single-PR key, so both modes share entries.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_LLM_CACHE_PATH = ".llm_cache.sqlite"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 20000
+
+
+def evaluation_key(pr_number: int, prompt: str, system_prompt: str, model: str) -> str:
+    payload = json.dumps([pr_number, prompt, system_prompt, model])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EvaluationCache:
+    """
+    SQLite-backed key -> JSON result store. Entries older than `ttl_seconds` are
+    treated as missing; past `max_entries` the least recently used are dropped.
+    """
+
+    def __init__(self, path: str = DEFAULT_LLM_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS evaluations (
+                key TEXT PRIMARY KEY,
+                pr_number INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS evaluations_accessed ON evaluations (accessed_at)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT result, created_at FROM evaluations WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE evaluations SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, pr_number: int, result: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?)",
+                (key, pr_number, json.dumps(result), now, now),
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now: float):
+        expired = self._db.execute("DELETE FROM evaluations WHERE created_at < ?", (now - self.ttl_seconds,))
+        self.evictions += expired.rowcount
+        overflow = self._db.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM evaluations WHERE key IN (SELECT key FROM evaluations ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
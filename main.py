@@ -1,20 +1,53 @@
 import os
-import json
-import math
+import time
 import asyncio
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional
 from dotenv import load_dotenv
 from github import Github, GithubException
-from models import PullRequest, Review, IssueActivity, ContributorImpact, ImpactData
+import github_graphql
+import github_transport
+import storage
+import store
+from http_cache import ResponseCache, DEFAULT_CACHE_PATH
+from rate_limit import RateLimitScheduler, DEFAULT_MAX_RPS
+from llm_cache import EvaluationCache, evaluation_key, DEFAULT_LLM_CACHE_PATH, DEFAULT_TTL_SECONDS
+from checkpoint import Stage1Checkpoint, Stage1State, DEFAULT_CHECKPOINT_PATH, DEFAULT_CHECKPOINT_EVERY
+from activity import ActivityTimeline
+from snapshot_view import ACTIVITY_TABLE
+from bootstrap import BOOTSTRAP_SAMPLES, BOOTSTRAP_CONFIDENCE, bootstrap_intervals, snapshot_intervals
+from compact import CompactSnapshot
+from scoring import (PR_CREDIT, QUALITY_WEIGHTS, pr_type_multiplier, pr_quality_score, quality_multiplier,
+                     score_components, score_contributors, index_merged_prs)
+from models import Contributor, PullRequest, Review, IssueActivity, ContributorImpact, ImpactData
 from pydantic_ai import Agent
 from pydantic import BaseModel
 
 load_dotenv()
 
 GITHUB_TOKEN = os.getenv("GITHUB_API_KEY")
+# Optional comma-separated pool of extra tokens; Stage 1 spreads requests across all of them
+GITHUB_TOKENS = [t for t in [GITHUB_TOKEN, *os.getenv("GITHUB_API_KEYS", "").split(",")] if t]
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 REPO_NAME = "PostHog/posthog"
+# Point Stage 1 at another API host, e.g. the local stand-in in stub_github.py
+GITHUB_BASE_URL = os.getenv("GITHUB_BASE_URL", "https://api.github.com")
+DATA_FILE = "impact_data.json"
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", storage.DEFAULT_SNAPSHOT_DIR)  # Parquet tables
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "both")  # json, parquet or both
+STORE_PATH = os.getenv("IMPACT_DB", store.DEFAULT_STORE_PATH)  # indexed SQLite copy for the dashboard
+WINDOW_DAYS = 30
+STAGE1_WORKERS = int(os.getenv("STAGE1_WORKERS", "8"))
+STAGE1_BACKEND = os.getenv("STAGE1_BACKEND", "rest")
+REST_LOOKAHEAD_PER_WORKER = int(os.getenv("REST_LOOKAHEAD_PER_WORKER", "4"))  # PR fetches queued per worker
+GITHUB_CACHE_PATH = os.getenv("GITHUB_CACHE_PATH", DEFAULT_CACHE_PATH)
+GITHUB_CACHE_MB = int(os.getenv("GITHUB_CACHE_MB", "256"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", DEFAULT_LLM_CACHE_PATH)
+LLM_CACHE_TTL_DAYS = float(os.getenv("LLM_CACHE_TTL_DAYS", str(DEFAULT_TTL_SECONDS / 86400)))
 
 # --- LLM Setup ---
 class PRQualityEvaluation(BaseModel):
@@ -24,14 +57,14 @@ class PRQualityEvaluation(BaseModel):
     blast_radius_score: int
     reasoning: str
 
-if DEEPSEEK_API_KEY:
-    os.environ["OPENAI_API_KEY"] = DEEPSEEK_API_KEY
-    os.environ["OPENAI_BASE_URL"] = "https://api.deepseek.com"
-    
-    judge_agent = Agent(
-        'openai:deepseek-chat',
-        output_type=PRQualityEvaluation,
-        system_prompt="""You are a distinguished VP of Engineering at a top-tier tech company, evaluating a GitHub Pull Request for its real-world engineering impact. You have deep expertise in software architecture, product strategy, and engineering culture.
+class PRBatchItem(PRQualityEvaluation):
+    pr_number: int
+
+class PRBatchEvaluation(BaseModel):
+    evaluations: List[PRBatchItem]
+
+JUDGE_MODEL = 'openai:deepseek-chat'
+JUDGE_SYSTEM_PROMPT = """You are a distinguished VP of Engineering at a top-tier tech company, evaluating a GitHub Pull Request for its real-world engineering impact. You have deep expertise in software architecture, product strategy, and engineering culture.
 
 Analyze the PR based on its title, description, and code change statistics. Rate each dimension on a strict 1-5 scale:
 
@@ -64,122 +97,392 @@ Analyze the PR based on its title, description, and code change statistics. Rate
    - 1: Completely isolated — no downstream dependencies
 
 Provide a concise 1-2 sentence reasoning summarizing why this PR matters (or doesn't)."""
+
+# Appended to the system prompt when several PRs share one request
+JUDGE_BATCH_INSTRUCTIONS = """
+
+You will receive several Pull Requests in one message, each introduced by its PR number. Evaluate every PR independently on the same scale and return exactly one evaluation per PR, each carrying its `pr_number`."""
+
+# Judge results are reused across runs; set up in main() (None = always call the LLM)
+evaluation_cache: Optional[EvaluationCache] = None
+
+judge_agent = None
+batch_judge_agent = None
+judge_model_name = JUDGE_MODEL  # part of the evaluation cache key
+
+def configure_judge(model):
+    """(Re)builds the judge agents on `model`: a model name or a pydantic-ai Model (e.g. mock_llm.MockJudge)."""
+    global judge_agent, batch_judge_agent, judge_model_name
+    judge_agent = Agent(
+        model,
+        output_type=PRQualityEvaluation,
+        system_prompt=JUDGE_SYSTEM_PROMPT,
     )
+    batch_judge_agent = Agent(
+        model,
+        output_type=PRBatchEvaluation,
+        system_prompt=JUDGE_SYSTEM_PROMPT + JUDGE_BATCH_INSTRUCTIONS,
+    )
+    judge_model_name = model if isinstance(model, str) else f"{model.system}:{model.model_name}"
+
+if DEEPSEEK_API_KEY:
+    os.environ["OPENAI_API_KEY"] = DEEPSEEK_API_KEY
+    os.environ["OPENAI_BASE_URL"] = "https://api.deepseek.com"
+    
+    configure_judge(JUDGE_MODEL)
     print("LLM Agent initialized with DeepSeek.")
 else:
-    judge_agent = None
     print("WARNING: DEEPSEEK_API_KEY not found. LLM evaluation will be skipped.")
 
 # --- Stage 1: Minimal Data Collection (Volume) ---
-def fetch_stage_1_volume(days=30, limit=500) -> tuple[List[PullRequest], List[IssueActivity], Dict[str, ContributorImpact]]:
+MAX_REVIEWS_PER_PR = 5
+
+# PyGithub keeps a single connection per client, so each worker thread gets its own.
+_thread_local = threading.local()
+
+def _github_client() -> Github:
+    # The pipeline only reads, but GraphQL queries are POSTs, which PyGithub would
+    # otherwise space 1s apart as "writes"
+    if github_transport.active_scheduler() is None:
+        return Github(GITHUB_TOKEN, base_url=GITHUB_BASE_URL, seconds_between_writes=None)
+    # The scheduler paces requests and retries rate-limited ones on another token,
+    # so PyGithub's fixed inter-request sleep and 403 backoff are turned off.
+    return Github(GITHUB_TOKENS[0], base_url=GITHUB_BASE_URL, retry=3,
+                  seconds_between_requests=None, seconds_between_writes=None)
+
+def _thread_repo():
+    repo = getattr(_thread_local, "repo", None)
+    if repo is None:
+        repo = _github_client().get_repo(REPO_NAME, lazy=True)
+        _thread_local.repo = repo
+    return repo
+
+def _profile(user) -> Contributor:
+    if not user:
+        return Contributor(login="ghost", avatar_url="", html_url="")
+    return Contributor(login=user.login, avatar_url=user.avatar_url, html_url=user.html_url)
+
+def _ensure_contributor(contributors: Dict[str, ContributorImpact], profile: Contributor) -> ContributorImpact:
+    if profile.login not in contributors:
+        contributors[profile.login] = ContributorImpact(
+            login=profile.login,
+            avatar_url=profile.avatar_url,
+            html_url=profile.html_url
+        )
+    return contributors[profile.login]
+
+def _fetch_pr_with_reviews(number: int) -> tuple[PullRequest, List[Contributor]]:
+    """
+    Fetches one PR's stats and its first reviews on the calling thread's client.
+    Returns the PR model plus the reviewer profiles, in review order.
+    """
+    repo = _thread_repo()
+    # We need get_pull for merged_at, additions, deletions
+    # This is "semi-expensive" but necessary for the baseline "merged" metric.
+    pr_detail = repo.get_pull(number)
+    pr_reviews = []
+    reviewer_profiles = []
+    for r in pr_detail.get_reviews():
+        if len(pr_reviews) >= MAX_REVIEWS_PER_PR: break
+
+        reviewer = _profile(r.user)
+        reviewer_profiles.append(reviewer)
+        pr_reviews.append(Review(
+            user_login=reviewer.login,
+            state=r.state,
+            submitted_at=r.submitted_at,
+            body="" # Exclude body in Stage 1
+        ))
+
+    pr_model = PullRequest(
+        number=pr_detail.number,
+        title=pr_detail.title,
+        user_login=pr_detail.user.login if pr_detail.user else "ghost",
+        state=pr_detail.state,
+        created_at=pr_detail.created_at,
+        updated_at=pr_detail.updated_at,
+        merged_at=pr_detail.merged_at,
+        closed_at=pr_detail.closed_at,
+        additions=pr_detail.additions,
+        deletions=pr_detail.deletions,
+        changed_files=pr_detail.changed_files,
+        reviews=pr_reviews,
+        html_url=pr_detail.html_url,
+    )
+    return pr_model, reviewer_profiles
+
+def _record_pr(contributors: Dict[str, ContributorImpact], author: Contributor, pr_model: PullRequest, reviewers: List[Contributor]):
+    for reviewer in reviewers:
+        _ensure_contributor(contributors, reviewer).reviews_given += 1
+
+    # Update Contributor (Author)
+    c = contributors[author.login]
+    c.prs_opened += 1
+    if pr_model.merged_at:
+        c.prs_merged += 1
+
+    c.additions += pr_model.additions
+    c.deletions += pr_model.deletions
+    c.files_changed += pr_model.changed_files
+
+def _record_issue(contributors: Dict[str, ContributorImpact], issue: IssueActivity):
+    c = contributors[issue.user_login]
+    c.issue_interactions += 1
+    if issue.event_type == "closed":
+        c.issues_closed += 1
+
+def _issue_from_item(item, login: str) -> IssueActivity:
+    is_closed = item.state == 'closed'
+    return IssueActivity(
+        issue_number=item.number,
+        title=item.title,
+        user_login=login,
+        created_at=item.created_at,
+        updated_at=item.updated_at,
+        event_type="closed" if is_closed else "opened",
+        body=None, # Exclude body
+    )
+
+def _limited(iterable, limit, start=0):
+    for count, entry in enumerate(iterable, start=start):
+        if limit is not None and count >= limit:
+            print(f"Reached limit of {limit} items. Stopping Stage 1 fetch.")
+            return
+        yield entry
+
+def _iter_issue_listing(items, per_page: int, start: int = 0):
+    # Page-addressed so a resumed run jumps straight to the checkpointed offset
+    page, skip = divmod(start, per_page)
+    while True:
+        batch = items.get_page(page)
+        yield from batch[skip:]
+        if len(batch) < per_page:
+            return
+        page, skip = page + 1, 0
+
+def _rest_record(item, future):
+    author = _profile(item.user)
+    if future is None:
+        return author, None, [], _issue_from_item(item, author.login)
+    try:
+        pr_model, reviewers = future.result()
+    except GithubException as e:
+        print(f"Error fetching PR #{item.number}: {e}")
+        return author, None, [], None
+    return author, pr_model, reviewers, None
+
+def _iter_rest_records(cutoff_date: datetime, limit: int, workers: int, start: int = 0):
+    """
+    REST backend: pages the issues listing on the main thread and fans PR detail +
+    review requests out over `workers` threads. Records are yielded in listing order,
+    so output and contributor ordering are identical to a serial run.
+    """
+    g = _github_client()
+    repo = g.get_repo(REPO_NAME)
+    items = repo.get_issues(since=cutoff_date, state='all', sort='updated')
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        # Keep a bounded window of PR fetches in flight ahead of the yield point, so detail
+        # requests overlap the listing without paging through all of it first.
+        window = max(workers, 1) * REST_LOOKAHEAD_PER_WORKER
+        pending = deque()
+        for item in _limited(_iter_issue_listing(items, g.per_page, start), limit, start):
+            pending.append((item, pool.submit(_fetch_pr_with_reviews, item.number) if item.pull_request else None))
+            if len(pending) >= window:
+                yield None, _rest_record(*pending.popleft())
+        while pending:
+            yield None, _rest_record(*pending.popleft())
+
+def _iter_graphql_records(cutoff_date: datetime, limit: int, page_size: int, start: int = 0, resume=None):
+    records = github_graphql.iter_stage_1_records(
+        _github_client(), REPO_NAME, cutoff_date, page_size=page_size, max_reviews=MAX_REVIEWS_PER_PR, resume=resume
+    )
+    yield from _limited(records, limit, start)
+
+def fetch_stage_1_volume(days=30, limit=500, workers=1, backend="rest", page_size=github_graphql.GRAPHQL_PAGE_SIZE,
+                         since: Optional[datetime] = None, checkpoint: Optional[Stage1Checkpoint] = None,
+                         on_record: Optional[Callable[[tuple], None]] = None) -> tuple[List[PullRequest], List[IssueActivity], Dict[str, ContributorImpact]]:
     """
     Fetches broad metadata for the last `days`. 
     Captures: PRs, Issues, Reviews (counts), Reactions.
     Avoids: Full diffs/bodies for everyone (fetches PR details only for stats).
+
+    backend="rest" uses the issues listing plus per-PR detail calls (spread over
+    `workers` threads); backend="graphql" pulls PRs with stats and reviews in
+    batched pages of `page_size`. Both build the same models.
+
+    `since` overrides the `days` cutoff, e.g. with the previous run's watermark
+    for an incremental refresh. `limit=None` fetches everything updated since then.
+
+    With a `checkpoint`, partial results and the pagination position are saved
+    every `checkpoint.every` items; a resuming checkpoint continues from there.
+
+    `on_record` is called with each new `(author, pr, reviewers, issue)` record as
+    soon as it is aggregated, letting later stages start before the fetch ends.
     """
-    g = Github(GITHUB_TOKEN)
-    repo = g.get_repo(REPO_NAME)
-    
-    cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+    run = {"repo": REPO_NAME, "backend": backend, "limit": limit, "since": since.isoformat() if since else None,
+           "page_size": page_size if backend == "graphql" else None}
+    state = checkpoint.load(run) if checkpoint else None
+    if state:
+        print(f"Resuming Stage 1 from checkpoint: {state.position} items already processed.")
+    else:
+        state = Stage1State(
+            cutoff_date=since or datetime.now(timezone.utc) - timedelta(days=days),
+            position=0, cursor=None, complete=False, prs=[], issue_activities=[], contributors={},
+        )
+    if state.complete:
+        return state.prs, state.issue_activities, state.contributors
+
     print(f"\n--- STAGE 1: Volume Data Collection ---")
-    print(f"Fetching data from {REPO_NAME} since {cutoff_date} (Limit: {limit} items)...")
+    print(f"Fetching data from {REPO_NAME} since {state.cutoff_date} (Limit: {limit} items, Backend: {backend})...")
+
+    if backend == "graphql":
+        records = _iter_graphql_records(state.cutoff_date, limit, page_size, state.position, state.cursor)
+    else:
+        records = _iter_rest_records(state.cutoff_date, limit, workers, state.position)
+
+    # A listing that shifted between crash and resume can repeat items we already have
+    seen_prs = {p.number for p in state.prs}
+    seen_issues = {i.issue_number for i in state.issue_activities}
+
+    for count, (cursor, record) in enumerate(records, start=state.position + 1):
+        _, pr_model, _, issue = record
+        if not (pr_model and pr_model.number in seen_prs) and not (issue and issue.issue_number in seen_issues):
+            _aggregate_record(state.prs, state.issue_activities, state.contributors, record, count)
+            if on_record:
+                on_record(record)
+        state.position, state.cursor = count, cursor
+        if checkpoint and count % checkpoint.every == 0:
+            checkpoint.save(run, state)
 
+    if checkpoint:
+        state.complete = True
+        checkpoint.save(run, state)
+    return state.prs, state.issue_activities, state.contributors
+
+def _aggregate_record(prs: List[PullRequest], issue_activities: List[IssueActivity],
+                      contributors: Dict[str, ContributorImpact], record, count: int):
+    author, pr_model, reviewers, issue = record
+    # Init contributor
+    _ensure_contributor(contributors, author)
+
+    if pr_model is not None:
+        if count % 10 == 0: print(f"Processing item {count} (PR)...")
+        prs.append(pr_model)
+        _record_pr(contributors, author, pr_model, reviewers)
+    elif issue is not None:
+        issue_activities.append(issue)
+        _record_issue(contributors, issue)
+
+def _aggregate_records(records) -> tuple[List[PullRequest], List[IssueActivity], Dict[str, ContributorImpact]]:
     prs: List[PullRequest] = []
     issue_activities: List[IssueActivity] = []
     contributors: Dict[str, ContributorImpact] = {}
+    for count, record in enumerate(records, start=1):
+        _aggregate_record(prs, issue_activities, contributors, record, count)
+    return prs, issue_activities, contributors
 
-    items = repo.get_issues(since=cutoff_date, state='all', sort='updated')
-    
-    count = 0
-    for item in items:
-        if count >= limit:
-            print(f"Reached limit of {limit} items. Stopping Stage 1 fetch.")
-            break
-        count += 1
-        
-        login = item.user.login if item.user else "ghost"
-        
-        # Init contributor
-        if login not in contributors:
-            contributors[login] = ContributorImpact(
-                login=login,
-                avatar_url=item.user.avatar_url if item.user else "",
-                html_url=item.user.html_url if item.user else ""
-            )
-        
-        if item.pull_request:
-            if count % 10 == 0: print(f"Processing item {count} (PR)...")
-            try:
-                # We need get_pull for merged_at, additions, deletions
-                # This is "semi-expensive" but necessary for the baseline "merged" metric.
-                pr_detail = repo.get_pull(item.number)
-                pr_reviews = []
-                review_iter_count = 0
-                for r in pr_detail.get_reviews():
-                    if review_iter_count >= 5: break
-                    review_iter_count += 1
-                    
-                    reviewer_login = r.user.login if r.user else "ghost"
-                    pr_reviews.append(Review(
-                        user_login=reviewer_login,
-                        state=r.state,
-                        submitted_at=r.submitted_at,
-                        body="" # Exclude body in Stage 1
-                    ))
-                    
-                    if reviewer_login not in contributors:
-                        contributors[reviewer_login] = ContributorImpact(
-                            login=reviewer_login,
-                            avatar_url=r.user.avatar_url if r.user else "",
-                            html_url=r.user.html_url if r.user else ""
-                        )
-                    contributors[reviewer_login].reviews_given += 1
-
-                pr_model = PullRequest(
-                    number=pr_detail.number,
-                    title=pr_detail.title,
-                    user_login=pr_detail.user.login if pr_detail.user else "ghost",
-                    state=pr_detail.state,
-                    created_at=pr_detail.created_at,
-                    merged_at=pr_detail.merged_at,
-                    closed_at=pr_detail.closed_at,
-                    additions=pr_detail.additions,
-                    deletions=pr_detail.deletions,
-                    changed_files=pr_detail.changed_files,
-                    reviews=pr_reviews,
-                    html_url=pr_detail.html_url,
-                )
-                prs.append(pr_model)
-                
-                # Update Contributor (Author)
-                c = contributors[login]
-                c.prs_opened += 1
-                if pr_model.merged_at:
-                    c.prs_merged += 1
-                
-                c.additions += pr_model.additions
-                c.deletions += pr_model.deletions
-                c.files_changed += pr_model.changed_files
-
-            except GithubException as e:
-                print(f"Error fetching PR #{item.number}: {e}")
-                
-        else:
-            # Issue
-            is_closed = item.state == 'closed'
-            issue_activities.append(IssueActivity(
-                issue_number=item.number,
-                title=item.title,
-                user_login=login,
-                created_at=item.created_at,
-                event_type="closed" if is_closed else "opened",
-                body=None, # Exclude body
-            ))
-            contributors[login].issue_interactions += 1
-            if is_closed:
-                contributors[login].issues_closed += 1
+# --- Incremental refresh ---
+def load_snapshot(path: Optional[str] = None) -> Optional[ImpactData]:
+    """The snapshot at `path` (JSON file or Parquet directory), by default the latest one written."""
+    path = path or storage.latest_snapshot_path(DATA_FILE, SNAPSHOT_DIR)
+    try:
+        return storage.load_snapshot(path) if path else None
+    except FileNotFoundError:
+        return None
 
-    return prs, issue_activities, contributors
+def load_tables(path: Optional[str] = None):
+    """load_snapshot as (meta, tables), without building models for trusted snapshots."""
+    path = path or storage.latest_snapshot_path(DATA_FILE, SNAPSHOT_DIR)
+    try:
+        return storage.load_tables(path) if path else None
+    except FileNotFoundError:
+        return None
+
+def load_compact(path: Optional[str] = None) -> Optional[CompactSnapshot]:
+    loaded = load_tables(path)
+    return CompactSnapshot.from_tables(*loaded) if loaded else None
+
+def _saved_to(fmt: str, with_store: bool) -> str:
+    saved = {"json": DATA_FILE, "parquet": f"{SNAPSHOT_DIR}/"}.get(fmt, f"{SNAPSHOT_DIR}/ and {DATA_FILE}")
+    return f"{saved} (+ {STORE_PATH})" if with_store else saved
+
+def save_snapshot(data: ImpactData, fmt: str = SNAPSHOT_FORMAT, with_store: bool = True) -> str:
+    # Daily activity rides along with the tables so the dashboard can start without reading PRs
+    extra = {ACTIVITY_TABLE: ActivityTimeline(data).daily_table()} if fmt != "json" else None
+    storage.save_snapshot(data, DATA_FILE, SNAPSHOT_DIR, fmt, extra)
+    if with_store:
+        store.write_store(data, STORE_PATH)
+    return _saved_to(fmt, with_store)
+
+def save_rescored(meta: dict, tables: Dict, snap: CompactSnapshot, fmt: str = SNAPSHOT_FORMAT,
+                  with_store: bool = True) -> str:
+    """
+    save_snapshot for `tables` as loaded, with `snap`'s PR quality and contributors
+    written back. Parquet tables are written as columns; models are only built for
+    the JSON export and the store.
+    """
+    tables = {**tables, "contributors": snap.contributors,
+              "pull_requests": tables["pull_requests"].assign(llm_quality_score=snap.llm_quality_score)}
+    data = storage.from_tables(meta, tables) if fmt != "parquet" or with_store else None
+    if fmt in ("json", "both"):
+        storage.write_json(data, DATA_FILE)
+    if fmt in ("parquet", "both"):
+        storage.write_tables(meta, {**tables, ACTIVITY_TABLE: ActivityTimeline(snap).daily_table()}, SNAPSHOT_DIR)
+    if with_store:
+        store.write_store(data, STORE_PATH)
+    return _saved_to(fmt, with_store)
+
+def _last_activity(item) -> datetime:
+    # Snapshots written before `updated_at` was stored fall back to the latest known event
+    if item.updated_at:
+        return item.updated_at
+    events = [getattr(item, "created_at", None), getattr(item, "merged_at", None), getattr(item, "closed_at", None)]
+    return max(e for e in events if e)
+
+def merge_incremental(previous: ImpactData, fresh_prs: List[PullRequest], fresh_issues: List[IssueActivity],
+                      fresh_contributors: Dict[str, ContributorImpact], cutoff_date: datetime):
+    """
+    Upserts freshly fetched PRs/issues (by number) into the previous snapshot's sets,
+    drops anything whose last activity fell out of the window, and recomputes
+    contributor aggregates from the merged sets.
+    """
+    fresh_pr_numbers = {p.number for p in fresh_prs}
+    fresh_issue_numbers = {i.issue_number for i in fresh_issues}
+    prs = fresh_prs + [
+        p for p in previous.pull_requests
+        if p.number not in fresh_pr_numbers and _last_activity(p) >= cutoff_date
+    ]
+    issues = fresh_issues + [
+        i for i in previous.issue_activities
+        if i.issue_number not in fresh_issue_numbers and _last_activity(i) >= cutoff_date
+    ]
+    print(f"Incremental merge: {len(fresh_prs)} PRs / {len(fresh_issues)} issues refreshed, "
+          f"{len(prs)} PRs / {len(issues)} issues in window.")
+
+    # Avatars and profile links come from the latest data we have for each login
+    profiles = {c.login: Contributor(login=c.login, avatar_url=c.avatar_url, html_url=c.html_url)
+                for c in [*previous.contributor_metrics, *fresh_contributors.values()]}
+
+    def profile(login: str) -> Contributor:
+        return profiles.get(login) or Contributor(login=login, avatar_url="", html_url="")
+
+    records = [
+        (profile(p.user_login), p, [profile(r.user_login) for r in p.reviews], None) for p in prs
+    ] + [
+        (profile(i.user_login), None, [], i) for i in issues
+    ]
+    return _aggregate_records(records)
+
+def fetch_incremental(previous: ImpactData, days=30, **fetch_kwargs):
+    """Fetches only items updated since the previous snapshot's `fetched_at` and merges them in."""
+    cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+    watermark = previous.fetched_at
+    print(f"Incremental mode: watermark {watermark}")
+    fresh_prs, fresh_issues, fresh_contributors = fetch_stage_1_volume(
+        days=days, since=watermark, limit=None, **fetch_kwargs
+    )
+    return merge_incremental(previous, fresh_prs, fresh_issues, fresh_contributors, cutoff_date)
 
 # --- Stage 2: Value-Based Baseline Impact ---
 def calculate_baseline_metrics(contributors: Dict[str, ContributorImpact], all_prs: List[PullRequest]):
@@ -191,65 +494,77 @@ def calculate_baseline_metrics(contributors: Dict[str, ContributorImpact], all_p
     
     All dimensions are log-normalized to prevent any single metric from dominating.
     Weights sum to 100% with documented rationale.
+
+    The formulas live in scoring.py and run over the whole contributor table at once.
     """
     print(f"\n--- STAGE 2: Value-Based Impact Analysis ---")
     
-    # Pre-compute PR type multipliers from title conventions
-    pr_type_multipliers = {}
-    for pr in all_prs:
-        title_lower = pr.title.lower().strip()
-        # Detect conventional commit prefixes: feat:, fix:, refactor:, chore:, docs:, etc.
-        if any(title_lower.startswith(p) for p in ['feat', 'feature']):
-            pr_type_multipliers[pr.number] = 1.5  # Features drive product forward
-        elif any(title_lower.startswith(p) for p in ['fix', 'bug', 'hotfix', 'patch']):
-            pr_type_multipliers[pr.number] = 1.3  # Fixes resolve user pain
-        elif any(title_lower.startswith(p) for p in ['refactor', 'perf', 'optimize']):
-            pr_type_multipliers[pr.number] = 1.1  # Refactors improve long-term health
-        elif any(title_lower.startswith(p) for p in ['chore', 'ci', 'docs', 'style', 'bump']):
-            pr_type_multipliers[pr.number] = 0.7  # Maintenance is necessary but lower impact
-        else:
-            pr_type_multipliers[pr.number] = 1.0  # Default
-    
-    for c in contributors.values():
+    scores = score_contributors(contributors.values(), all_prs)
+    columns = zip(contributors.values(), scores["shipping_score"].tolist(), scores["review_score"].tolist(),
+                  scores["volume_score"].tolist(), scores["issue_score"].tolist(), scores["total"].tolist())
+    for c, shipping, review, volume, issue, total in columns:
         if c.login.endswith('[bot]'):
             c.impact_score = -1
             continue
-
-        # --- 1. SHIPPING SCORE (40% weight) ---
-        # Primary value driver: merged PRs move the product forward.
-        # Base: 10 pts per merged PR, with type multiplier from title.
-        # Log-dampened so 20 trivial PRs don't outweigh 3 complex ones.
-        user_merged_prs = [p for p in all_prs if p.user_login == c.login and p.merged_at]
-        
-        # Sum of type-weighted PR credits
-        raw_pr_value = sum(10 * pr_type_multipliers.get(p.number, 1.0) for p in user_merged_prs)
-        shipping_score = math.log(1 + raw_pr_value) * 15  # Scale factor for readability
-        
-        # --- 2. REVIEW SCORE (30% weight) ---
-        # Force multiplier: reviews unblock teammates and maintain quality.
-        # Log-dampened: 10 rubber-stamp reviews ≠ 10× the value of 1 thoughtful review.
-        # math.log(1 + 5) ≈ 1.79, math.log(1 + 20) ≈ 3.04 — natural diminishing returns.
-        review_score = math.log(1 + c.reviews_given) * 30
-        
-        # --- 3. CODE VOLUME (15% weight) ---
-        # Substance signal: larger changes require more engineering effort.
-        # log10-dampened: 100 lines → 2, 10000 lines → 4. Prevents massive refactors from dominating.
-        code_volume_score = math.log10(1 + c.additions + c.deletions) * 8
-        
-        # --- 4. ISSUE RESOLUTION (15% weight) ---
-        # Problem-solving: closing issues (5 pts) is 5× more valuable than opening/commenting (1 pt).
-        # Reflects that resolution > identification in real-world impact.
-        issue_score = (c.issues_closed * 5) + (max(c.issue_interactions - c.issues_closed, 0) * 1)
-        issue_score = math.log(1 + issue_score) * 10
-        
-        c.impact_score = shipping_score + review_score + code_volume_score + issue_score
+        # Stored so the dashboard can show the exact breakdown
+        c.shipping_score, c.review_score, c.volume_score, c.issue_score = shipping, review, volume, issue
+        c.impact_score = total
+        c.ai_multiplier = 1.0  # until Stage 3 evaluates them
 
 # --- Stage 3: LLM Quality Evaluation ---
-async def fetch_stage_3_quality(contributors: Dict[str, ContributorImpact], all_prs: List[PullRequest]):
+STAGE3_CANDIDATES = 15
+STAGE3_PRS_PER_CANDIDATE = 10
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))  # judge calls in flight at once
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "1"))    # PRs per judge call (1 = one call per PR)
+
+def _sample_prs(merged_prs: List[PullRequest]) -> List[PullRequest]:
+    # Sort by size (proxy for complexity/impact possibility), take the top 10
+    return sorted(merged_prs, key=lambda x: x.additions + x.deletions, reverse=True)[:STAGE3_PRS_PER_CANDIDATE]
+
+async def evaluate_pr_bounded(pr: PullRequest, semaphore: asyncio.Semaphore,
+                              use_cache: bool = True) -> Optional[PRQualityEvaluation]:
+    async with semaphore:
+        return await evaluate_pr_with_llm(pr, use_cache)
+
+async def _batch_result(batch: "asyncio.Task", number: int) -> Optional[PRQualityEvaluation]:
+    return (await batch)[number]
+
+def clear_judgement(pr: PullRequest):
+    pr.llm_quality_score = None
+    pr.llm_reasoning = None
+    for field in QUALITY_WEIGHTS:
+        setattr(pr, field, None)
+
+def apply_quality(c: ContributorImpact, sample_prs: List[PullRequest]) -> bool:
+    """Sets `c`'s quality, multiplier and impact from its judged sample PRs; False if none were judged."""
+    scores = [pr.llm_quality_score for pr in sample_prs if pr.llm_quality_score is not None]
+    if not scores:
+        return False
+    avg_quality = sum(scores) / len(scores)
+    c.avg_quality_score = avg_quality
+    c.ai_multiplier = quality_multiplier(avg_quality)
+    c.impact_score = c.baseline_impact_score * c.ai_multiplier
+    return True
+
+async def fetch_stage_3_quality(contributors: Dict[str, ContributorImpact], all_prs: List[PullRequest],
+                                prefetched: Optional[Dict[int, "asyncio.Task"]] = None,
+                                concurrency: int = LLM_CONCURRENCY,
+                                semaphore: Optional[asyncio.Semaphore] = None,
+                                batch_size: int = LLM_BATCH_SIZE):
     """
     Targeted evaluation for Top 15 candidates.
     Fetches bodies and runs Agent.
+
+    All sample PRs are evaluated concurrently, at most `concurrency` at a time
+    (or under a shared `semaphore`); each contributor is scored as soon as their
+    own PRs are done. With `batch_size` > 1, PRs are judged `batch_size` per
+    request (see evaluate_pr_batch).
+
+    `prefetched` maps PR numbers to evaluations already started (see the streaming
+    pipeline); those are awaited instead of calling the LLM again.
     """
+    prefetched = dict(prefetched or {})
+    semaphore = semaphore or asyncio.Semaphore(max(concurrency, 1))
     print(f"\n--- STAGE 3: Trusted LLM Evaluation ---")
     
     # Filter valid candidates
@@ -258,63 +573,102 @@ async def fetch_stage_3_quality(contributors: Dict[str, ContributorImpact], all_
     candidates.sort(key=lambda x: x.impact_score, reverse=True)
     
     # Select Top 15
-    top_candidates = candidates[:15]
+    top_candidates = candidates[:STAGE3_CANDIDATES]
     print(f"Selected {len(top_candidates)} candidates for deep dive.")
+    judged = set()  # PR numbers evaluated in this run
 
+    async def evaluate_contributor(c: ContributorImpact, sample_prs: List[PullRequest]):
+        # Optimization: In a real app, we'd fetch the full body here if we skipped it in Stage 1.
+        # For this script, we'll use the title (and body if we had it).
+        # If we exclude body in Stage 1, we must fetch it here. 
+        # Since we can't easily re-fetch just the body without an API call, let's assume 
+        # we infer context from Title + Stats for this demo OR make one API call if needed.
+        # To be safe and fast, we'll use the metadata we have.
+        evaluations = await asyncio.gather(*(
+            prefetched[pr.number] if pr.number in prefetched else evaluate_pr_bounded(pr, semaphore)
+            for pr in sample_prs
+        ))
+        
+        for pr, evaluation in zip(sample_prs, evaluations):
+            if evaluation:
+                judged.add(pr.number)
+                # Keep the raw dimensions so --rescore can reweight without the LLM
+                pr.llm_substance_score = evaluation.substance_score
+                pr.llm_product_impact_score = evaluation.product_impact_score
+                pr.llm_technical_quality_score = evaluation.technical_quality_score
+                pr.llm_blast_radius_score = evaluation.blast_radius_score
+                pr.llm_quality_score = pr_quality_score(pr)
+                pr.llm_reasoning = evaluation.reasoning
+                # Save these updates back to the list
+
+        # Snapshot the baseline score before applying AI multiplier
+        c.baseline_impact_score = c.impact_score
+        if apply_quality(c, [pr for pr, evaluation in zip(sample_prs, evaluations) if evaluation]):
+            print(f"  -> {c.login}: Avg Quality: {c.avg_quality_score:.1f} | Multiplier: {c.ai_multiplier:.2f} | Baseline: {c.baseline_impact_score:.1f} | AI Score: {c.impact_score:.1f}")
+
+    merged_by_author = index_merged_prs(all_prs)
+    jobs = []
     for c in top_candidates:
         # Find their merged PRs
-        user_prs = [p for p in all_prs if p.user_login == c.login and p.merged_at]
-        # Sort by size (proxy for complexity/impact possibility)
-        user_prs.sort(key=lambda x: x.additions + x.deletions, reverse=True)
-        # Take Top 10
-        sample_prs = user_prs[:10]
+        user_prs = merged_by_author.get(c.login, [])
+        sample_prs = _sample_prs(user_prs)
         
         if not sample_prs:
             continue
             
         print(f"Evaluating {c.login} (Baseline: {c.impact_score:.1f}) - {len(sample_prs)} PRs...")
-        
-        scores = []
-        for pr in sample_prs:
-            # Optimization: In a real app, we'd fetch the full body here if we skipped it in Stage 1.
-            # For this script, we'll use the title (and body if we had it).
-            # If we exclude body in Stage 1, we must fetch it here. 
-            # Since we can't easily re-fetch just the body without an API call, let's assume 
-            # we infer context from Title + Stats for this demo OR make one API call if needed.
-            # To be safe and fast, we'll use the metadata we have.
-            
-            evaluation = await evaluate_pr_with_llm(pr)
-            if evaluation:
-                pr.llm_quality_score = (
-                    evaluation.substance_score * 1.5
-                    + evaluation.product_impact_score * 1.5
-                    + evaluation.technical_quality_score
-                    + evaluation.blast_radius_score
-                ) / 5.0
-                pr.llm_reasoning = evaluation.reasoning
-                scores.append(pr.llm_quality_score)
-                # Save these updates back to the list
-        
-        if scores:
-            avg_quality = sum(scores) / len(scores)
-            c.avg_quality_score = avg_quality
-            
-            # Snapshot the baseline score before applying AI multiplier
-            c.baseline_impact_score = c.impact_score
-            
-            # Quality Multiplier:
-            # Avg 3 -> 1.0x (neutral)
-            # Avg 5 -> 1.4x (boost)
-            # Avg 1 -> 0.6x (penalty)
-            multiplier = 1.0 + (avg_quality - 3) * 0.2
-            c.impact_score = c.impact_score * multiplier
-            print(f"  -> Avg Quality: {avg_quality:.1f} | Multiplier: {multiplier:.2f} | Baseline: {c.baseline_impact_score:.1f} | AI Score: {c.impact_score:.1f}")
-
-async def evaluate_pr_with_llm(pr: PullRequest) -> Optional[PRQualityEvaluation]:
-    if not judge_agent:
-        return None
-        
-    content = f"""
+        jobs.append((c, sample_prs))
+    
+    if batch_size > 1:
+        # Batches follow candidate order, so each contributor's PRs mostly land in the same request
+        pending = [pr for _, sample_prs in jobs for pr in sample_prs if pr.number not in prefetched]
+        for i in range(0, len(pending), batch_size):
+            chunk = pending[i:i + batch_size]
+            batch = asyncio.ensure_future(evaluate_pr_batch(chunk, semaphore))
+            for pr in chunk:
+                prefetched[pr.number] = _batch_result(batch, pr.number)
+    
+    await asyncio.gather(*(evaluate_contributor(c, sample_prs) for c, sample_prs in jobs))
+
+    # Only this run's judgements stand. PRs carried over by an incremental merge would otherwise
+    # keep old scores, and --rescore would apply quality to contributors this run left at 1.0x.
+    for pr in all_prs:
+        if pr.number not in judged:
+            clear_judgement(pr)
+
+def rescore_snapshot(snap: CompactSnapshot, weights: Dict[str, float] = QUALITY_WEIGHTS):
+    """
+    Recomputes PR quality, multipliers and impact from the judge dimensions stored
+    in `snap`, without calling the LLM, over the same samples Stage 3 judged.
+    Returns the number of PRs rescored and of PRs judged before dimensions were
+    stored, which keep their quality.
+    """
+    return snap.rescore(weights, STAGE3_PRS_PER_CANDIDATE)
+
+# --- Uncertainty ---
+def attach_confidence_intervals(contributors: Dict[str, ContributorImpact], prs: List[PullRequest],
+                                issues: List[IssueActivity], samples: int = BOOTSTRAP_SAMPLES):
+    """Stores bootstrap intervals of impact score and rank on each human contributor."""
+    start = time.perf_counter()
+    intervals = bootstrap_intervals(contributors, prs, issues, samples=samples)
+    for login, row in zip(intervals.index, intervals.itertuples(index=False)):
+        c = contributors[login]
+        c.impact_ci_low, c.impact_ci_high, c.rank_ci_low, c.rank_ci_high = row
+    print(f"Bootstrap: {BOOTSTRAP_CONFIDENCE:.0%} intervals from {samples} resamples "
+          f"for {len(intervals)} contributors in {time.perf_counter() - start:.1f}s")
+
+def attach_snapshot_intervals(snap: CompactSnapshot, samples: int = BOOTSTRAP_SAMPLES):
+    """attach_confidence_intervals for the contributor table of a compact snapshot."""
+    start = time.perf_counter()
+    intervals = snapshot_intervals(snap, samples=samples)
+    contributors = snap.contributors.set_index("login")
+    contributors.loc[intervals.index, intervals.columns] = intervals
+    snap.contributors = contributors.reset_index()
+    print(f"Bootstrap: {BOOTSTRAP_CONFIDENCE:.0%} intervals from {samples} resamples "
+          f"for {len(intervals)} contributors in {time.perf_counter() - start:.1f}s")
+
+def render_pr_prompt(pr: PullRequest) -> str:
+    return f"""
     PR #{pr.number}: {pr.title}
     Code Stats: +{pr.additions} additions / -{pr.deletions} deletions across {pr.changed_files} files
     Total scope: {pr.additions + pr.deletions} lines changed
@@ -327,29 +681,354 @@ async def evaluate_pr_with_llm(pr: PullRequest) -> Optional[PRQualityEvaluation]
     
     Evaluate the engineering impact and quality of this contribution.
     """
+
+def pr_evaluation_key(pr: PullRequest) -> str:
+    # Batched and single-PR judgements share entries: both are keyed on the single-PR prompt
+    return evaluation_key(pr.number, render_pr_prompt(pr), JUDGE_SYSTEM_PROMPT, judge_model_name)
+
+async def evaluate_pr_with_llm(pr: PullRequest, use_cache: bool = True) -> Optional[PRQualityEvaluation]:
+    content = render_pr_prompt(pr)
+    key = pr_evaluation_key(pr)
+    if evaluation_cache and use_cache:
+        cached = evaluation_cache.get(key)
+        if cached is not None:
+            return PRQualityEvaluation.model_validate(cached)
+
+    if not judge_agent:
+        return None
     
     try:
         result = await judge_agent.run(content)
+        if evaluation_cache:
+            evaluation_cache.put(key, pr.number, result.output.model_dump())
         return result.output
     except Exception as e:
         print(f"LLM Error on PR #{pr.number}: {e}")
         return None
 
-def main():
+def render_batch_prompt(prs: List[PullRequest]) -> str:
+    sections = "\n".join(f"--- PR #{pr.number} ---{render_pr_prompt(pr)}" for pr in prs)
+    return f"Evaluate each of the following {len(prs)} Pull Requests.\n{sections}"
+
+async def evaluate_pr_batch(prs: List[PullRequest], semaphore: asyncio.Semaphore) -> Dict[int, Optional[PRQualityEvaluation]]:
+    """
+    Judges several PRs in one request so the system prompt is paid for once per
+    batch. PRs missing from the reply (or a failed / malformed reply) fall back to
+    individual `evaluate_pr_with_llm` calls.
+    """
+    keys = {pr.number: pr_evaluation_key(pr) for pr in prs}
+    results: Dict[int, Optional[PRQualityEvaluation]] = {}
+    if evaluation_cache:
+        for pr in prs:
+            cached = evaluation_cache.get(keys[pr.number])
+            if cached is not None:
+                results[pr.number] = PRQualityEvaluation.model_validate(cached)
+    todo = [pr for pr in prs if pr.number not in results]
+
+    if todo and batch_judge_agent:
+        try:
+            async with semaphore:
+                result = await batch_judge_agent.run(render_batch_prompt(todo))
+            wanted = {pr.number for pr in todo}
+            for item in result.output.evaluations:
+                # Ignore numbers we didn't ask for and duplicates
+                if item.pr_number in wanted and item.pr_number not in results:
+                    evaluation = PRQualityEvaluation(**item.model_dump(exclude={"pr_number"}))
+                    results[item.pr_number] = evaluation
+                    if evaluation_cache:
+                        evaluation_cache.put(keys[item.pr_number], item.pr_number, evaluation.model_dump())
+        except Exception as e:
+            print(f"LLM batch error on PRs {[pr.number for pr in todo]}: {e}")
+
+    missing = [pr for pr in todo if pr.number not in results]
+    if missing and batch_judge_agent:
+        print(f"Judging {len(missing)} PR(s) from an incomplete batch individually.")
+    # Already looked up above, so don't count them as cache misses a second time
+    fallback = await asyncio.gather(*(evaluate_pr_bounded(pr, semaphore, use_cache=False) for pr in missing))
+    results.update(zip((pr.number for pr in missing), fallback))
+    return results
+
+# --- Streaming pipeline ---
+STREAM_SPECULATE_TOP = 10   # only authors well inside the Stage 3 cut get early evaluations
+STREAM_RERANK_EVERY = 10
+
+class StreamingAggregator:
+    """
+    Consumer-side running totals for records as Stage 1 produces them, enough to
+    keep a provisional baseline ranking without waiting for the full fetch.
+
+    A contributor's baseline depends only on their own totals, which only grow. So
+    a rerank rescores just the contributors touched since the last one, and the
+    provisional top `top_n` is kept incrementally. An outsider enters only by
+    passing the lowest member, and members never drop below outsiders they beat.
+    Each author's Stage 3 sample is likewise kept as PRs arrive.
+    """
+
+    def __init__(self, top_n: int = STREAM_SPECULATE_TOP):
+        self.contributors: Dict[str, ContributorImpact] = {}
+        self.raw_pr_value: Dict[str, float] = {}
+        self.samples: Dict[str, List[PullRequest]] = {}  # _sample_prs of each author's merged PRs so far
+        self.count = 0
+        self.top_n = top_n
+        self.top: Dict[str, float] = {}  # provisional top_n: login -> baseline
+        self._dirty = set()
+        self._resample = set()  # top authors whose sample changed since qualifying_prs last ran
+
+    def add(self, record):
+        author, pr_model, reviewers, issue = record
+        self.count += 1
+        _ensure_contributor(self.contributors, author)
+        if pr_model is not None:
+            _record_pr(self.contributors, author, pr_model, reviewers)
+            self._dirty.update(r.login for r in reviewers)
+            if pr_model.merged_at:
+                login = pr_model.user_login
+                self.raw_pr_value[login] = self.raw_pr_value.get(login, 0) + PR_CREDIT * pr_type_multiplier(pr_model.title)
+                self.samples[login] = _sample_prs([*self.samples.get(login, ()), pr_model])
+                self._resample.add(login)
+        elif issue is not None:
+            _record_issue(self.contributors, issue)
+        self._dirty.add(author.login)
+
+    def rerank(self):
+        """Rescores the contributors touched since the last call and updates `top`."""
+        changed = [self.contributors[login] for login in self._dirty
+                   if login in self.contributors and not login.endswith('[bot]')]
+        self._dirty.clear()
+        if not changed:
+            return
+        scores = score_components(
+            [c.reviews_given for c in changed],
+            [c.additions for c in changed],
+            [c.deletions for c in changed],
+            [c.issues_closed for c in changed],
+            [c.issue_interactions for c in changed],
+            [self.raw_pr_value.get(c.login, 0) for c in changed],
+        )["total"].tolist()
+        for c, score in zip(changed, scores):
+            if c.login not in self.top and len(self.top) >= self.top_n:
+                lowest = min(self.top, key=self.top.get)
+                if score <= self.top[lowest]:
+                    continue
+                del self.top[lowest]
+                self._resample.add(c.login)  # newly in: its whole sample is new
+            elif c.login not in self.top:
+                self._resample.add(c.login)
+            self.top[c.login] = score
+
+    def qualifying_prs(self) -> List[PullRequest]:
+        """
+        Sample PRs of the provisional top authors, i.e. likely Stage 3 picks. Only
+        authors that entered the top or whose sample changed since the last call are
+        included; the caller has seen the rest.
+        """
+        self.rerank()
+        logins = [login for login in self.top if login in self._resample]
+        self._resample.clear()
+        return [pr for login in logins for pr in self.samples.get(login, ())]
+
+async def run_streaming_pipeline(fetch: Callable[..., tuple], concurrency: int = LLM_CONCURRENCY,
+                                 batch_size: int = LLM_BATCH_SIZE):
+    """
+    Runs Stage 1 on a worker thread and consumes its records as they arrive.
+    Merged PRs of clearly qualifying authors are sent to the LLM while the fetch
+    is still going; once it ends, Stages 2-3 run on the complete data (the final
+    rerank) and reuse those evaluations, so the output matches a sequential run.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def produce():
+        try:
+            return fetch(on_record=lambda record: loop.call_soon_threadsafe(queue.put_nowait, record))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    fetch_task = asyncio.ensure_future(asyncio.to_thread(produce))
+    aggregator = StreamingAggregator()
+    speculative: Dict[int, asyncio.Task] = {}
+    # Speculative and final evaluations share one concurrency budget
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
     try:
-        # 1. Volume
-        # Limiting to 50 for Speed in this demo, fully adjustable
-        prs, issues, contributors = fetch_stage_1_volume(days=30, limit=300)
-        
-        # 2. Baseline
+        while (record := await queue.get()) is not done:
+            aggregator.add(record)
+            if judge_agent and aggregator.count % STREAM_RERANK_EVERY == 0:
+                for pr in aggregator.qualifying_prs():
+                    if pr.number not in speculative:
+                        speculative[pr.number] = asyncio.create_task(evaluate_pr_bounded(pr, semaphore))
+        prs, issues, contributors = await fetch_task
+        print(f"Streaming: {len(speculative)} PR evaluations started during Stage 1.")
+
         calculate_baseline_metrics(contributors, prs)
-        
-        # Snapshot baseline for all contributors (Stage 3 will re-set for top 15 before multiplier)
         for c in contributors.values():
             c.baseline_impact_score = c.impact_score
+        await fetch_stage_3_quality(contributors, prs, prefetched=speculative, semaphore=semaphore,
+                                    batch_size=batch_size)
+        judged = {pr.number for pr in prs if pr.llm_quality_score is not None}
+        discarded = sum(1 for number, task in speculative.items() if number not in judged and task.done()
+                        and not task.cancelled() and task.exception() is None and task.result() is not None)
+        in_flight = sum(1 for task in speculative.values() if not task.done())
+        if discarded or in_flight:
+            print(f"Streaming: {discarded} speculative evaluation(s) finished for PRs outside the final selection, "
+                  f"{in_flight} cancelled in flight.")
+        return prs, issues, contributors
+    finally:
+        # Speculative picks that fell out of the final selection are simply dropped
+        for task in speculative.values():
+            task.cancel()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=f"Engineering impact pipeline for {REPO_NAME}")
+    parser.add_argument("--workers", type=int, default=STAGE1_WORKERS,
+                        help="Concurrent PR detail/review fetches in Stage 1 (1 = serial)")
+    parser.add_argument("--backend", choices=["rest", "graphql"], default=STAGE1_BACKEND,
+                        help="Stage 1 source: REST (issue listing + per-PR calls) or batched GraphQL pages")
+    parser.add_argument("--page-size", type=int, default=github_graphql.GRAPHQL_PAGE_SIZE,
+                        help="PRs per GraphQL query (max 100)")
+    parser.add_argument("--no-http-cache", action="store_true",
+                        help="Disable the on-disk ETag cache for GitHub REST responses")
+    parser.add_argument("--http-cache-mb", type=int, default=GITHUB_CACHE_MB,
+                        help="Size budget for the ETag cache before LRU eviction")
+    parser.add_argument("--max-rps", type=float, default=DEFAULT_MAX_RPS,
+                        help="Cap each token's request rate (default: unpaced until quota runs low)")
+    parser.add_argument("--no-scheduler", action="store_true",
+                        help="Disable quota tracking / token pooling and use PyGithub's defaults")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Continue Stage 1 from the last checkpoint ({DEFAULT_CHECKPOINT_PATH})")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY,
+                        help="Save Stage 1 progress every N items")
+    parser.add_argument("--stream", action="store_true",
+                        help="Overlap Stage 1 fetching with scoring and LLM evaluation of likely top PRs")
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_CONCURRENCY,
+                        help=f"Max concurrent LLM judge calls in Stage 3 (default: {LLM_CONCURRENCY})")
+    parser.add_argument("--llm-batch-size", type=int, default=LLM_BATCH_SIZE,
+                        help="Judge this many PRs per LLM request (1 = one request per PR)")
+    parser.add_argument("--mock-llm", action="store_true",
+                        help="Judge PRs with the deterministic offline mock in mock_llm.py instead of DeepSeek")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help=f"Always call the LLM judge instead of reusing results from {LLM_CACHE_PATH}")
+    parser.add_argument("--llm-cache-ttl-days", type=float, default=LLM_CACHE_TTL_DAYS,
+                        help="Age after which cached judge results are re-evaluated")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"Only fetch items updated since the last {DATA_FILE} and merge them in")
+    parser.add_argument("--snapshot-format", choices=storage.SNAPSHOT_FORMATS, default=SNAPSHOT_FORMAT,
+                        help=f"Write Parquet tables to {SNAPSHOT_DIR}/, the {DATA_FILE} export, or both")
+    parser.add_argument("--no-store", action="store_true",
+                        help=f"Skip writing the indexed SQLite store ({STORE_PATH}) the dashboard queries")
+    parser.add_argument("--bootstrap-samples", type=int, default=BOOTSTRAP_SAMPLES,
+                        help="Resamples for impact/rank confidence intervals (0 = skip)")
+    parser.add_argument("--rescore", action="store_true",
+                        help=f"Recompute quality and multipliers in {DATA_FILE} from stored judge scores, offline")
+    parser.add_argument("--quality-weights", default=",".join(f"{w:g}" for w in QUALITY_WEIGHTS.values()),
+                        help="Substance, product impact, technical quality and blast radius weights for --rescore")
+    return parser.parse_args(argv)
+
+def rescore(args):
+    loaded = load_tables()
+    if not loaded:
+        print(f"No {DATA_FILE} to rescore; run the pipeline first.")
+        return
+    values = [float(w) for w in args.quality_weights.split(",")]
+    if len(values) != len(QUALITY_WEIGHTS):
+        raise SystemExit(f"--quality-weights needs {len(QUALITY_WEIGHTS)} comma-separated values")
+    weights = dict(zip(QUALITY_WEIGHTS, values))
+    meta, tables = loaded
+    snap = CompactSnapshot.from_tables(meta, tables)
+    start = time.perf_counter()
+    rescored, legacy = rescore_snapshot(snap, weights)
+    elapsed = time.perf_counter() - start
+    if args.bootstrap_samples > 0:
+        # Multipliers changed, so the intervals did too
+        attach_snapshot_intervals(snap, args.bootstrap_samples)
+    saved = save_rescored(meta, tables, snap, args.snapshot_format, with_store=not args.no_store)
+    print(f"Rescored {rescored} PRs in {elapsed * 1000:.1f} ms; saved to {saved}.")
+    if legacy:
+        print(f"{legacy} PR(s) were judged before dimension scores were stored and kept their quality.")
+
+def main(argv=None):
+    global evaluation_cache
+    args = parse_args(argv)
+    if args.rescore:
+        return rescore(args)
+    try:
+        # The watermark for the next incremental run is when this fetch *started*
+        fetched_at = datetime.now(timezone.utc)
+        checkpoint = Stage1Checkpoint(DEFAULT_CHECKPOINT_PATH, every=args.checkpoint_every,
+                                      resume=args.resume, started_at=fetched_at)
+        fetch_kwargs = dict(workers=args.workers, backend=args.backend, page_size=args.page_size, checkpoint=checkpoint)
+
+        # Revalidate REST responses with ETags; GitHub doesn't charge quota for 304s
+        http_cache = None
+        if not args.no_http_cache:
+            http_cache = ResponseCache(GITHUB_CACHE_PATH, max_bytes=args.http_cache_mb * 1024 * 1024)
+        # Track quota per token and wait for resets instead of failing mid-run
+        scheduler = None
+        if GITHUB_TOKENS and not args.no_scheduler:
+            scheduler = RateLimitScheduler(GITHUB_TOKENS, max_rps=args.max_rps)
+            pacing = f"{args.max_rps:g} req/s each" if args.max_rps else "paced only when quota runs low"
+            print(f"Rate-limit scheduler: {len(scheduler.tokens)} token(s), {pacing}")
+        github_transport.configure(cache=http_cache, scheduler=scheduler)
+        if args.mock_llm:
+            from mock_llm import MockJudge
+            configure_judge(MockJudge(latency_ms=50).model)
+            print("LLM judge: offline mock (deterministic scores)")
+        # Merged PRs never change, so their evaluations carry over between runs
+        if not args.no_llm_cache:
+            evaluation_cache = EvaluationCache(LLM_CACHE_PATH, ttl_seconds=args.llm_cache_ttl_days * 86400)
+
+        # 1. Volume
+        previous = load_snapshot() if args.incremental else None
+        if args.incremental and not (previous and previous.repo_name == REPO_NAME
+                                     and previous.fetched_at >= fetched_at - timedelta(days=WINDOW_DAYS)):
+            print("No usable previous snapshot; falling back to a full fetch.")
+            previous = None
+
+        def fetch(**extra):
+            if previous:
+                return fetch_incremental(previous, days=WINDOW_DAYS, **fetch_kwargs, **extra)
+            # Limiting to 50 for Speed in this demo, fully adjustable
+            return fetch_stage_1_volume(days=WINDOW_DAYS, limit=300, **fetch_kwargs, **extra)
+
+        if args.stream:
+            # Stages 1-3 overlapped; see run_streaming_pipeline
+            prs, issues, contributors = asyncio.run(run_streaming_pipeline(fetch, concurrency=args.llm_concurrency,
+                                                                      batch_size=args.llm_batch_size))
+        else:
+            prs, issues, contributors = fetch()
+
+        # A resumed run keeps the original start as its watermark
+        fetched_at = checkpoint.started_at or fetched_at
+
+        if http_cache:
+            stats = http_cache.stats()
+            print(f"HTTP cache: {stats['hits']} hits / {stats['misses']} misses "
+                  f"({stats['hit_rate']:.0%} revalidated), {stats['size_bytes'] / 1e6:.1f} MB stored")
+        if scheduler:
+            stats = scheduler.stats()
+            print(f"Scheduler: {stats['requests']} requests, {stats['retries']} rate-limit retries, "
+                  f"{stats['wait_seconds']:.1f}s spent waiting for quota")
         
-        # 3. Quality (Async)
-        asyncio.run(fetch_stage_3_quality(contributors, prs))
+        if not args.stream:
+            # 2. Baseline
+            calculate_baseline_metrics(contributors, prs)
+            
+            # Snapshot baseline for all contributors (Stage 3 will re-set for top 15 before multiplier)
+            for c in contributors.values():
+                c.baseline_impact_score = c.impact_score
+            
+            # 3. Quality (Async)
+            asyncio.run(fetch_stage_3_quality(contributors, prs, concurrency=args.llm_concurrency,
+                                             batch_size=args.llm_batch_size))
+
+        # 4. Uncertainty: how much of the ranking is noise
+        if args.bootstrap_samples > 0:
+            attach_confidence_intervals(contributors, prs, issues, args.bootstrap_samples)
+
+        if evaluation_cache:
+            stats = evaluation_cache.stats()
+            print(f"LLM cache: {stats['hits']} hits / {stats['misses']} misses "
+                  f"({stats['hit_rate']:.0%} reused), {stats['entries']} entries, {stats['evictions']} evicted")
 
         # Final Sort & Save
         sorted_metrics = sorted(contributors.values(), key=lambda x: x.impact_score, reverse=True)
@@ -357,23 +1036,25 @@ def main():
 
         impact_data = ImpactData(
             repo_name=REPO_NAME,
-            cutoff_date=datetime.now(timezone.utc) - timedelta(days=30),
-            fetched_at=datetime.now(timezone.utc),
+            cutoff_date=fetched_at - timedelta(days=WINDOW_DAYS),
+            fetched_at=fetched_at,
             pull_requests=prs,
             issue_activities=issues,
             contributor_metrics=filtered_metrics
         )
         
-        with open("impact_data.json", "w") as f:
-            f.write(impact_data.model_dump_json(indent=2))
+        saved = save_snapshot(impact_data, args.snapshot_format, with_store=not args.no_store)
+        checkpoint.clear()
             
-        print(f"\nSUCCESS: Engine run complete. Data saved to impact_data.json.")
+        print(f"\nSUCCESS: Engine run complete. Data saved to {saved}.")
         print("Run 'streamlit run dashboard.py' to view results.")
 
     except Exception as e:
         print(f"CRITICAL ERROR: {e}")
         import traceback
         traceback.print_exc()
+        if os.path.exists(DEFAULT_CHECKPOINT_PATH):
+            print(f"Stage 1 progress is saved in {DEFAULT_CHECKPOINT_PATH}; rerun with --resume to continue.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,263 @@
+"""
+Local stand-in for the LLM judge.
+
+MockJudge is a pydantic-ai FunctionModel that answers the judge agents (single
+and batched) with deterministic PRQualityEvaluation scores derived from the PR
+number, after an injected latency, with optional failures and token counts.
+Plug it in with `main.configure_judge(MockJudge(...).model)`.
+
+The benchmark runs Stage 3 over a fixed candidate pool for each concurrency /
+batch-size setting and reports throughput, request counts, tokens and tail
+latency, all offline:
+
+    python mock_llm.py --latency-ms 800 --concurrency 1,8,32 --batch-size 1,5
+    python mock_llm.py --snapshot impact_data.json --error-rate 0.05
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import random
+import re
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, ToolCallPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.usage import RequestUsage
+
+MOCK_MODEL_NAME = "mock-judge"
+DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+_PR_NUMBER = re.compile(r"PR #(\d+):")
+
+
+def mock_scores(pr_number: int) -> Dict[str, int]:
+    """Stable 1-5 scores per PR, identical across runs, modes and processes."""
+    digest = hashlib.sha256(str(pr_number).encode()).digest()
+    return {
+        "substance_score": 1 + digest[0] % 5,
+        "product_impact_score": 1 + digest[1] % 5,
+        "technical_quality_score": 1 + digest[2] % 5,
+        "blast_radius_score": 1 + digest[3] % 5,
+    }
+
+
+class MockJudge:
+    """
+    `latency_ms` is the fixed / mean / median request time for the "fixed",
+    "uniform" (0.5x-1.5x) and "lognormal" (with `sigma`) distributions.
+    `error_rate` fails whole requests with a 503; `drop_rate` leaves PRs out of
+    batched replies. `max_inflight` emulates a provider-side concurrency cap, so
+    queueing shows up in the measured latency.
+    """
+
+    def __init__(self, latency_ms: float = 500.0, distribution: str = "lognormal", sigma: float = 0.5,
+                 error_rate: float = 0.0, drop_rate: float = 0.0, output_tokens: int = 120,
+                 max_inflight: Optional[int] = None, seed: int = 0):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {DISTRIBUTIONS}")
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.output_tokens = output_tokens
+        self.max_inflight = max_inflight
+        self._rng = random.Random(seed)
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self.model = FunctionModel(self._respond, model_name=MOCK_MODEL_NAME)
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_token_total = 0
+        self.latencies: List[float] = []
+        self._inflight = None  # bound to the running event loop on first use
+
+    def _sample_latency(self) -> float:
+        if self.distribution == "fixed":
+            ms = self.latency_ms
+        elif self.distribution == "uniform":
+            ms = self._rng.uniform(0.5, 1.5) * self.latency_ms
+        else:
+            ms = self._rng.lognormvariate(0.0, self.sigma) * self.latency_ms
+        return ms / 1000.0
+
+    async def _respond(self, messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        start = time.perf_counter()
+        if self.max_inflight and self._inflight is None:
+            self._inflight = asyncio.Semaphore(self.max_inflight)
+        async with (self._inflight or contextlib.nullcontext()):
+            await asyncio.sleep(self._sample_latency())
+        self.latencies.append(time.perf_counter() - start)
+        self.requests += 1
+
+        prompt_text = " ".join(
+            str(part.content) for message in messages if isinstance(message, ModelRequest)
+            for part in message.parts if hasattr(part, "content")
+        )
+        prompt_tokens = len(prompt_text) // 4 + len(info.instructions or "") // 4
+        self.input_tokens += prompt_tokens
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            raise ModelHTTPError(503, MOCK_MODEL_NAME, body="injected failure")
+
+        user_prompt = next(
+            (part.content for message in reversed(messages) if isinstance(message, ModelRequest)
+             for part in message.parts if isinstance(part, UserPromptPart)),
+            "",
+        )
+        numbers = [int(n) for n in _PR_NUMBER.findall(str(user_prompt))]
+        tool = info.output_tools[0]
+        if "evaluations" in tool.parameters_json_schema.get("properties", {}):
+            kept = [n for n in numbers if self._rng.random() >= self.drop_rate]
+            args = {"evaluations": [
+                {"pr_number": n, **mock_scores(n), "reasoning": f"Mock evaluation of PR #{n}."} for n in kept
+            ]}
+            output_tokens = self.output_tokens * len(kept)
+        else:
+            n = numbers[0] if numbers else 0
+            args = {**mock_scores(n), "reasoning": f"Mock evaluation of PR #{n}."}
+            output_tokens = self.output_tokens
+        self.output_token_total += output_tokens
+        return ModelResponse(
+            parts=[ToolCallPart(tool.name, args)],
+            usage=RequestUsage(input_tokens=prompt_tokens, output_tokens=output_tokens),
+            model_name=MOCK_MODEL_NAME,
+        )
+
+    def stats(self) -> Dict[str, float]:
+        ordered = sorted(self.latencies)
+
+        def pct(q: float) -> float:
+            return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_token_total,
+            "p50": statistics.median(ordered) if ordered else 0.0,
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+        }
+
+
+# --- Stage 3 benchmark ---
+def synthetic_candidates(authors: int = 30, prs_per_author: int = 12, seed: int = 0):
+    """A Stage 3 input: merged PRs plus their aggregated contributors."""
+    import main
+    from models import Contributor, PullRequest
+    from datetime import datetime, timezone
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    prefixes = ["feat: ", "fix: ", "refactor: ", "chore: ", "docs: ", ""]
+    records, number = [], 0
+    for a in range(authors):
+        author = Contributor(login=f"dev-{a:03d}", avatar_url="", html_url="")
+        for _ in range(rng.randint(1, prs_per_author)):
+            number += 1
+            pr = PullRequest(
+                number=number, title=f"{rng.choice(prefixes)}change {number}", user_login=author.login,
+                state="closed", created_at=now, merged_at=now, closed_at=now,
+                additions=int(rng.lognormvariate(4, 1.5)), deletions=int(rng.lognormvariate(3, 1.5)),
+                changed_files=rng.randint(1, 40), html_url="",
+            )
+            records.append((author, pr, [], None))
+    prs, _, contributors = main._aggregate_records(records)
+    return prs, contributors
+
+
+def _baseline(prs, contributors):
+    import main
+    prs = [p.model_copy(deep=True) for p in prs]
+    contributors = {k: c.model_copy(deep=True) for k, c in contributors.items()}
+    main.calculate_baseline_metrics(contributors, prs)
+    for c in contributors.values():
+        c.baseline_impact_score = c.impact_score
+    return prs, contributors
+
+
+def run_stage_3(judge: MockJudge, prs, contributors, concurrency: int, batch_size: int) -> dict:
+    import main
+    prs, contributors = _baseline(prs, contributors)
+    judge.reset()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(main.fetch_stage_3_quality(contributors, prs, concurrency=concurrency, batch_size=batch_size))
+    elapsed = time.perf_counter() - start
+    judged = sum(1 for p in prs if p.llm_quality_score is not None)
+    return {"concurrency": concurrency, "batch_size": batch_size, "seconds": elapsed, "judged": judged,
+            "prs_per_s": judged / elapsed if elapsed else 0.0, **judge.stats()}
+
+
+def print_report(results: List[dict]):
+    print(f"\n{'conc':>5} {'batch':>5} {'seconds':>8} {'judged':>7} {'PRs/s':>7} {'requests':>9} {'errors':>7} "
+          f"{'in tok':>8} {'out tok':>8} {'p50 s':>6} {'p95 s':>6} {'p99 s':>6}")
+    for r in results:
+        print(f"{r['concurrency']:>5} {r['batch_size']:>5} {r['seconds']:>8.2f} {r['judged']:>7} {r['prs_per_s']:>7.1f} "
+              f"{r['requests']:>9} {r['errors']:>7} {r['input_tokens']:>8} {r['output_tokens']:>8} "
+              f"{r['p50']:>6.2f} {r['p95']:>6.2f} {r['p99']:>6.2f}")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Stage 3 against a local mock LLM judge")
+    parser.add_argument("--snapshot", help="Use the PRs and contributors of an impact_data.json snapshot")
+    parser.add_argument("--authors", type=int, default=30, help="Synthetic candidate pool size")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated Stage 3 concurrency levels")
+    parser.add_argument("--batch-size", default="1,5", help="Comma-separated PRs-per-request settings")
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Lognormal spread (tail heaviness)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of PRs missing from batch replies")
+    parser.add_argument("--output-tokens", type=int, default=120, help="Tokens per returned evaluation")
+    parser.add_argument("--max-inflight", type=int, default=None, help="Provider-side concurrency cap")
+    parser.add_argument("--cache", action="store_true", help="Also time a warm rerun through the evaluation cache")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    import main
+    from llm_cache import EvaluationCache
+
+    if args.snapshot:
+        snapshot = main.load_snapshot(args.snapshot)
+        prs = [p.model_copy(update={"llm_quality_score": None, "llm_reasoning": None}) for p in snapshot.pull_requests]
+        contributors = {c.login: c for c in main.merge_incremental(
+            snapshot, [], [], {}, cutoff_date=min(p.created_at for p in prs)
+        )[2].values()}
+    else:
+        prs, contributors = synthetic_candidates(args.authors, seed=args.seed)
+
+    judge = MockJudge(args.latency_ms, args.distribution, args.sigma, args.error_rate, args.drop_rate,
+                      args.output_tokens, args.max_inflight, args.seed)
+    main.configure_judge(judge.model)
+    print(f"Mock judge: {args.distribution} {args.latency_ms:.0f} ms, {args.error_rate:.0%} errors; "
+          f"{len(prs)} PRs / {len(contributors)} contributors")
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for batch_size in [int(b) for b in args.batch_size.split(",")]:
+            for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                main.evaluation_cache = None
+                results.append(run_stage_3(judge, prs, contributors, concurrency, batch_size))
+                if args.cache:
+                    main.evaluation_cache = EvaluationCache(f"{cache_dir}/c{concurrency}-b{batch_size}.sqlite")
+                    run_stage_3(judge, prs, contributors, concurrency, batch_size)
+                    warm = run_stage_3(judge, prs, contributors, concurrency, batch_size)
+                    warm["concurrency"] = f"{concurrency}w"
+                    results.append(warm)
+                    main.evaluation_cache.close()
+    main.evaluation_cache = None
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -19,6 +19,7 @@ class PullRequest(BaseModel):
     user_login: str
     state: str
     created_at: datetime
+    updated_at: Optional[datetime] = None
     merged_at: Optional[datetime]
     closed_at: Optional[datetime]
     additions: int = 0
@@ -29,12 +30,18 @@ class PullRequest(BaseModel):
     # LLM Metrics
     llm_quality_score: Optional[float] = None
     llm_reasoning: Optional[str] = None
+    # Raw judge dimensions (1-5), kept so quality can be reweighted without re-judging
+    llm_substance_score: Optional[int] = None
+    llm_product_impact_score: Optional[int] = None
+    llm_technical_quality_score: Optional[int] = None
+    llm_blast_radius_score: Optional[int] = None
 
 class IssueActivity(BaseModel):
     issue_number: int
     title: str
     user_login: str
     created_at: datetime
+    updated_at: Optional[datetime] = None
     event_type: str # e.g., 'commented', 'closed', 'referenced'
     body: Optional[str]
     
@@ -52,8 +59,19 @@ class ContributorImpact(BaseModel):
     issues_closed: int = 0
     impact_score: float = 0.0
     baseline_impact_score: float = 0.0
+    # Baseline components from Stage 2 (None in snapshots written before they were stored)
+    shipping_score: Optional[float] = None
+    review_score: Optional[float] = None
+    volume_score: Optional[float] = None
+    issue_score: Optional[float] = None
     # LLM Metrics
     avg_quality_score: float = 0.0
+    ai_multiplier: Optional[float] = None
+    # Bootstrap confidence intervals (rank 1 = top)
+    impact_ci_low: Optional[float] = None
+    impact_ci_high: Optional[float] = None
+    rank_ci_low: Optional[float] = None
+    rank_ci_high: Optional[float] = None
     
 class ImpactData(BaseModel):
     repo_name: str
@@ -0,0 +1,161 @@
+"""
+Rate-limit-aware request scheduling for GitHub.
+
+Each token's remaining quota and reset time are tracked per API resource
+(core / graphql / search) from the `X-RateLimit-*` response headers. Requests go
+to the token with the most headroom and are paced by a per-token token bucket,
+so a long run waits for quota instead of failing with 403s mid-fetch. While
+quota is plentiful requests go out unpaced unless a `max_rps` cap is set.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple
+
+DEFAULT_MAX_RPS = None   # steady-state cap per token; None paces only when quota runs low
+DEFAULT_BURST = 20
+DEFAULT_RESERVE = 0.1    # below this fraction of quota, spread what's left until reset
+DEFAULT_MARGIN = 10      # requests per token never spent, to absorb in-flight calls
+
+
+def resource_for_path(path: str) -> str:
+    path = path.split("?", 1)[0]
+    if path.rstrip("/").endswith("/graphql"):
+        return "graphql"
+    if "/search/" in path:
+        return "search"
+    return "core"
+
+
+def _headroom(b: "_Budget") -> float:
+    return float("inf") if b.remaining is None else b.remaining
+
+
+@dataclass
+class _Budget:
+    remaining: Optional[int] = None   # unknown until the first response
+    limit: Optional[int] = None
+    reset_at: float = 0.0
+    blocked_until: float = 0.0        # secondary limit / Retry-After
+    tokens: float = 0.0               # token-bucket level
+    refilled_at: float = field(default_factory=time.monotonic)
+
+
+class RateLimitScheduler:
+    """
+    Thread-safe pool of GitHub tokens. `acquire()` blocks until some token may
+    send a request; `observe()` feeds back the response headers.
+    """
+
+    def __init__(self, tokens: List[str], max_rps: Optional[float] = DEFAULT_MAX_RPS, burst: int = DEFAULT_BURST,
+                 reserve: float = DEFAULT_RESERVE, margin: int = DEFAULT_MARGIN):
+        if not tokens:
+            raise ValueError("RateLimitScheduler needs at least one token")
+        self.tokens = list(dict.fromkeys(tokens))
+        self.max_rps = float("inf") if max_rps is None else max_rps
+        self.burst = burst
+        self.reserve = reserve
+        self.margin = margin
+        self.requests = 0
+        self.retries = 0
+        self.wait_seconds = 0.0  # wall-clock time with at least one acquire() blocked
+        self._waiters = 0
+        self._blocked_since = 0.0
+        self._budgets: Dict[Tuple[str, str], _Budget] = {}
+        self._lock = threading.Lock()
+
+    def _budget(self, token: str, resource: str) -> _Budget:
+        key = (token, resource)
+        if key not in self._budgets:
+            self._budgets[key] = _Budget(tokens=float(self.burst))
+        return self._budgets[key]
+
+    def _rate(self, b: _Budget, wall: float) -> float:
+        # Full speed while quota is plentiful; near exhaustion, spread the rest until the reset
+        if b.remaining is None or b.limit is None or b.remaining > b.limit * self.reserve:
+            return self.max_rps
+        spendable = max(b.remaining - self.margin, 0)
+        return min(self.max_rps, spendable / max(b.reset_at - wall, 1.0))
+
+    def _wait_for(self, b: _Budget, now: float, wall: float) -> float:
+        """Seconds until this budget can send one request (0 = now)."""
+        if b.blocked_until > wall:
+            return b.blocked_until - wall
+        if b.remaining is not None and b.reset_at and b.reset_at <= wall:
+            # The window rolled over; the next response will report the fresh count
+            b.remaining = None
+        if b.remaining is not None and b.remaining <= self.margin and b.reset_at > wall:
+            return b.reset_at - wall + 1.0
+        rate = self._rate(b, wall)
+        if rate == float("inf"):
+            # Unpaced: keep the bucket full so pacing starts from a clean burst if quota runs low
+            b.tokens, b.refilled_at = float(self.burst), now
+            return 0.0
+        b.tokens = min(float(self.burst), b.tokens + (now - b.refilled_at) * rate)
+        b.refilled_at = now
+        if b.tokens >= 1.0:
+            return 0.0
+        return (1.0 - b.tokens) / rate if rate > 0 else max(b.reset_at - wall, 1.0)
+
+    def acquire(self, resource: str = "core") -> str:
+        waiting = False
+        while True:
+            with self._lock:
+                now, wall = time.monotonic(), time.time()
+                waits = {t: self._wait_for(self._budget(t, resource), now, wall) for t in self.tokens}
+                ready = [t for t, w in waits.items() if w == 0.0]
+                if ready:
+                    # Most headroom first; unknown budgets are treated as full
+                    token = max(ready, key=lambda t: _headroom(self._budget(t, resource)))
+                    b = self._budget(token, resource)
+                    b.tokens -= 1.0
+                    if b.remaining is not None:
+                        b.remaining -= 1
+                    self.requests += 1
+                    if waiting:
+                        self._waiters -= 1
+                        if not self._waiters:
+                            self.wait_seconds += now - self._blocked_since
+                    return token
+                delay = min(waits.values())
+                if not waiting:
+                    # Threads blocked at the same time count once, so the total stays within the run time
+                    waiting = True
+                    if not self._waiters:
+                        self._blocked_since = now
+                    self._waiters += 1
+            if delay > 5:
+                print(f"Rate limit: all {len(self.tokens)} token(s) exhausted for '{resource}', waiting {delay:.0f}s...")
+            time.sleep(delay)
+
+    def observe(self, token: str, resource: str, status: int, headers: Mapping[str, str]) -> bool:
+        """Updates the token's budget from a response. Returns True if the request should be retried."""
+        h = {k.lower(): v for k, v in headers.items()}
+        resource = h.get("x-ratelimit-resource", resource)
+        wall = time.time()
+        with self._lock:
+            b = self._budget(token, resource)
+            if "x-ratelimit-remaining" in h:
+                remaining = int(h["x-ratelimit-remaining"])
+                reset_at = float(h.get("x-ratelimit-reset", 0))
+                # Responses land out of order across threads: within one window keep the lowest count
+                if reset_at > b.reset_at or b.remaining is None:
+                    b.remaining = remaining
+                else:
+                    b.remaining = min(b.remaining, remaining)
+                b.reset_at = max(b.reset_at, reset_at)
+                b.limit = int(h.get("x-ratelimit-limit", b.limit or 0)) or b.limit
+
+            if status not in (403, 429):
+                return False
+            if "retry-after" in h:
+                b.blocked_until = wall + float(h["retry-after"])
+            elif b.remaining == 0:
+                pass  # primary limit: the token sits out until reset_at
+            else:
+                return False  # a real permission error
+            self.retries += 1
+            return True
+
+    def stats(self) -> Dict[str, float]:
+        return {"requests": self.requests, "retries": self.retries, "wait_seconds": self.wait_seconds}
@@ -0,0 +1,223 @@
+"""
+Vectorized Stage 2 scoring.
+
+The baseline formulas run as column operations over the whole contributor
+table: merged-PR credit is summed per author through one integer index, and the
+log terms are evaluated with `math` on the distinct values of each column, so
+every score is bit-for-bit what the per-contributor Python formulas produce.
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from models import ContributorImpact, PullRequest
+
+# Conventional commit prefixes -> credit multiplier, checked in this order
+PR_TYPE_MULTIPLIERS = [
+    (('feat', 'feature'), 1.5),                      # Features drive product forward
+    (('fix', 'bug', 'hotfix', 'patch'), 1.3),        # Fixes resolve user pain
+    (('refactor', 'perf', 'optimize'), 1.1),         # Refactors improve long-term health
+    (('chore', 'ci', 'docs', 'style', 'bump'), 0.7), # Maintenance is necessary but lower impact
+]
+DEFAULT_PR_TYPE_MULTIPLIER = 1.0
+PR_CREDIT = 10  # points per merged PR before the type multiplier
+
+# Scale factor applied to each component's dampened (log) value
+COMPONENT_SCALES = {
+    "shipping_score": 15,
+    "review_score": 30,
+    "volume_score": 8,
+    "issue_score": 10,
+}
+
+_LONGEST_PREFIX = max(len(p) for prefixes, _ in PR_TYPE_MULTIPLIERS for p in prefixes)
+
+
+def pr_type_multiplier(title: str) -> float:
+    title_lower = title.lower().strip()
+    # Detect conventional commit prefixes: feat:, fix:, refactor:, chore:, docs:, etc.
+    for prefixes, multiplier in PR_TYPE_MULTIPLIERS:
+        if title_lower.startswith(prefixes):
+            return multiplier
+    return DEFAULT_PR_TYPE_MULTIPLIER
+
+
+def _strings(values) -> pa.Array:
+    if isinstance(values, pa.ChunkedArray):
+        return values.combine_chunks()
+    return values if isinstance(values, pa.Array) else pa.array(values, type=pa.string())
+
+
+def pr_type_multipliers(titles) -> np.ndarray:
+    """
+    `pr_type_multiplier` for many titles (a sequence of str or an Arrow string
+    array, chunked or not), classifying each distinct title head once.
+    """
+    titles = _strings(titles)
+    # Only the first few characters can match a prefix, and heads repeat far more than titles
+    heads = pc.utf8_slice_codeunits(titles, 0, _LONGEST_PREFIX).dictionary_encode()
+    codes = heads.indices.to_numpy(zero_copy_only=False)
+    unique_heads = heads.dictionary.to_pylist()
+    multipliers = np.array([pr_type_multiplier(h) for h in unique_heads], dtype=float)[codes]
+    # Leading whitespace shifts the prefix past the head; classify those titles in full, once each
+    undecided = [k for k, h in enumerate(unique_heads) if len(h) == _LONGEST_PREFIX and h[0].isspace()]
+    if undecided:
+        rows = np.flatnonzero(np.isin(codes, undecided))
+        full_codes, full_titles = pd.factorize(np.asarray(titles.take(rows).to_pylist(), dtype=object))
+        multipliers[rows] = np.array([pr_type_multiplier(t) for t in full_titles], dtype=float)[full_codes]
+    return multipliers
+
+
+def _exact(fn, values: np.ndarray) -> np.ndarray:
+    """Applies a `math` function elementwise via the distinct values (NumPy's logs can differ by an ulp)."""
+    codes, unique = pd.factorize(np.asarray(values), use_na_sentinel=False)
+    return np.array([fn(v) for v in unique.tolist()], dtype=float)[codes]
+
+
+def raw_pr_credit(author_rows: np.ndarray, pr_numbers: np.ndarray, pr_titles, pr_merged: np.ndarray,
+                  rows: int) -> np.ndarray:
+    """
+    Summed type-weighted credit of each of `rows` contributors' merged PRs, with
+    each PR's author given as a contributor row (-1 for anyone else).
+    """
+    titles = _strings(pr_titles)
+    merged = np.flatnonzero(np.asarray(pr_merged, dtype=bool))
+    numbers = np.asarray(pr_numbers)
+    if not pd.Index(numbers).is_unique:
+        # A number listed twice takes the multiplier of its last title, as a dict keyed by number would
+        last = pd.Series(np.arange(len(numbers)), index=numbers)
+        last = last[~last.index.duplicated(keep="last")]
+        titles = titles.take(last.reindex(numbers).to_numpy())
+    multipliers = pr_type_multipliers(titles.take(merged))
+    pr_rows = np.asarray(author_rows)[merged]
+    known = pr_rows >= 0
+    pr_rows, credits = pr_rows[known], PR_CREDIT * multipliers[known]
+    raw = np.bincount(pr_rows, weights=credits, minlength=rows)
+    # Whole-number credits sum exactly in any order. Authors with fractional credits (10 * 1.1)
+    # are re-summed with the builtin `sum`, so rounding matches the per-contributor formula.
+    inexact = np.zeros(rows, dtype=bool)
+    inexact[pr_rows[credits != np.trunc(credits)]] = True
+    inexact = inexact[pr_rows]
+    if inexact.any():
+        order = np.argsort(pr_rows[inexact], kind="stable")
+        group_rows, group_credits = pr_rows[inexact][order], credits[inexact][order].tolist()
+        bounds = [0, *(np.flatnonzero(np.diff(group_rows)) + 1).tolist(), len(group_credits)]
+        raw[group_rows[bounds[:-1]]] = [sum(group_credits[a:b]) for a, b in zip(bounds, bounds[1:])]
+    return raw
+
+
+def raw_pr_values(logins: Sequence[str], pr_authors: Sequence[str], pr_numbers: Sequence[int],
+                  pr_titles: Sequence[str], pr_merged: Sequence[bool]) -> np.ndarray:
+    """Summed type-weighted credit of each login's merged PRs, in PR order."""
+    merged = np.asarray(pr_merged, dtype=bool)
+    author_codes, authors = pd.factorize(np.asarray(pr_authors, dtype=object)[merged])
+    rows = np.full(len(merged), -1, dtype=np.int64)
+    if len(author_codes):
+        rows[merged] = pd.Index(np.asarray(logins, dtype=object)).get_indexer(authors)[author_codes]
+    return raw_pr_credit(rows, pr_numbers, pr_titles, merged, len(logins))
+
+
+def score_components(reviews_given, additions, deletions, issues_closed, issue_interactions,
+                     raw_pr_value) -> pd.DataFrame:
+    """
+    Baseline impact components for a contributor table given as columns. Counts
+    may be fractional (e.g. time-decayed activity).
+    """
+    reviews_given = np.asarray(reviews_given)
+    issues_closed = np.asarray(issues_closed)
+    issue_interactions = np.asarray(issue_interactions)
+
+    # --- 1. SHIPPING SCORE (40% weight) ---
+    # Primary value driver: merged PRs move the product forward.
+    # Base: 10 pts per merged PR, with type multiplier from title.
+    # Log-dampened so 20 trivial PRs don't outweigh 3 complex ones.
+    shipping_score = _exact(math.log, 1 + np.asarray(raw_pr_value, dtype=float)) * COMPONENT_SCALES["shipping_score"]  # Scale factor for readability
+
+    # --- 2. REVIEW SCORE (30% weight) ---
+    # Force multiplier: reviews unblock teammates and maintain quality.
+    # Log-dampened: 10 rubber-stamp reviews ≠ 10× the value of 1 thoughtful review.
+    # math.log(1 + 5) ≈ 1.79, math.log(1 + 20) ≈ 3.04 — natural diminishing returns.
+    review_score = _exact(math.log, 1 + reviews_given) * COMPONENT_SCALES["review_score"]
+
+    # --- 3. CODE VOLUME (15% weight) ---
+    # Substance signal: larger changes require more engineering effort.
+    # log10-dampened: 100 lines → 2, 10000 lines → 4. Prevents massive refactors from dominating.
+    volume_score = _exact(math.log10, 1 + np.asarray(additions) + np.asarray(deletions)) * COMPONENT_SCALES["volume_score"]
+
+    # --- 4. ISSUE RESOLUTION (15% weight) ---
+    # Problem-solving: closing issues (5 pts) is 5× more valuable than opening/commenting (1 pt).
+    # Reflects that resolution > identification in real-world impact.
+    issue_points = (issues_closed * 5) + (np.maximum(issue_interactions - issues_closed, 0) * 1)
+    issue_score = _exact(math.log, 1 + issue_points) * COMPONENT_SCALES["issue_score"]
+
+    return pd.DataFrame({
+        "shipping_score": shipping_score,
+        "review_score": review_score,
+        "volume_score": volume_score,
+        "issue_score": issue_score,
+        "total": shipping_score + review_score + volume_score + issue_score,
+    })
+
+
+def score_contributors(contributors: Iterable[ContributorImpact], prs: Sequence[PullRequest]) -> pd.DataFrame:
+    """Component scores for `contributors` (one row each, indexed by login) from their totals and `prs`."""
+    contributors = list(contributors)
+    logins = [c.login for c in contributors]
+    raw = raw_pr_values(
+        logins,
+        [p.user_login for p in prs],
+        [p.number for p in prs],
+        [p.title for p in prs],
+        [bool(p.merged_at) for p in prs],
+    )
+    scores = score_components(
+        [c.reviews_given for c in contributors],
+        [c.additions for c in contributors],
+        [c.deletions for c in contributors],
+        [c.issues_closed for c in contributors],
+        [c.issue_interactions for c in contributors],
+        raw,
+    )
+    scores.index = pd.Index(logins, name="login")
+    return scores
+
+
+# Stage 3 judge dimensions (PullRequest field -> weight); quality is their weighted mean, still on 1-5
+QUALITY_WEIGHTS = {
+    "llm_substance_score": 1.5,
+    "llm_product_impact_score": 1.5,
+    "llm_technical_quality_score": 1.0,
+    "llm_blast_radius_score": 1.0,
+}
+
+
+def pr_quality_score(pr: PullRequest, weights: Dict[str, float] = QUALITY_WEIGHTS) -> Optional[float]:
+    """Weighted 1-5 quality of a PR from its stored judge dimensions, or None if it was never judged."""
+    dimensions = [getattr(pr, field) for field in weights]
+    if any(d is None for d in dimensions):
+        return None
+    total = 0.0
+    for d, w in zip(dimensions, weights.values()):
+        total += d * w
+    return total / sum(weights.values())
+
+
+def quality_multiplier(avg_quality: float) -> float:
+    # Quality Multiplier:
+    # Avg 3 -> 1.0x (neutral)
+    # Avg 5 -> 1.4x (boost)
+    # Avg 1 -> 0.6x (penalty)
+    return 1.0 + (avg_quality - 3) * 0.2
+
+
+def index_merged_prs(prs: Iterable[PullRequest]) -> Dict[str, List[PullRequest]]:
+    """Merged PRs grouped by author, each list in the original order."""
+    by_author: Dict[str, List[PullRequest]] = {}
+    for p in prs:
+        if p.merged_at:
+            by_author.setdefault(p.user_login, []).append(p)
+    return by_author
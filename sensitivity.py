@@ -0,0 +1,158 @@
+"""
+Weight-sensitivity sweep for the Stage 2 impact model.
+
+Recomputes the four baseline components once from a snapshot, then scores every
+contributor under thousands of alternative component scales in one matrix
+product (contributors x components @ components x configs). Each configuration
+is compared with the default ranking by Spearman rank correlation and top-k
+overlap. Nothing is refetched and the LLM is not called; the stored Stage 3
+multipliers are applied as-is.
+
+    python sensitivity.py --samples 5000 --spread 0.5 --top-k 10
+"""
+import argparse
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from compact import CompactSnapshot
+from scoring import COMPONENT_SCALES
+
+COMPONENTS = list(COMPONENT_SCALES)
+
+
+def component_matrix(snap: CompactSnapshot):
+    """(logins, contributors x components matrix, quality multipliers, default totals) for a snapshot."""
+    contributors = snap.contributors
+    humans = ~contributors["login"].str.endswith("[bot]").to_numpy(dtype=bool)
+    scores = snap.score()[humans]
+    baseline = contributors["baseline_impact_score"].to_numpy(dtype=float)[humans]
+    impact = contributors["impact_score"].to_numpy(dtype=float)[humans]
+    stored = contributors["ai_multiplier"].to_numpy(dtype=float, na_value=np.nan)[humans]
+    multipliers = np.where(~np.isnan(stored), stored,
+                           np.divide(impact, baseline, out=np.ones_like(impact), where=baseline != 0))
+    return (scores.index.tolist(), scores[COMPONENTS].to_numpy(),
+            multipliers, scores["total"].to_numpy() * multipliers)
+
+
+def sample_scales(samples: int, spread: float, seed: int = 0) -> np.ndarray:
+    """`samples` x components scale vectors, each default scale jittered by up to +/- `spread`."""
+    rng = np.random.default_rng(seed)
+    defaults = np.array([COMPONENT_SCALES[k] for k in COMPONENTS], dtype=float)
+    factors = rng.uniform(max(1.0 - spread, 0.0), 1.0 + spread, size=(samples, len(COMPONENTS)))
+    return defaults * factors
+
+
+def average_ranks(scores: np.ndarray) -> np.ndarray:
+    """Column-wise ranks (1 = lowest), ties sharing their average rank."""
+    n = scores.shape[0]
+    order = np.argsort(scores, axis=0, kind="stable")
+    ordered = np.take_along_axis(scores, order, axis=0)
+    position = np.arange(n)[:, None]
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    ends = np.ones(ordered.shape, dtype=bool)
+    ends[:-1] = starts[1:]
+    first = np.maximum.accumulate(np.where(starts, position, 0), axis=0)
+    last = np.minimum.accumulate(np.where(ends, position, n - 1)[::-1], axis=0)[::-1]
+    ranks = np.empty(ordered.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=0)
+    return ranks
+
+
+def _top_k_mask(scores: np.ndarray, k: int) -> np.ndarray:
+    mask = np.zeros(scores.shape, dtype=bool)
+    top = np.argpartition(-scores, k - 1, axis=0)[:k]
+    np.put_along_axis(mask, top, True, axis=0)
+    return mask
+
+
+def sweep(components: np.ndarray, multipliers: np.ndarray, reference: np.ndarray, scales: np.ndarray,
+          top_k: int = 10, chunk: int = 1024):
+    """
+    Scores every contributor under each row of `scales` and compares each ranking
+    with `reference`. Returns per-config results (spearman, top_k_overlap and the
+    scales used) and, for the reference top-k, each contributor's
+    rank under every config (1 = best).
+    """
+    n = len(reference)
+    k = max(1, min(top_k, n))
+    reference = reference[:, None]
+    ref_ranks = average_ranks(reference)[:, 0]
+    ref_centered = ref_ranks - ref_ranks.mean()
+    ref_norm = np.sqrt(ref_centered @ ref_centered)
+    ref_top = _top_k_mask(reference, k)[:, 0]
+    leaders = np.argsort(-reference[:, 0], kind="stable")[:k]
+    defaults = np.array([COMPONENT_SCALES[c] for c in COMPONENTS], dtype=float)
+
+    spearman, overlap, leader_ranks = [], [], []
+    for start in range(0, len(scales), chunk):
+        block = scales[start:start + chunk]
+        scores = (components @ (block / defaults).T) * multipliers[:, None]
+        ranks = average_ranks(scores)
+        centered = ranks - ranks.mean(axis=0)
+        norms = np.sqrt(np.einsum("ij,ij->j", centered, centered)) * ref_norm
+        with np.errstate(invalid="ignore", divide="ignore"):
+            spearman.append(np.where(norms > 0, ref_centered @ centered / norms, 1.0))
+        overlap.append((_top_k_mask(scores, k) & ref_top[:, None]).sum(axis=0) / k)
+        leader_ranks.append(n + 1 - ranks[leaders])
+
+    results = pd.DataFrame(scales, columns=[c.replace("_score", "_scale") for c in COMPONENTS])
+    results.insert(0, "top_k_overlap", np.concatenate(overlap) if overlap else [])
+    results.insert(0, "spearman", np.concatenate(spearman) if spearman else [])
+    return results, leaders, np.hstack(leader_ranks) if leader_ranks else np.empty((k, 0))
+
+
+def print_report(results: pd.DataFrame, logins: List[str], leaders: np.ndarray, leader_ranks: np.ndarray,
+                 top_k: int, elapsed: float, worst: int = 5):
+    print(f"\n{len(results)} weight configurations x {len(logins)} contributors in {elapsed:.2f}s")
+    for column in ("spearman", "top_k_overlap"):
+        q = results[column].quantile([0.0, 0.05, 0.5, 0.95]).tolist()
+        label = "Spearman rho" if column == "spearman" else f"Top-{top_k} overlap"
+        print(f"  {label:<16} min {q[0]:.3f} | p5 {q[1]:.3f} | median {q[2]:.3f} | p95 {q[3]:.3f}")
+
+    print(f"\nRank ranges of the default top {len(leaders)} (p5 - p95 across configurations):")
+    for place, (i, ranks) in enumerate(zip(leaders, leader_ranks), 1):
+        low, high = np.percentile(ranks, [5, 95])
+        print(f"  #{place:<3} {logins[i]:<24} {low:>6.1f} - {high:<6.1f}")
+
+    print("\nLeast stable configurations:")
+    print(results.nsmallest(worst, "spearman").to_string(float_format=lambda v: f"{v:.3f}"))
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Rank stability of the impact model under alternative weights")
+    parser.add_argument("--snapshot", default=None, help="Snapshot file or Parquet directory (default: the latest written)")
+    parser.add_argument("--samples", type=int, default=5000, help="Weight configurations to evaluate")
+    parser.add_argument("--spread", type=float, default=0.5, help="Max relative change of each scale factor")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write per-configuration results to this CSV")
+    args = parser.parse_args(argv)
+
+    import main
+    snap: Optional[CompactSnapshot] = main.load_compact(args.snapshot)
+    if not snap:
+        print(f"No snapshot at {args.snapshot or main.DATA_FILE}; run main.py first.")
+        return
+
+    if snap.contributors.empty:
+        print("Snapshot has no contributors.")
+        return
+
+    start = time.perf_counter()
+    logins, components, multipliers, reference = component_matrix(snap)
+    scales = sample_scales(args.samples, args.spread, args.seed)
+    results, leaders, leader_ranks = sweep(components, multipliers, reference, scales, args.top_k)
+    elapsed = time.perf_counter() - start
+
+    print_report(results, logins, leaders, leader_ranks, min(args.top_k, len(logins)), elapsed)
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\nPer-configuration results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,150 @@
+"""
+The dashboard's view of a snapshot: contributor-level data up front, PR detail on demand.
+
+For a trusted Parquet snapshot, startup reads only meta.json, the contributor
+table and the daily activity table. Their size tracks contributors and days,
+not PR history. A selected engineer's PRs are read with the author as a
+Parquet row filter (the dashboard prefers the indexed SQLite store when it
+matches). JSON exports, and Parquet snapshots written before the activity
+table existed, are loaded whole as a CompactSnapshot instead.
+"""
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+import storage
+from activity import ActivityTimeline
+from compact import CompactSnapshot
+from models import PullRequest
+
+ACTIVITY_TABLE = "activity"
+# Tables a lazy view reads per engineer after startup
+_LAZY_TABLES = ("pull_requests", "reviews", "issues", "contributors")
+
+
+class StaleSnapshotError(RuntimeError):
+    """The snapshot on disk was rewritten after this view was opened."""
+
+
+def _identities(directory: str) -> Dict[str, Tuple[int, int, int]]:
+    # Every table is swapped in with os.replace, so a rewrite always changes the inode
+    identities = {}
+    for name in _LAZY_TABLES:
+        try:
+            st = os.stat(os.path.join(directory, f"{name}.parquet"))
+        except FileNotFoundError:
+            continue
+        identities[name] = (st.st_ino, st.st_mtime_ns, st.st_size)
+    return identities
+
+
+class SnapshotView:
+    def __init__(self, meta: dict, contributors: pd.DataFrame, pr_count: int, directory: Optional[str] = None,
+                 daily: Optional[pd.DataFrame] = None, compact: Optional[CompactSnapshot] = None,
+                 pinned: Optional[Dict[str, Tuple[int, int, int]]] = None):
+        self.meta = meta
+        self.repo_name: str = meta["repo_name"]
+        self.cutoff_date = datetime.fromisoformat(meta["cutoff_date"])
+        self.fetched_at = datetime.fromisoformat(meta["fetched_at"])
+        self.contributors = contributors
+        self.pr_count = pr_count
+        self.directory = directory
+        self._daily = daily
+        self._compact = compact
+        self._pinned = pinned
+
+    @classmethod
+    def open(cls, path: str) -> "SnapshotView":
+        # Taken before the checksums are verified, so a rewrite during open() shows up as stale later
+        pinned = _identities(path) if os.path.isdir(path) else None
+        meta = storage.trusted_header(path) if pinned is not None else None
+        daily = storage.read_table(path, ACTIVITY_TABLE, meta) if meta else None
+        if daily is None:
+            compact = CompactSnapshot.load(path)
+            meta = {"repo_name": compact.repo_name, "cutoff_date": compact.cutoff_date.isoformat(),
+                    "fetched_at": compact.fetched_at.isoformat()}
+            return cls(meta, compact.contributors, len(compact), compact=compact)
+        return cls(meta, storage.read_table(path, "contributors", meta), meta["rows"]["pull_requests"],
+                   directory=path, daily=daily, pinned=pinned)
+
+    @property
+    def lazy(self) -> bool:
+        return self._compact is None
+
+    def __len__(self) -> int:
+        return self.pr_count
+
+    def prs_by_author(self, login: str) -> List[PullRequest]:
+        if self._compact is not None:
+            return self._compact.prs_by_author(login)
+        # Lazy reads hit whatever is on disk; only accept them from the files this view was opened on
+        self._check_pinned()
+        tables = storage.read_author_tables(self.directory, login)
+        self._check_pinned()
+        return CompactSnapshot.from_tables(self.meta, tables).prs_by_author(login)
+
+    def _check_pinned(self):
+        if _identities(self.directory) != self._pinned:
+            raise StaleSnapshotError(f"{self.directory} changed since it was loaded")
+
+    def timeline(self) -> ActivityTimeline:
+        if self._compact is not None:
+            return ActivityTimeline(self._compact)
+        return ActivityTimeline.from_daily(self.contributors, self.cutoff_date, self.fetched_at, self._daily)
+
+
+class EngineerPRs(NamedTuple):
+    merged: List[PullRequest]       # most recently merged first, as the PR timeline shows them
+    other: List[PullRequest]        # open, or closed without merging
+    judged: int                     # merged PRs with an LLM quality score
+    avg_quality: Optional[float]    # their mean score
+
+
+def _engineer_prs(prs: List[PullRequest]) -> EngineerPRs:
+    merged = sorted((p for p in prs if p.merged_at), key=lambda p: p.merged_at, reverse=True)
+    scores = [p.llm_quality_score for p in merged if p.llm_quality_score]
+    return EngineerPRs(merged, [p for p in prs if not p.merged_at], len(scores),
+                       sum(scores) / len(scores) if scores else None)
+
+
+def team_reference(df: pd.DataFrame, top: int = 5) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """The radar chart's reference rows: mean and max of the `top` engineers in `df` (sorted by impact)."""
+    leaders = df.head(top)
+    lines = leaders["additions"] + leaders["deletions"]
+    avg_row = {
+        "prs_merged": leaders["prs_merged"].mean(),
+        "reviews_given": leaders["reviews_given"].mean(),
+        "lines": lines.mean(),
+        "avg_quality_score": leaders["avg_quality_score"].mean(),
+        "issue_interactions": leaders["issue_interactions"].mean(),
+    }
+    max_row = {
+        "prs_merged": leaders["prs_merged"].max(),
+        "reviews_given": leaders["reviews_given"].max(),
+        "lines": lines.max(),
+        "issue_interactions": leaders["issue_interactions"].max(),
+    }
+    return avg_row, max_row
+
+
+class EngineerIndex:
+    """
+    login -> EngineerPRs for one snapshot, plus the radar's team reference rows. The
+    `preload` logins are indexed up front; anyone else on first lookup, after which
+    it is a dict hit. Models are only ever built for engineers someone looks at.
+    """
+
+    def __init__(self, df: pd.DataFrame, fetch: Callable[[str], List[PullRequest]], preload: Iterable[str] = ()):
+        self.avg_row, self.max_row = team_reference(df)
+        self._fetch = fetch
+        self._entries: Dict[str, EngineerPRs] = {}
+        for login in preload:
+            self[login]
+
+    def __getitem__(self, login: str) -> EngineerPRs:
+        entry = self._entries.get(login)
+        if entry is None:
+            entry = self._entries[login] = _engineer_prs(self._fetch(login))
+        return entry
@@ -0,0 +1,310 @@
+"""
+Columnar snapshot storage.
+
+An ImpactData snapshot is written as a directory of zstd-compressed Parquet
+tables (pull_requests, reviews, issues, contributors) plus a small meta.json.
+Reviews are a flat table keyed by pr_number instead of nested lists, so every
+table is a plain set of typed columns that loads without parsing JSON. The
+indented impact_data.json is still written alongside for compatibility.
+
+Both formats carry a header: meta.json for the tables, <file>.meta for the
+JSON export. It records the schema version and a SHA-256 of every file. A
+snapshot whose header checks out was written by this pipeline unmodified, so
+`load_tables` reads its raw columns directly and skips the per-row pydantic
+validation. Anything else goes through the validated path.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Type
+
+import pandas as pd
+from pydantic import BaseModel
+
+from models import ContributorImpact, ImpactData, IssueActivity, PullRequest, Review
+
+DEFAULT_SNAPSHOT_DIR = "impact_data"
+SNAPSHOT_FORMATS = ("json", "parquet", "both")
+SCHEMA_VERSION = 1
+COMPRESSION = "zstd"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Column dtypes by field annotation; Optional ints stay integers with nulls
+_DTYPES = {
+    "int": "int64", "Optional[int]": "Int64",
+    "float": "float64", "Optional[float]": "float64",
+    "str": "string", "Optional[str]": "string",
+}
+
+TABLES = {
+    "pull_requests": PullRequest,
+    "reviews": Review,
+    "issues": IssueActivity,
+    "contributors": ContributorImpact,
+}
+
+
+def _columns(model: Type[BaseModel]) -> List[str]:
+    columns = [name for name in model.model_fields if name != "reviews"]
+    return ["pr_number", *columns] if model is Review else columns
+
+
+def _annotation(model: Type[BaseModel], name: str) -> str:
+    if name == "pr_number":
+        return "int"
+    text = str(model.model_fields[name].annotation)
+    base = "datetime" if "datetime" in text else next((t for t in ("int", "float", "str") if t in text), "")
+    return f"Optional[{base}]" if "Optional" in text or "None" in text else base
+
+
+def _tables(rows: Dict[str, List[dict]]) -> Dict[str, pd.DataFrame]:
+    """Typed DataFrames from row dicts; timestamps may be datetimes or ISO-8601 strings."""
+    tables = {}
+    for name, model in TABLES.items():
+        df = pd.DataFrame(rows[name], columns=_columns(model))
+        for column in df.columns:
+            annotation = _annotation(model, column)
+            if "datetime" in annotation:
+                df[column] = pd.to_datetime(df[column], utc=True, format="ISO8601").dt.as_unit("us")
+            elif annotation in _DTYPES:
+                df[column] = df[column].astype(_DTYPES[annotation])
+        tables[name] = df
+    return tables
+
+
+def to_tables(data: ImpactData) -> Dict[str, pd.DataFrame]:
+    """The snapshot as one DataFrame per table."""
+    return _tables({
+        "pull_requests": [p.model_dump(exclude={"reviews"}) for p in data.pull_requests],
+        "reviews": [{"pr_number": p.number, **r.model_dump()} for p in data.pull_requests for r in p.reviews],
+        "issues": [i.model_dump() for i in data.issue_activities],
+        "contributors": [c.model_dump() for c in data.contributor_metrics],
+    })
+
+
+def _json_tables(raw: dict) -> Dict[str, pd.DataFrame]:
+    """The tables straight from a parsed JSON export, without building models."""
+    prs = raw["pull_requests"]
+    return _tables({
+        "pull_requests": prs,  # the "reviews" key falls outside the table's columns
+        "reviews": [{"pr_number": p["number"], **r} for p in prs for r in p.get("reviews", ())],
+        "issues": raw["issue_activities"],
+        "contributors": raw["contributor_metrics"],
+    })
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _meta(data: ImpactData) -> dict:
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "repo_name": data.repo_name,
+        "cutoff_date": data.cutoff_date.isoformat(),
+        "fetched_at": data.fetched_at.isoformat(),
+    }
+
+
+def _write_json_atomic(obj: dict, path: str):
+    tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp, path)
+
+
+def write_parquet(data: ImpactData, directory: str = DEFAULT_SNAPSHOT_DIR,
+                  extra: Optional[Dict[str, pd.DataFrame]] = None):
+    """
+    Writes the snapshot's tables and meta.json into `directory`, replacing files one
+    by one. `extra` tables (derived data such as daily activity) go alongside.
+    """
+    write_tables(_meta(data), {**to_tables(data), **(extra or {})}, directory)
+
+
+def write_tables(meta: dict, tables: Dict[str, pd.DataFrame], directory: str = DEFAULT_SNAPSHOT_DIR):
+    """write_parquet for tables already in hand, e.g. from load_tables; `meta` names the snapshot."""
+    os.makedirs(directory, exist_ok=True)
+    checksums = {}
+    for name, df in tables.items():
+        tmp = os.path.join(directory, f".{name}.parquet.tmp")
+        df.to_parquet(tmp, compression=COMPRESSION, index=False)
+        checksums[name] = _sha256(tmp)
+        os.replace(tmp, os.path.join(directory, f"{name}.parquet"))
+    header = {key: meta[key] for key in ("repo_name", "cutoff_date", "fetched_at")}
+    meta = {"schema_version": SCHEMA_VERSION, **header,
+            "rows": {name: len(df) for name, df in tables.items()}, "checksums": checksums}
+    # meta.json goes last, so a reader never sees it ahead of its tables
+    _write_json_atomic(meta, os.path.join(directory, "meta.json"))
+
+
+def read_tables(directory: str = DEFAULT_SNAPSHOT_DIR) -> Dict[str, pd.DataFrame]:
+    return {name: pd.read_parquet(os.path.join(directory, f"{name}.parquet")) for name in TABLES}
+
+
+def read_meta(directory: str = DEFAULT_SNAPSHOT_DIR) -> dict:
+    with open(os.path.join(directory, "meta.json")) as f:
+        return json.load(f)
+
+
+def read_table(directory: str, name: str, meta: dict) -> Optional[pd.DataFrame]:
+    """One table, or None if the snapshot described by `meta` didn't write it."""
+    if name not in meta.get("rows", {}):
+        return None
+    return pd.read_parquet(os.path.join(directory, f"{name}.parquet"))
+
+
+def read_author_tables(directory: str, login: str) -> Dict[str, pd.DataFrame]:
+    """`login`'s PRs (with their reviews) and issue events, read with the author as a row filter."""
+    def read(name: str, filters: list) -> pd.DataFrame:
+        return pd.read_parquet(os.path.join(directory, f"{name}.parquet"), filters=filters)
+
+    prs = read("pull_requests", [("user_login", "==", login)])
+    return {
+        "pull_requests": prs,
+        "reviews": read("reviews", [("pr_number", "in", prs["number"].tolist())]),
+        "issues": read("issues", [("user_login", "==", login)]),
+        "contributors": read("contributors", [("login", "==", login)]),
+    }
+
+
+def _values(column: pd.Series) -> list:
+    """A column as Python values, nulls as None (much faster than going through pd.Timestamp / object arrays)."""
+    missing = column.isna().tolist()
+    if isinstance(column.dtype, pd.DatetimeTZDtype):
+        micros = column.dt.tz_convert(None).to_numpy().astype("datetime64[us]").astype("int64").tolist()
+        return [None if m else _EPOCH + timedelta(microseconds=v) for v, m in zip(micros, missing)]
+    values = column.tolist()
+    return [None if m else v for v, m in zip(values, missing)] if any(missing) else values
+
+
+def _records(df: pd.DataFrame) -> List[dict]:
+    """Rows as dicts with missing values as None and timestamps as datetimes."""
+    names = list(df.columns)
+    return [dict(zip(names, row)) for row in zip(*(_values(df[name]) for name in names))]
+
+
+def from_tables(meta: dict, tables: Dict[str, pd.DataFrame]) -> ImpactData:
+    reviews: Dict[int, List[dict]] = {}
+    for row in _records(tables["reviews"]):
+        reviews.setdefault(row.pop("pr_number"), []).append(row)
+    return ImpactData.model_validate({
+        "repo_name": meta["repo_name"],
+        "cutoff_date": meta["cutoff_date"],
+        "fetched_at": meta["fetched_at"],
+        "pull_requests": [{**row, "reviews": reviews.get(row["number"], [])} for row in _records(tables["pull_requests"])],
+        "issue_activities": _records(tables["issues"]),
+        "contributor_metrics": _records(tables["contributors"]),
+    })
+
+
+def read_parquet(directory: str = DEFAULT_SNAPSHOT_DIR) -> ImpactData:
+    meta = read_meta(directory)
+    if meta.get("schema_version", 0) > SCHEMA_VERSION:
+        raise ValueError(f"{directory} was written by a newer schema (v{meta['schema_version']})")
+    return from_tables(meta, read_tables(directory))
+
+
+def json_header_path(path: str) -> str:
+    return f"{path}.meta"
+
+
+def write_json(data: ImpactData, path: str):
+    tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    with open(tmp, "w") as f:
+        f.write(data.model_dump_json(indent=2))
+    digest = _sha256(tmp)
+    os.replace(tmp, path)
+    _write_json_atomic({**_meta(data), "sha256": digest}, json_header_path(path))
+
+
+def read_header(path: str) -> Optional[dict]:
+    """The snapshot's header (meta.json or <file>.meta) without checking it, or None if it has none."""
+    try:
+        if os.path.isdir(path):
+            return read_meta(path)
+        with open(json_header_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_json(path: str) -> ImpactData:
+    with open(path, "r") as f:
+        return ImpactData.model_validate_json(f.read())
+
+
+def save_snapshot(data: ImpactData, json_path: str, directory: str = DEFAULT_SNAPSHOT_DIR, fmt: str = "both",
+                  extra: Optional[Dict[str, pd.DataFrame]] = None):
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"snapshot format must be one of {SNAPSHOT_FORMATS}")
+    if fmt in ("json", "both"):
+        write_json(data, json_path)
+    # Written last, so readers that pick the newest snapshot prefer the tables
+    if fmt in ("parquet", "both"):
+        write_parquet(data, directory, extra)
+
+
+def file_mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return None
+
+
+def _fetched_at(path: str) -> datetime:
+    header = read_header(path)
+    try:
+        return datetime.fromisoformat(header["fetched_at"])
+    except (TypeError, KeyError, ValueError):
+        return _EPOCH  # a JSON export from before headers: older than anything that has one
+
+
+def latest_snapshot_path(json_path: str, directory: str = DEFAULT_SNAPSHOT_DIR) -> Optional[str]:
+    """
+    Whichever of the Parquet directory and the JSON file holds the newer fetch, or
+    None. Ordered by the headers' fetched_at, since a checkout or copy reorders
+    mtimes; on a tie the tables win.
+    """
+    candidates = [(_fetched_at(p), rank, p) for rank, p in ((0, json_path), (1, directory))
+                  if os.path.exists(os.path.join(p, "meta.json") if p == directory else p)]
+    return max(candidates)[2] if candidates else None
+
+
+def load_snapshot(path: str) -> ImpactData:
+    """Reads a snapshot from a Parquet directory or a JSON file."""
+    return read_parquet(path) if os.path.isdir(path) else read_json(path)
+
+
+def trusted_header(path: str) -> Optional[dict]:
+    """The snapshot's header if it matches this schema version and every checksum, else None."""
+    meta = read_header(path)
+    if meta is None:
+        return None
+    if os.path.isdir(path):
+        checksums = meta.get("checksums") or {}
+        files = {os.path.join(path, f"{name}.parquet"): checksums.get(name) for name in {*TABLES, *checksums}}
+    else:
+        files = {path: meta.get("sha256")}
+    if meta.get("schema_version") != SCHEMA_VERSION:
+        return None
+    if any(digest is None or not os.path.exists(file) or _sha256(file) != digest for file, digest in files.items()):
+        return None
+    return meta
+
+
+def load_tables(path: str) -> Tuple[dict, Dict[str, pd.DataFrame]]:
+    """
+    A snapshot's meta and tables. Snapshots with a trusted header are read as raw
+    columns; others are validated row by row through the models first.
+    """
+    meta = trusted_header(path)
+    if meta is None:
+        data = load_snapshot(path)
+        return _meta(data), to_tables(data)
+    if os.path.isdir(path):
+        return meta, read_tables(path)
+    with open(path, "rb") as f:
+        return meta, _json_tables(json.loads(f.read()))
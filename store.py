@@ -0,0 +1,133 @@
+"""
+Embedded SQLite store for a snapshot, with a small query layer.
+
+The pipeline writes every snapshot to impact_data.sqlite as well: PRs, reviews,
+issue events and contributors in their own tables, indexed by PR number,
+author, merged_at and reviewer. The dashboard's per-engineer views then cost an
+indexed lookup instead of a scan over every PR on each Streamlit rerun.
+"""
+import os
+import sqlite3
+from typing import Dict, List, Optional
+
+from models import ImpactData, PullRequest, Review
+
+DEFAULT_STORE_PATH = "impact_data.sqlite"
+STORE_SCHEMA_VERSION = 1
+
+_PR_COLUMNS = [name for name in PullRequest.model_fields if name != "reviews"]
+_REVIEW_COLUMNS = ["pr_number", *Review.model_fields]
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE pull_requests (
+    number INTEGER PRIMARY KEY, title TEXT, user_login TEXT, state TEXT,
+    created_at TEXT, updated_at TEXT, merged_at TEXT, closed_at TEXT,
+    additions INTEGER, deletions INTEGER, changed_files INTEGER, html_url TEXT,
+    llm_quality_score REAL, llm_reasoning TEXT,
+    llm_substance_score INTEGER, llm_product_impact_score INTEGER,
+    llm_technical_quality_score INTEGER, llm_blast_radius_score INTEGER
+);
+CREATE TABLE reviews (pr_number INTEGER, user_login TEXT, state TEXT, submitted_at TEXT, body TEXT);
+CREATE TABLE issues (
+    issue_number INTEGER, title TEXT, user_login TEXT, created_at TEXT,
+    updated_at TEXT, event_type TEXT, body TEXT
+);
+CREATE TABLE contributors (login TEXT PRIMARY KEY, data TEXT);
+CREATE INDEX idx_pr_author ON pull_requests (user_login, merged_at);
+CREATE INDEX idx_pr_merged ON pull_requests (merged_at);
+CREATE INDEX idx_review_pr ON reviews (pr_number);
+CREATE INDEX idx_review_reviewer ON reviews (user_login);
+CREATE INDEX idx_issue_user ON issues (user_login);
+"""
+
+
+def _value(v):
+    # Timestamps as ISO-8601 text: they sort correctly and round-trip through pydantic
+    return v.isoformat() if hasattr(v, "isoformat") else v
+
+
+def write_store(data: ImpactData, path: str = DEFAULT_STORE_PATH):
+    """Writes `data` to a fresh database next to `path`, then swaps it in."""
+    tmp = f"{path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        # A scratch file until the swap below, so skip journaling and fsyncs
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("schema_version", str(STORE_SCHEMA_VERSION)),
+            ("repo_name", data.repo_name),
+            ("cutoff_date", data.cutoff_date.isoformat()),
+            ("fetched_at", data.fetched_at.isoformat()),
+        ])
+        conn.executemany(
+            f"INSERT OR REPLACE INTO pull_requests ({', '.join(_PR_COLUMNS)}) VALUES ({', '.join('?' * len(_PR_COLUMNS))})",
+            ([_value(getattr(p, c)) for c in _PR_COLUMNS] for p in data.pull_requests),
+        )
+        conn.executemany(
+            "INSERT INTO reviews VALUES (?, ?, ?, ?, ?)",
+            ((p.number, r.user_login, r.state, _value(r.submitted_at), r.body)
+             for p in data.pull_requests for r in p.reviews),
+        )
+        conn.executemany(
+            "INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((i.issue_number, i.title, i.user_login, _value(i.created_at), _value(i.updated_at), i.event_type, i.body)
+             for i in data.issue_activities),
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO contributors VALUES (?, ?)",
+            ((c.login, c.model_dump_json()) for c in data.contributor_metrics),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+
+class ImpactStore:
+    """Read-only queries over a store written by `write_store`."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        # Streamlit reruns scripts on different threads; reads only, so sharing is safe
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+    def meta(self) -> Dict[str, str]:
+        return {row["key"]: row["value"] for row in self.conn.execute("SELECT key, value FROM meta")}
+
+    def summary(self) -> Dict[str, int]:
+        """Totals for the hero tiles."""
+        return dict(self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM pull_requests) AS prs,"
+            "       (SELECT COALESCE(SUM(json_extract(data, '$.reviews_given')), 0) FROM contributors) AS reviews,"
+            "       (SELECT COUNT(*) FROM contributors) AS contributors"
+        ).fetchone())
+
+    def _prs(self, where: str, params: tuple) -> List[PullRequest]:
+        rows = self.conn.execute(f"SELECT * FROM pull_requests WHERE {where}", params).fetchall()
+        reviews: Dict[int, List[dict]] = {}
+        if rows:
+            numbers = [row["number"] for row in rows]
+            for start in range(0, len(numbers), 900):  # SQLite's bound-parameter limit
+                chunk = numbers[start:start + 900]
+                for r in self.conn.execute(
+                    f"SELECT * FROM reviews WHERE pr_number IN ({', '.join('?' * len(chunk))})", chunk
+                ):
+                    reviews.setdefault(r["pr_number"], []).append(
+                        {k: r[k] for k in _REVIEW_COLUMNS if k != "pr_number"})
+        return [PullRequest.model_validate({**dict(row), "reviews": reviews.get(row["number"], [])}) for row in rows]
+
+    def prs_by_author(self, login: str, merged: Optional[bool] = None) -> List[PullRequest]:
+        """`login`'s PRs by number; `merged` limits them to merged or unmerged ones."""
+        where = "user_login = ?"
+        if merged is not None:
+            where += " AND merged_at IS NOT NULL" if merged else " AND merged_at IS NULL"
+        return self._prs(where + " ORDER BY number", (login,))
+
+    def close(self):
+        self.conn.close()
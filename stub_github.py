@@ -0,0 +1,439 @@
+"""
+Local stand-in for the parts of the GitHub API that Stage 1 uses.
+
+Serves the issues listing, `issues/{n}`, `pulls/{n}`, `pulls/{n}/reviews` and the GraphQL
+queries in github_graphql from a fixture, with configurable latency, page sizes,
+ETags and per-token rate-limit headers. Point the pipeline at it with
+`GITHUB_BASE_URL=http://127.0.0.1:<port>` (or `Github(base_url=...)`).
+
+Fixtures are either synthetic (seeded, so runs are reproducible) or recorded
+from an existing impact_data.json snapshot.
+
+    python stub_github.py --items 300 --latency 0.05
+    python stub_github.py --fixture impact_data.json --port 8765
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from models import ImpactData
+
+DEFAULT_PORT = 8765
+DEFAULT_PER_PAGE = 30     # GitHub's default when the client doesn't ask
+MAX_PER_PAGE = 100
+DEFAULT_RATE_LIMIT = 5000
+DEFAULT_RESET_SECONDS = 3600
+
+
+@dataclass
+class Fixture:
+    """
+    Everything the stub serves. `items` is the issues listing (PRs included, as on
+    GitHub), newest-updated first; `pulls` and `reviews` hold PR-only details.
+    Timestamps are ISO strings.
+    """
+    repo: str
+    users: Dict[str, dict]            # login -> {"avatar_url", "html_url"}
+    items: List[dict]                 # number, title, user, state, created_at, updated_at, is_pr
+    pulls: Dict[int, dict]            # number -> merged_at, closed_at, additions, deletions, changed_files
+    reviews: Dict[int, List[dict]]    # number -> [{"user", "state", "submitted_at"}]
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(asdict(self), f)
+
+    @classmethod
+    def load(cls, path: str) -> "Fixture":
+        """Reads a saved fixture, or records one from an impact_data.json snapshot."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        if "pull_requests" in data:
+            return fixture_from_snapshot(ImpactData.model_validate(data))
+        return cls(
+            repo=data["repo"],
+            users=data["users"],
+            items=data["items"],
+            pulls={int(k): v for k, v in data["pulls"].items()},
+            reviews={int(k): v for k, v in data["reviews"].items()},
+        )
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") if value else None
+
+
+def synthetic_fixture(items: int = 300, users: int = 40, days: int = 30, seed: int = 0,
+                      repo: str = "PostHog/posthog") -> Fixture:
+    """Roughly PostHog-shaped activity: ~2/3 PRs, a few bots, skewed authorship."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    logins = [f"dev-{i:03d}" for i in range(users)] + ["dependabot[bot]", "posthog-bot[bot]"]
+    weights = [1.0 / (i + 1) for i in range(users)] + [0.3, 0.2]
+    prefixes = ["feat: ", "fix: ", "refactor: ", "chore: ", "docs: ", "perf: ", ""]
+    fixture = Fixture(repo=repo, users={}, items=[], pulls={}, reviews={})
+    for login in logins:
+        fixture.users[login] = {"avatar_url": f"https://avatars.example/{login}",
+                                "html_url": f"https://github.com/{login}"}
+
+    ages = sorted(rng.uniform(0, days * 86400) for _ in range(items))
+    for number, age in enumerate(ages, start=1):
+        updated_at = now - timedelta(seconds=age)
+        created_at = updated_at - timedelta(seconds=rng.uniform(0, 5 * 86400))
+        author = rng.choices(logins, weights)[0]
+        is_pr = rng.random() < 0.67
+        state = rng.choice(["open", "closed", "closed"])
+        fixture.items.append({
+            "number": number,
+            "title": f"{rng.choice(prefixes)}change {number}",
+            "user": author,
+            "state": state,
+            "created_at": _iso(created_at),
+            "updated_at": _iso(updated_at),
+            "is_pr": is_pr,
+        })
+        if not is_pr:
+            continue
+        merged = state == "closed" and rng.random() < 0.85
+        fixture.pulls[number] = {
+            "merged_at": _iso(updated_at) if merged else None,
+            "closed_at": _iso(updated_at) if state == "closed" else None,
+            "additions": int(rng.lognormvariate(4, 1.5)),
+            "deletions": int(rng.lognormvariate(3, 1.5)),
+            "changed_files": rng.randint(1, 40),
+        }
+        reviewers = [u for u in rng.sample(logins[:users], k=rng.randint(0, 6)) if u != author]
+        fixture.reviews[number] = [
+            {"user": u, "state": rng.choice(["APPROVED", "COMMENTED", "CHANGES_REQUESTED"]),
+             "submitted_at": _iso(updated_at)}
+            for u in reviewers
+        ]
+    return fixture
+
+
+def fixture_from_snapshot(data: ImpactData) -> Fixture:
+    """Rebuilds what GitHub served for a previous run from its saved snapshot."""
+    fixture = Fixture(repo=data.repo_name, users={}, items=[], pulls={}, reviews={})
+    for c in data.contributor_metrics:
+        fixture.users[c.login] = {"avatar_url": c.avatar_url, "html_url": c.html_url}
+
+    def user(login: str) -> str:
+        fixture.users.setdefault(login, {"avatar_url": "", "html_url": f"https://github.com/{login}"})
+        return login
+
+    for pr in data.pull_requests:
+        fixture.items.append({
+            "number": pr.number, "title": pr.title, "user": user(pr.user_login), "state": pr.state,
+            "created_at": _iso(pr.created_at), "updated_at": _iso(pr.updated_at or pr.merged_at or pr.created_at),
+            "is_pr": True,
+        })
+        fixture.pulls[pr.number] = {
+            "merged_at": _iso(pr.merged_at), "closed_at": _iso(pr.closed_at),
+            "additions": pr.additions, "deletions": pr.deletions, "changed_files": pr.changed_files,
+        }
+        fixture.reviews[pr.number] = [
+            {"user": user(r.user_login), "state": r.state, "submitted_at": _iso(r.submitted_at)} for r in pr.reviews
+        ]
+    for issue in data.issue_activities:
+        fixture.items.append({
+            "number": issue.issue_number, "title": issue.title, "user": user(issue.user_login),
+            "state": "closed" if issue.event_type == "closed" else "open",
+            "created_at": _iso(issue.created_at), "updated_at": _iso(issue.updated_at or issue.created_at),
+            "is_pr": False,
+        })
+    fixture.items.sort(key=lambda i: i["updated_at"], reverse=True)
+    return fixture
+
+
+class StubGitHub:
+    """
+    Threaded HTTP server over a Fixture. `calls` counts requests by kind
+    (repo, issues, issue, pull, reviews, graphql, not_modified, rate_limited).
+
+        with StubGitHub(synthetic_fixture(), latency=0.05) as stub:
+            Github("token", base_url=stub.url)
+    """
+
+    def __init__(self, fixture: Fixture, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, rate_limit: int = DEFAULT_RATE_LIMIT,
+                 reset_seconds: float = DEFAULT_RESET_SECONDS, seed: int = 0):
+        self.fixture = fixture
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.reset_seconds = reset_seconds
+        self.calls: Counter = Counter()
+        self._items = {i["number"]: i for i in fixture.items}
+        self._rng = random.Random(seed)
+        self._quota: Dict[tuple, List[float]] = {}   # (token, resource) -> [remaining, reset_at]
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubGitHub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset(self):
+        """Clears call counters and quotas between benchmark runs."""
+        with self._lock:
+            self.calls.clear()
+            self._quota.clear()
+
+    # --- rate limiting ---
+    def _charge(self, token: str, resource: str) -> Dict[str, str]:
+        """Spends one request of `token`'s quota; returns the rate-limit headers (remaining < 0 = over)."""
+        now = time.time()
+        with self._lock:
+            quota = self._quota.get((token, resource))
+            if quota is None or quota[1] <= now:
+                quota = self._quota[(token, resource)] = [self.rate_limit, now + self.reset_seconds]
+            quota[0] -= 1
+            remaining, reset_at = quota
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(remaining, 0)),
+            "X-RateLimit-Reset": str(int(reset_at)),
+            "X-RateLimit-Resource": resource,
+            "_over": "1" if remaining < 0 else "",
+        }
+
+    # --- REST payloads ---
+    def _user(self, login: str) -> dict:
+        profile = self.fixture.users.get(login, {})
+        return {"login": login, "type": "Bot" if login.endswith("[bot]") else "User",
+                "avatar_url": profile.get("avatar_url", ""), "html_url": profile.get("html_url", "")}
+
+    def _issue(self, base: str, item: dict) -> dict:
+        body = {
+            "number": item["number"], "title": item["title"], "state": item["state"],
+            "user": self._user(item["user"]), "created_at": item["created_at"], "updated_at": item["updated_at"],
+            "url": f"{base}/issues/{item['number']}",
+        }
+        if item["is_pr"]:
+            body["pull_request"] = {"url": f"{base}/pulls/{item['number']}"}
+        return body
+
+    def _pull(self, base: str, number: int) -> Optional[dict]:
+        item, detail = self._items.get(number), self.fixture.pulls.get(number)
+        if not item or detail is None:
+            return None
+        return {
+            "number": number, "title": item["title"], "state": item["state"], "user": self._user(item["user"]),
+            "created_at": item["created_at"], "updated_at": item["updated_at"],
+            "merged_at": detail["merged_at"], "closed_at": detail["closed_at"],
+            "additions": detail["additions"], "deletions": detail["deletions"],
+            "changed_files": detail["changed_files"],
+            "url": f"{base}/pulls/{number}",
+            "html_url": f"https://github.com/{self.fixture.repo}/pull/{number}",
+        }
+
+    def _reviews(self, number: int) -> List[dict]:
+        return [
+            {"id": number * 1000 + k, "user": self._user(r["user"]), "state": r["state"],
+             "submitted_at": r["submitted_at"]}
+            for k, r in enumerate(self.fixture.reviews.get(number, []))
+        ]
+
+    # --- GraphQL payloads ---
+    def _actor(self, login: str) -> dict:
+        profile = self.fixture.users.get(login, {})
+        is_bot = login.endswith("[bot]")
+        return {"__typename": "Bot" if is_bot else "User", "login": login[:-5] if is_bot else login,
+                "avatarUrl": profile.get("avatar_url", ""), "url": profile.get("html_url", "")}
+
+    def _graphql(self, query: str, variables: dict) -> dict:
+        offset = int(variables.get("cursor") or 0)
+        size = min(int(variables.get("pageSize", DEFAULT_PER_PAGE)), MAX_PER_PAGE)
+        if "pullRequests(" in query:
+            connection = "pullRequests"
+            matches = [i for i in self.fixture.items if i["is_pr"]]
+        else:
+            connection = "issues"
+            since = variables.get("since")
+            matches = [i for i in self.fixture.items if not i["is_pr"]
+                       and (not since or _parse(i["updated_at"]) >= _parse(since))]
+        page = matches[offset:offset + size]
+        nodes = []
+        for item in page:
+            node = {
+                "number": item["number"], "title": item["title"], "author": self._actor(item["user"]),
+                "createdAt": item["created_at"], "updatedAt": item["updated_at"],
+            }
+            if connection == "pullRequests":
+                detail = self.fixture.pulls[item["number"]]
+                node.update({
+                    "state": "MERGED" if detail["merged_at"] else item["state"].upper(),
+                    "mergedAt": detail["merged_at"], "closedAt": detail["closed_at"],
+                    "additions": detail["additions"], "deletions": detail["deletions"],
+                    "changedFiles": detail["changed_files"],
+                    "url": f"https://github.com/{self.fixture.repo}/pull/{item['number']}",
+                    "reviews": {"nodes": [
+                        {"state": r["state"], "submittedAt": r["submitted_at"], "author": self._actor(r["user"])}
+                        for r in self.fixture.reviews.get(item["number"], [])[:int(variables.get("reviews", 5))]
+                    ]},
+                })
+            else:
+                node["state"] = item["state"].upper()
+            nodes.append(node)
+        end = offset + len(page)
+        return {"data": {"repository": {connection: {
+            "pageInfo": {"hasNextPage": end < len(matches), "endCursor": str(end)},
+            "nodes": nodes,
+        }}}}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body, headers: Dict[str, str]):
+                payload = json.dumps(body).encode("utf-8") if body is not None else b""
+                etag = f'"{hashlib.md5(payload).hexdigest()}"'
+                if status == 200 and self.command == "GET" and self.headers.get("If-None-Match") == etag:
+                    # Like GitHub, conditional hits are free: refund the request
+                    stub.calls["not_modified"] += 1
+                    with stub._lock:
+                        stub._quota[self._quota_key][0] += 1
+                    status, payload = 304, b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                if status in (200, 304) and self.command == "GET":
+                    self.send_header("ETag", etag)
+                for k, v in headers.items():
+                    if not k.startswith("_"):
+                        self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _serve(self, kind: str, resource: str, produce):
+                if stub.latency or stub.jitter:
+                    time.sleep(max(stub.latency + stub._rng.uniform(-stub.jitter, stub.jitter), 0.0))
+                token = self.headers.get("Authorization", "anonymous")
+                self._quota_key = (token, resource)
+                headers = stub._charge(token, resource)
+                if headers["_over"]:
+                    stub.calls["rate_limited"] += 1
+                    return self._send(403, {"message": "API rate limit exceeded"}, headers)
+                stub.calls[kind] += 1
+                status, body, extra = produce()
+                self._send(status, body, {**headers, **extra})
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                parts = [p for p in parsed.path.split("/") if p]
+                if len(parts) < 3 or parts[0] != "repos":
+                    return self._send(404, {"message": "Not Found"}, {})
+                base = f"{stub.url}/repos/{parts[1]}/{parts[2]}"
+                rest = parts[3:]
+
+                if not rest:
+                    return self._serve("repo", "core", lambda: (200, {
+                        "id": 1, "name": parts[2], "full_name": f"{parts[1]}/{parts[2]}", "url": base,
+                    }, {}))
+                if rest == ["issues"]:
+                    return self._serve("issues", "core", lambda: self._page(base, params))
+                if len(rest) == 2 and rest[0] == "issues":
+                    # PyGithub completes a listed issue (one more request) when `pull_request` is absent
+                    item = stub._items.get(int(rest[1]))
+                    return self._serve("issue", "core", lambda: (200, stub._issue(base, item), {}) if item else (404, {"message": "Not Found"}, {}))
+                if len(rest) == 2 and rest[0] == "pulls":
+                    pull = stub._pull(base, int(rest[1]))
+                    return self._serve("pull", "core", lambda: (200, pull, {}) if pull else (404, {"message": "Not Found"}, {}))
+                if len(rest) == 3 and rest[0] == "pulls" and rest[2] == "reviews":
+                    reviews = stub._reviews(int(rest[1]))
+                    return self._serve("reviews", "core", lambda: self._slice(f"{base}/pulls/{rest[1]}/reviews", params, reviews))
+                self._send(404, {"message": "Not Found"}, {})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if urlparse(self.path).path.rstrip("/") != "/graphql":
+                    return self._send(404, {"message": "Not Found"}, {})
+                self._serve("graphql", "graphql",
+                            lambda: (200, stub._graphql(request.get("query", ""), request.get("variables") or {}), {}))
+
+            def _page(self, base: str, params: dict):
+                since = params.get("since")
+                items = [i for i in stub.fixture.items if not since or _parse(i["updated_at"]) >= _parse(since)]
+                return self._slice(f"{base}/issues", params, [stub._issue(base, i) for i in items])
+
+            def _slice(self, url: str, params: dict, entries: list):
+                per_page = min(int(params.get("per_page", DEFAULT_PER_PAGE)), MAX_PER_PAGE)
+                page = max(int(params.get("page", 1)), 1)
+                chunk = entries[(page - 1) * per_page:page * per_page]
+                headers = {}
+                if page * per_page < len(entries):
+                    headers["Link"] = f'<{url}?{urlencode({**params, "page": page + 1})}>; rel="next"'
+                return 200, chunk, headers
+
+        return Handler
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local GitHub API stand-in for Stage 1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--fixture", help="Saved fixture or impact_data.json snapshot to serve (default: synthetic)")
+    parser.add_argument("--items", type=int, default=300, help="Synthetic listing size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- seconds around --latency")
+    parser.add_argument("--rate-limit", type=int, default=DEFAULT_RATE_LIMIT, help="Requests per token per window")
+    parser.add_argument("--reset-seconds", type=float, default=DEFAULT_RESET_SECONDS)
+    parser.add_argument("--save-fixture", help="Write the fixture to this path and exit")
+    args = parser.parse_args(argv)
+
+    fixture = Fixture.load(args.fixture) if args.fixture else synthetic_fixture(args.items, seed=args.seed)
+    if args.save_fixture:
+        fixture.save(args.save_fixture)
+        print(f"Saved {len(fixture.items)} items to {args.save_fixture}")
+        return
+    stub = StubGitHub(fixture, port=args.port, latency=args.latency, jitter=args.jitter,
+                      rate_limit=args.rate_limit, reset_seconds=args.reset_seconds, seed=args.seed)
+    print(f"Serving {len(fixture.items)} items of {fixture.repo} at {stub.url}")
+    print(f"Run the pipeline against it with GITHUB_BASE_URL={stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()